@@ -1,17 +1,28 @@
+import json
 import logging
 import sys
+import threading
+import uuid
 from pathlib import Path
 
-import webview
-import requests
-
 from backend.backend_api import BackendApi
+from backend.lazy import lazy_import
+from backend.metrics import instrumented
+
+# Imported on first use to keep application start-up fast.
+webview = lazy_import("webview")
+requests = lazy_import("requests")
 
 
+@instrumented("api")
 class Api:
     def __init__(self):
         self.backend = BackendApi()
         self.window = None
+        # The current scan per folder type; batches of superseded scans are dropped.
+        self._scan_ids = {}
+        # Display batches whose remaining thumbnails are still wanted.
+        self._display_requests = set()
 
     def set_window(self, window):
         """Store the window object for later use."""
@@ -46,14 +57,135 @@ class Api:
             logging.error(f"HTML file not found at {full_html_path.resolve()}")
             return {"success": False, "error": f"HTML file not found: {url_path}"}
 
-    def get_image_list(self, folder_type, use_hash_check=False):
-        logging.debug(f"get_image_list called with type: {folder_type}, hash_check: {use_hash_check}")
-        return self.backend.get_image_list(folder_type, use_hash_check)
+    def get_startup_status(self):
+        logging.debug("get_startup_status called")
+        return self.backend.get_startup_status()
+
+    def get_image_list(self, folder_type, use_hash_check=False, compact=False, include_metadata=False):
+        logging.debug(
+            f"get_image_list called with type: {folder_type}, hash_check: {use_hash_check}, compact: {compact}"
+        )
+        return self.backend.get_image_list(folder_type, use_hash_check, compact, include_metadata)
 
     def convert_dds_for_display(self, dds_path, is_dump_image):
         logging.debug(f"convert_dds_for_display called for path: {dds_path}")
         return self.backend.convert_dds_for_display(dds_path, is_dump_image)
 
+    def convert_dds_for_display_batch(self, dds_paths, is_dump_image):
+        """Returns the cached thumbnails of a page of textures at once and converts the rest in the background.
+
+        Converted thumbnails arrive as `displayImageBatch` events and the run ends with a
+        `displayImageComplete` event, both carrying the returned request_id in their detail.
+        """
+        logging.debug(f"convert_dds_for_display_batch called for {len(dds_paths)} paths")
+        result = self.backend.convert_dds_for_display_batch(dds_paths, is_dump_image)
+        if result.get("success") and result["missing"] and self.window:
+            request_id = uuid.uuid4().hex
+            self._display_requests.add(request_id)
+            threading.Thread(
+                target=self._run_display_batch,
+                args=(request_id, result["missing"], is_dump_image),
+                name="hohatch-display-batch",
+                daemon=True,
+            ).start()
+            result["request_id"] = request_id
+        return result
+
+    def get_contact_sheet(self, dds_paths, is_dump_image, columns=None, tile_height=None):
+        logging.debug(f"get_contact_sheet called for {len(dds_paths)} paths")
+        return self.backend.get_contact_sheet(dds_paths, is_dump_image, columns, tile_height)
+
+    def get_deep_zoom_info(self, dds_path, is_dump_image):
+        logging.debug(f"get_deep_zoom_info called for path: {dds_path}")
+        return self.backend.get_deep_zoom_info(dds_path, is_dump_image)
+
+    def get_deep_zoom_tiles(self, dds_path, is_dump_image, level, tiles):
+        logging.debug(f"get_deep_zoom_tiles called for {len(tiles)} tiles of level {level} of: {dds_path}")
+        return self.backend.get_deep_zoom_tiles(dds_path, is_dump_image, level, tiles)
+
+    def cancel_display_batch(self, request_id):
+        """Stops converting the rest of a batch, e.g. when its page has been scrolled away."""
+        logging.debug(f"cancel_display_batch called for: {request_id}")
+        self._display_requests.discard(request_id)
+        return {"success": True}
+
+    def _run_display_batch(self, request_id, dds_paths, is_dump_image):
+        def on_batch(images):
+            if request_id not in self._display_requests:
+                return False
+            self._emit_event("displayImageBatch", {"request_id": request_id, "images": images})
+
+        def on_error(path, error):
+            self._emit_event("displayImageError", {"request_id": request_id, "path": path, "error": error})
+
+        try:
+            result = self.backend.render_display_images(dds_paths, is_dump_image, on_batch, on_error)
+        except Exception as e:
+            # The frontend waits for the completion event, so it is sent whatever went wrong.
+            logging.exception(f"Display batch {request_id} failed")
+            result = {"success": False, "error": str(e)}
+        finally:
+            self._display_requests.discard(request_id)
+        self._emit_event("displayImageComplete", {"request_id": request_id, **result})
+
+    def get_cached_image_list(self, folder_type):
+        """Returns the last saved listing at once and reconciles it with the folder in the background.
+
+        Only the differences from the returned listing are sent afterwards, as an `imageListDiff`
+        event on the window carrying the returned request_id in its detail.
+        """
+        logging.debug(f"get_cached_image_list called with type: {folder_type}")
+        result = self.backend.get_cached_image_list(folder_type)
+        if self.window:
+            request_id = uuid.uuid4().hex
+            threading.Thread(
+                target=self._run_reconcile,
+                args=(folder_type, request_id, result),
+                name="hohatch-reconcile",
+                daemon=True,
+            ).start()
+            result = {**result, "request_id": request_id}
+        return result
+
+    def _run_reconcile(self, folder_type, request_id, served=None):
+        result = self.backend.reconcile_image_list(folder_type, served)
+        self._emit_event("imageListDiff", {"request_id": request_id, "folder_type": folder_type, **result})
+
+    def start_image_scan(self, folder_type):
+        """Scans a folder in the background and streams the images to the frontend.
+
+        The window receives `imageScanBatch` events while the scan runs and a final
+        `imageScanComplete` event, both carrying the returned scan_id in their detail.
+        """
+        logging.debug(f"start_image_scan called with type: {folder_type}")
+        if not self.window:
+            return {"success": False, "error": "Window object not set."}
+        scan_id = uuid.uuid4().hex
+        self._scan_ids[folder_type] = scan_id
+        threading.Thread(
+            target=self._run_image_scan, args=(folder_type, scan_id), name="hohatch-image-scan", daemon=True
+        ).start()
+        return {"success": True, "scan_id": scan_id}
+
+    def _run_image_scan(self, folder_type, scan_id):
+        def on_batch(images):
+            if self._scan_ids.get(folder_type) != scan_id:
+                return False
+            self._emit_event("imageScanBatch", {"scan_id": scan_id, "folder_type": folder_type, "images": images})
+
+        result = self.backend.scan_images(folder_type, on_batch)
+        self._emit_event("imageScanComplete", {"scan_id": scan_id, "folder_type": folder_type, **result})
+
+    def _emit_event(self, name, detail):
+        """Dispatches a CustomEvent with a JSON detail on the frontend window."""
+        if not self.window:
+            return
+        script = f"window.dispatchEvent(new CustomEvent({json.dumps(name)}, {{detail: {json.dumps(detail)}}}));"
+        try:
+            self.window.evaluate_js(script)
+        except Exception as e:
+            logging.warning(f"Failed to emit {name} event: {e}")
+
     def get_image_counts(self):
         logging.debug("get_image_counts called")
         return self.backend.get_image_counts()
@@ -151,6 +283,36 @@ class Api:
         logging.debug("batch_download_selected_dds_as_jpg called")
         return self.backend.batch_download_selected_dds_as_jpg(dds_path_list, output_folder)
 
+    def batch_download_selected_dds_as_zip(self, dds_path_list, output_zip_path):
+        if isinstance(output_zip_path, (list, tuple)) and output_zip_path:
+            output_zip_path = output_zip_path[0]
+        logging.debug("batch_download_selected_dds_as_zip called")
+        return self.backend.batch_download_selected_dds_as_zip(dds_path_list, output_zip_path)
+
+    def get_pending_batch_jobs(self):
+        logging.debug("get_pending_batch_jobs called")
+        return self.backend.get_pending_batch_jobs()
+
+    def resume_batch_job(self, job_id):
+        logging.debug(f"resume_batch_job called for job: {job_id}")
+        return self.backend.resume_batch_job(job_id)
+
+    def discard_batch_job(self, job_id):
+        logging.debug(f"discard_batch_job called for job: {job_id}")
+        return self.backend.discard_batch_job(job_id)
+
+    def export_mod_pack(self, output_path):
+        if isinstance(output_path, (list, tuple)) and output_path:
+            output_path = output_path[0]
+        logging.debug(f"export_mod_pack called with output: {output_path}")
+        return self.backend.export_mod_pack(output_path)
+
+    def import_mod_pack(self, pack_path):
+        if isinstance(pack_path, (list, tuple)) and pack_path:
+            pack_path = pack_path[0]
+        logging.debug(f"import_mod_pack called for pack: {pack_path}")
+        return self.backend.import_mod_pack(pack_path)
+
     def delete_dds_file(self, dds_path_str):
         logging.debug(f"delete_dds_file called for path: {dds_path_str}")
         return self.backend.delete_dds_file(dds_path_str)
@@ -159,6 +321,10 @@ class Api:
         logging.debug("batch_delete_selected_dds_files called")
         return self.backend.batch_delete_selected_dds_files(dds_path_list)
 
+    def undo_delete(self, undo_id):
+        logging.debug(f"undo_delete called for: {undo_id}")
+        return self.backend.undo_delete(undo_id)
+
     def open_dump_folder(self):
         logging.debug("open_dump_folder called")
         dump_folder_path = self.backend.get_dump_folder_path()
@@ -210,6 +376,10 @@ class Api:
         logging.debug("open_log_folder called")
         return self.backend.open_log_folder()
 
+    def get_metrics(self):
+        logging.debug("get_metrics called")
+        return self.backend.get_metrics()
+
     def notify_settings_changed(self):
         logging.debug("notify_settings_changed called")
         if self.window:
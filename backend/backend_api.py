@@ -1,40 +1,112 @@
 import logging
 import os
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
+from backend.dto import ImageListing
+from backend.events import FILE_REPLACED, EventBus, FileEvent
 from backend.services import (
+    CacheMaintainer,
     ConfigService,
     DownloadService,
     FileService,
     ImageService,
     ImageDiscoveryService,
+    JobJournalService,
+    ModPackService,
     TexconvService,
 )
-from backend.exceptions import HoHatchError, FileSystemError
+from backend.exceptions import HoHatchError, FileSystemError, TexconvTimeoutError
+from backend.metrics import instrumented, metrics
 
 
+@instrumented("backend")
 class BackendApi:
     """The main backend facade that orchestrates all services."""
 
+    STARTUP_WAIT_SECONDS = 60
+    # Streamed scan results are coalesced into batches of at most this many images, sent at most
+    # every SCAN_BATCH_INTERVAL_SECONDS; the first batch is sent as soon as it is found.
+    SCAN_BATCH_MAX_IMAGES = 500
+    SCAN_BATCH_INTERVAL_SECONDS = 0.1
+    # Deleted files stay in the trash, and can be restored with undo_delete, for this long.
+    UNDO_DELETE_SECONDS = 30
+    # Thumbnails rendered for convert_dds_for_display_batch are sent in batches of at most this
+    # many images, at most every DISPLAY_BATCH_INTERVAL_SECONDS, by this many workers. How many of
+    # them convert at once is decided by the adaptive limiter of the conversion engines.
+    DISPLAY_BATCH_MAX_IMAGES = 50
+    DISPLAY_BATCH_INTERVAL_SECONDS = 0.25
+    DISPLAY_WORKERS = os.cpu_count() or 2
+    # Default layout of get_contact_sheet: a 10-column grid of 128 px high tiles.
+    CONTACT_SHEET_COLUMNS = 10
+    CONTACT_SHEET_TILE_HEIGHT = 128
+    # Layouts the frontend may ask for; anything outside them would only make huge or useless sheets.
+    CONTACT_SHEET_MAX_COLUMNS = 100
+    CONTACT_SHEET_TILE_HEIGHT_RANGE = (16, 1024)
+
     def __init__(self):
         logging.info("Initializing BackendApi...")
         self.config_service = ConfigService()
-        self.file_service = FileService(self.config_service)
+        self.events = EventBus()
+        self.file_service = FileService(self.config_service, self.events)
         self.download_service = DownloadService(self.config_service)
         self.image_service = ImageService(self.config_service)
         self.image_discovery_service = ImageDiscoveryService(self.config_service)
         self.texconv_service = TexconvService(self.config_service, self.file_service, self.image_service)
+        self.mod_pack_service = ModPackService(self.file_service)
+        self.job_journal_service = JobJournalService()
+        self.cache_maintainer = CacheMaintainer(self.events, self.texconv_service, self.image_discovery_service)
         self.last_image_dir = Path.home()
+        self._pending_deletes: Dict[str, Any] = {}
+        self._pending_deletes_lock = threading.Lock()
+        self._display_executor: ThreadPoolExecutor | None = None
+        self._display_executor_lock = threading.Lock()
 
         settings = self.config_service.get_settings()
         self.temp_base_dir = Path(settings.texconv_executable_path).parent / "temp"
-        self.clean_temp_directories()
 
-        self._ensure_texconv_exists()
+        # Temp cleanup and the texconv check (which may download it) run in the background,
+        # so the window can paint immediately, even offline.
+        self._startup_status: Dict[str, Any] = {"state": "pending", "texconv_available": None, "error": None}
+        self._startup_done = threading.Event()
+        self._startup_thread = threading.Thread(target=self._run_startup_tasks, name="hohatch-startup", daemon=True)
+        self._startup_thread.start()
         logging.info("BackendApi initialized successfully.")
 
-    def _ensure_texconv_exists(self):
+    def _run_startup_tasks(self):
+        self._startup_status["state"] = "running"
+        try:
+            with metrics.timer("startup.clean_temp"):
+                self.clean_temp_directories()
+                self.file_service.purge_leftover_trash(
+                    [p for p in (self.get_dump_folder_path(), self.get_inject_folder_path()) if p]
+                )
+            with metrics.timer("startup.ensure_texconv"):
+                self._startup_status["texconv_available"] = self._ensure_texconv_exists()
+            self._startup_status["state"] = "ready"
+            logging.info("Background startup tasks finished.")
+        except Exception as e:
+            logging.exception("Background startup tasks failed.")
+            self._startup_status.update(state="failed", error=str(e))
+        finally:
+            self._startup_done.set()
+
+    def _await_startup(self):
+        """Blocks texconv-dependent calls until the temp folder is clean and texconv has been checked."""
+        if not self._startup_done.wait(timeout=self.STARTUP_WAIT_SECONDS):
+            logging.warning("Startup tasks are still running; continuing without waiting.")
+
+    def wait_for_startup(self, timeout: float | None = None) -> bool:
+        return self._startup_done.wait(timeout)
+
+    def get_startup_status(self):
+        return {"success": True, **self._startup_status}
+
+    def _ensure_texconv_exists(self) -> bool:
         settings = self.config_service.get_settings()
         texconv_path = Path(settings.texconv_executable_path)
         if not (texconv_path.is_file() and os.access(texconv_path, os.X_OK)):
@@ -44,6 +116,8 @@ class BackendApi:
                 logging.info("Texconv downloaded successfully during initialization.")
             except HoHatchError as e:
                 logging.error(f"Failed to auto-download texconv: {e.message}")
+                return False
+        return True
 
     def _handle_error(self, e: Exception, message: str = "An unexpected error occurred."):
         logging.error(f"{message}: {e}")
@@ -94,17 +168,55 @@ class BackendApi:
 
     def delete_dds_file(self, dds_path_str: str):
         try:
-            self.file_service.delete_file(dds_path_str)
-            return {"success": True}
+            batch = self.file_service.delete_file(dds_path_str)
+            return {"success": True, **self._schedule_purge(batch)}
         except HoHatchError as e:
             return self._handle_error(e, f"Failed to delete {dds_path_str}")
 
     def batch_delete_selected_dds_files(self, dds_path_list: List[str]):
         try:
-            self.file_service.batch_delete_files(dds_path_list)
-            return {"success": True}
+            batch = self.file_service.batch_delete_files(dds_path_list)
+            undo = self._schedule_purge(batch)
         except HoHatchError as e:
             return self._handle_error(e, "Failed to delete selected files")
+        if batch.errors:
+            # The files that were deleted can still be restored, so the undo is returned with the errors.
+            error = FileSystemError("Failed to delete one or more files: " + ", ".join(batch.errors))
+            return {**self._handle_error(error, "Failed to delete selected files"), "errors": batch.errors, **undo}
+        return {"success": True, **undo}
+
+    def undo_delete(self, undo_id: str):
+        with self._pending_deletes_lock:
+            pending = self._pending_deletes.pop(undo_id, None)
+        if pending is None:
+            return {"success": False, "error": "The delete can no longer be undone."}
+        batch, timer = pending
+        timer.cancel()
+        try:
+            return {"success": True, "restored": self.file_service.restore_trash_batch(batch)}
+        except HoHatchError as e:
+            result = self._handle_error(e, "Failed to undo delete")
+            # Items that could not be put back stay in the trash, and the undo can be retried.
+            if batch.in_trash():
+                result.update(self._schedule_purge(batch))
+            return result
+
+    def _schedule_purge(self, batch) -> Dict[str, Any]:
+        timer = threading.Timer(self.UNDO_DELETE_SECONDS, self._purge_deleted, args=(batch.batch_id,))
+        timer.daemon = True
+        with self._pending_deletes_lock:
+            self._pending_deletes[batch.batch_id] = (batch, timer)
+        timer.start()
+        return {"undo_id": batch.batch_id, "undo_seconds": self.UNDO_DELETE_SECONDS}
+
+    def _purge_deleted(self, batch_id: str):
+        with self._pending_deletes_lock:
+            pending = self._pending_deletes.pop(batch_id, None)
+        if pending is None:
+            return
+        batch, _ = pending
+        # Publishes a delete event per item, which drops the cached thumbnails.
+        self.file_service.purge_trash_batch(batch)
 
     # dump folder
     def get_dump_folder_path(self) -> str | None:
@@ -141,6 +253,7 @@ class BackendApi:
 
     def clear_cache(self):
         try:
+            self.image_service.close_thumbnail_store()
             self.file_service.clean_directory(self.image_service.cache_dir)
             return {"success": True, "message": "Cache cleared successfully."}
         except HoHatchError as e:
@@ -172,38 +285,287 @@ class BackendApi:
             return {"success": True, "message_key": "language_set_success", "lang": lang}
         return {"success": False, "error": "Language not supported."}
 
-    def get_image_list(self, folder_type: str, use_hash_check: bool = False):
+    def get_image_list(
+        self, folder_type: str, use_hash_check: bool = False, compact: bool = False, include_metadata: bool = False
+    ):
         try:
+            if compact:
+                listing = self.image_discovery_service.discover_listing(folder_type, include_metadata)
+                if not listing:
+                    return {"success": True, "format": "columnar", "base": "", "paths": []}
+                logging.info(f"Loaded {len(listing.paths)} images for folder_type='{folder_type}' (compact).")
+                result = {"success": True, **listing.to_dict()}
+                if use_hash_check:
+                    paths = [f"{listing.base}/{path}" for path in listing.paths]
+                    result["stale_count"] = self._verify_display_cache(folder_type, paths)
+                return result
+
             images = self.image_discovery_service.discover_images(folder_type)
             logging.info(f"Loaded {len(images)} images for folder_type='{folder_type}'.")
-            for image in images:
-                logging.debug(f"  - Loaded {folder_type} image: {image.path}")
-            return {"success": True, "images": [img.__dict__ for img in images]}
+            if images:
+                logging.debug(f"  - First {folder_type} images: {', '.join(img.alt for img in images[:5])}")
+            result = {"success": True, "images": [img.__dict__ for img in images]}
+            if use_hash_check:
+                result["stale_count"] = self._verify_display_cache(folder_type, [img.path for img in images])
+            return result
         except HoHatchError as e:
             return self._handle_error(e, f"Failed to get image list for {folder_type}")
 
+    def _verify_display_cache(self, folder_type: str, dds_paths: List[str]) -> int:
+        """Finds thumbnails whose DDS has changed and regenerates them in the background."""
+        is_dump_image = folder_type == "dump"
+        base_dir_str = (
+            self.image_discovery_service.get_dump_folder_path()
+            if is_dump_image
+            else self.image_discovery_service.get_inject_folder_path()
+        )
+        if not base_dir_str or not dds_paths:
+            return 0
+        base_dir = Path(base_dir_str)
+        result = self.texconv_service.find_stale_cache_entries(dds_paths, is_dump_image, base_dir)
+        stale = result["stale"]
+        logging.info(f"Verified {result['checked']} cached {folder_type} thumbnails; {len(stale)} stale.")
+        if stale:
+            threading.Thread(
+                target=self._regenerate_thumbnails,
+                args=(stale, is_dump_image, base_dir),
+                name="hohatch-cache-regen",
+                daemon=True,
+            ).start()
+        return len(stale)
+
+    def _regenerate_thumbnails(self, dds_paths: List[str], is_dump_image: bool, base_dir: Path):
+        self._await_startup()
+        for dds_path in dds_paths:
+            try:
+                # Nobody is waiting on these, so they queue behind the thumbnails a user asked for.
+                self.texconv_service.get_displayable_image(dds_path, is_dump_image, base_dir, interactive=False)
+            except HoHatchError as e:
+                logging.warning(f"Failed to regenerate thumbnail for {dds_path}: {e.message}")
+        logging.info(f"Regenerated {len(dds_paths)} stale thumbnails.")
+
+    def get_cached_image_list(self, folder_type: str):
+        """Returns the listing saved by the last reconcile without touching the image folders."""
+        try:
+            listing = self.image_discovery_service.load_snapshot(folder_type)
+            if not listing:
+                return {"success": True, "snapshot": False, "format": "columnar", "base": "", "paths": []}
+            logging.info(f"Loaded {len(listing.paths)} images for folder_type='{folder_type}' from snapshot.")
+            return {"success": True, "snapshot": True, **listing.to_dict()}
+        except HoHatchError as e:
+            return self._handle_error(e, f"Failed to load cached image list for {folder_type}")
+
+    def reconcile_image_list(self, folder_type: str, served: Optional[Dict[str, Any]] = None):
+        """Diffs a folder against the listing get_cached_image_list returned, or the saved snapshot without one."""
+        try:
+            served_listing = None
+            if served is not None:
+                served_listing = ImageListing(
+                    base=served.get("base", ""),
+                    paths=served.get("paths", []),
+                    sizes=served.get("sizes"),
+                    mtimes=served.get("mtimes"),
+                )
+            diff = self.image_discovery_service.reconcile_listing(folder_type, served_listing)
+            if diff is None:
+                return {"success": True, "base": "", "added": [], "removed": [], "changed": []}
+            logging.info(
+                f"Reconciled {folder_type} listing: {len(diff['added'])} added, "
+                f"{len(diff['removed'])} removed, {len(diff['changed'])} changed."
+            )
+            return {"success": True, **diff}
+        except HoHatchError as e:
+            return self._handle_error(e, f"Failed to reconcile image list for {folder_type}")
+
+    def scan_images(self, folder_type: str, on_batch: Callable[[List[Dict[str, Any]]], Any]):
+        """Streams the images of a folder to on_batch while the folder is still being scanned.
+
+        on_batch may return False to cancel the scan, e.g. when a newer scan has replaced it.
+        """
+        start = time.perf_counter()
+        total, buffer, last_flush = 0, [], 0.0
+        try:
+            for batch in self.image_discovery_service.iter_images(folder_type):
+                buffer.extend(img.__dict__ for img in batch)
+                now = time.perf_counter()
+                if len(buffer) < self.SCAN_BATCH_MAX_IMAGES and now - last_flush < self.SCAN_BATCH_INTERVAL_SECONDS:
+                    continue
+                total += len(buffer)
+                if on_batch(buffer) is False:
+                    logging.info(f"Scan of folder_type='{folder_type}' cancelled after {total} images.")
+                    return {"success": True, "cancelled": True, "total": total}
+                buffer, last_flush = [], now
+            if buffer:
+                total += len(buffer)
+                on_batch(buffer)
+        except HoHatchError as e:
+            return self._handle_error(e, f"Failed to scan images for {folder_type}")
+        seconds = time.perf_counter() - start
+        logging.info(f"Scanned {total} images for folder_type='{folder_type}' in {seconds:.2f} s.")
+        return {"success": True, "cancelled": False, "total": total, "seconds": round(seconds, 3)}
+
     def get_image_counts(self):
         try:
             return {"success": True, **self.image_discovery_service.get_image_counts()}
         except HoHatchError as e:
             return self._handle_error(e, "Failed to get image counts")
 
+    def _display_base_dir(self, is_dump_image: bool) -> Path:
+        base_dir_str = (
+            self.image_discovery_service.get_dump_folder_path()
+            if is_dump_image
+            else self.image_discovery_service.get_inject_folder_path()
+        )
+        if not base_dir_str:
+            raise FileSystemError(f"Could not determine base directory for {'dump' if is_dump_image else 'inject'}")
+        return Path(base_dir_str)
+
     def convert_dds_for_display(self, dds_path_str: str, is_dump_image: bool):
+        self._await_startup()
         try:
-            base_dir_str = (
-                self.image_discovery_service.get_dump_folder_path()
-                if is_dump_image
-                else self.image_discovery_service.get_inject_folder_path()
-            )
-            if not base_dir_str:
-                raise FileSystemError(f"Could not determine base directory for {'dump' if is_dump_image else 'inject'}")
-            base_dir = Path(base_dir_str)
+            base_dir = self._display_base_dir(is_dump_image)
             src = self.texconv_service.get_displayable_image(dds_path_str, is_dump_image, base_dir)
             return {"success": True, "src": src}
         except HoHatchError as e:
             return self._handle_error(e, f"Failed to convert {dds_path_str} for display")
 
+    def convert_dds_for_display_batch(self, dds_paths: List[str], is_dump_image: bool):
+        """Serves every cached thumbnail of dds_paths in one response.
+
+        Textures that still have to be converted are listed under "missing", for render_display_images.
+        """
+        self._await_startup()
+        try:
+            base_dir = self._display_base_dir(is_dump_image)
+        except HoHatchError as e:
+            return self._handle_error(e, "Failed to convert images for display")
+        images: Dict[str, str] = {}
+        missing: List[str] = []
+        errors: Dict[str, str] = {}
+        for dds_path in dds_paths:
+            try:
+                src = self.texconv_service.get_cached_display_image(dds_path, is_dump_image, base_dir)
+            except HoHatchError as e:
+                logging.warning(f"Failed to read cached display image of {dds_path}: {e.message}")
+                errors[dds_path] = e.message
+                continue
+            if src is None:
+                missing.append(dds_path)
+            else:
+                images[dds_path] = src
+        return {"success": True, "images": images, "missing": missing, "errors": errors}
+
+    def get_contact_sheet(
+        self, dds_paths: List[str], is_dump_image: bool, columns: int | None = None, tile_height: int | None = None
+    ):
+        """Renders a page of textures as one sprite sheet, with a map of where each texture's tile is."""
+        self._await_startup()
+        columns = self.CONTACT_SHEET_COLUMNS if columns is None else columns
+        tile_height = self.CONTACT_SHEET_TILE_HEIGHT if tile_height is None else tile_height
+        min_height, max_height = self.CONTACT_SHEET_TILE_HEIGHT_RANGE
+        try:
+            if type(columns) is not int or not 1 <= columns <= self.CONTACT_SHEET_MAX_COLUMNS:
+                raise HoHatchError(f"Contact sheet columns must be between 1 and {self.CONTACT_SHEET_MAX_COLUMNS}.")
+            if type(tile_height) is not int or not min_height <= tile_height <= max_height:
+                raise HoHatchError(f"Contact sheet tile height must be between {min_height} and {max_height} px.")
+            base_dir = self._display_base_dir(is_dump_image)
+            sheet = self.texconv_service.get_contact_sheet(
+                dds_paths, is_dump_image, base_dir, columns, tile_height, workers=self.DISPLAY_WORKERS
+            )
+            return {"success": True, **sheet}
+        except HoHatchError as e:
+            return self._handle_error(e, f"Failed to render a contact sheet of {len(dds_paths)} images")
+
+    def get_deep_zoom_info(self, dds_path: str, is_dump_image: bool):
+        """Returns the dimensions of the full-resolution tile pyramid of a texture; tiles render on demand."""
+        self._await_startup()
+        try:
+            base_dir = self._display_base_dir(is_dump_image)
+            info = self.texconv_service.get_deep_zoom_info(dds_path, is_dump_image, base_dir)
+            return {"success": True, **{k: v for k, v in info.items() if k != "key"}}
+        except HoHatchError as e:
+            return self._handle_error(e, f"Failed to prepare deep-zoom preview of {dds_path}")
+
+    def get_deep_zoom_tiles(self, dds_path: str, is_dump_image: bool, level: int, tiles: List[List[int]]):
+        """Returns only the requested [col, row] tiles of a pyramid level, e.g. those in the viewport."""
+        self._await_startup()
+        try:
+            base_dir = self._display_base_dir(is_dump_image)
+            images = self.texconv_service.get_deep_zoom_tiles(dds_path, is_dump_image, base_dir, level, tiles)
+            return {"success": True, "level": level, "tiles": images}
+        except HoHatchError as e:
+            return self._handle_error(e, f"Failed to load deep-zoom tiles of {dds_path}")
+
+    def _get_display_executor(self) -> ThreadPoolExecutor:
+        # One pool for all display batches, so pages requested in quick succession share the workers.
+        with self._display_executor_lock:
+            if self._display_executor is None:
+                self._display_executor = ThreadPoolExecutor(
+                    max_workers=self.DISPLAY_WORKERS, thread_name_prefix="hohatch-display"
+                )
+            return self._display_executor
+
+    def render_display_images(
+        self,
+        dds_paths: List[str],
+        is_dump_image: bool,
+        on_batch: Callable[[Dict[str, str]], Any],
+        on_error: Optional[Callable[[str, str], Any]] = None,
+    ):
+        """Converts dds_paths for display in parallel and hands the results to on_batch as {path: src} batches.
+
+        on_batch may return False to cancel the conversions that have not started yet. A path that
+        cannot be converted, for whatever reason, is passed to on_error with its message as soon as
+        it fails, and the other paths carry on.
+        """
+        self._await_startup()
+        start = time.perf_counter()
+        try:
+            base_dir = self._display_base_dir(is_dump_image)
+        except HoHatchError as e:
+            return self._handle_error(e, "Failed to convert images for display")
+        executor = self._get_display_executor()
+        futures = {
+            executor.submit(self.texconv_service.render_display_image, path, is_dump_image, base_dir): path
+            for path in dds_paths
+        }
+        pending = set(futures)
+        buffer: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        total, last_flush = 0, start
+        while pending:
+            done, pending = wait(pending, timeout=self.DISPLAY_BATCH_INTERVAL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = futures[future]
+                try:
+                    buffer[path] = future.result()
+                    continue
+                except HoHatchError as e:
+                    logging.warning(f"Failed to convert {path} for display: {e.message}")
+                    errors[path] = e.message
+                except Exception as e:
+                    # e.g. an encoder error; it must not end the batch for the other paths.
+                    logging.exception(f"Unexpected error converting {path} for display")
+                    errors[path] = f"Failed to convert {Path(path).name} for display: {e}"
+                if on_error:
+                    on_error(path, errors[path])
+            now = time.perf_counter()
+            due = now - last_flush >= self.DISPLAY_BATCH_INTERVAL_SECONDS
+            if not buffer or (pending and not due and len(buffer) < self.DISPLAY_BATCH_MAX_IMAGES):
+                continue
+            total += len(buffer)
+            if on_batch(buffer) is False:
+                for future in pending:
+                    future.cancel()
+                logging.info(f"Display batch cancelled after {total} of {len(dds_paths)} images.")
+                return {"success": True, "cancelled": True, "total": total, "errors": errors}
+            buffer, last_flush = {}, now
+        seconds = time.perf_counter() - start
+        logging.info(f"Rendered {total} display images in {seconds:.2f} s.")
+        return {"success": True, "cancelled": False, "total": total, "errors": errors, "seconds": round(seconds, 3)}
+
     def convert_single_dds_to_jpg(self, dds_path: str, output_folder: str):
+        self._await_startup()
         try:
             output_filename = f"{Path(dds_path).stem}.jpg"
             output_file_path = str(Path(output_folder) / output_filename)
@@ -214,43 +576,148 @@ class BackendApi:
 
     def batch_download_selected_dds_as_jpg(self, dds_path_list: List[str], output_folder: str):
         try:
-            for dds_path in dds_path_list:
-                output_filename = f"{Path(dds_path).stem}.jpg"
-                output_file_path = str(Path(output_folder) / output_filename)
-                self.texconv_service.convert_to_jpg(dds_path, output_file_path)
+            job = self.job_journal_service.start_job("export_jpg", dds_path_list, {"output_folder": output_folder})
+        except HoHatchError as e:
+            return self._handle_error(e, "Failed to start batch conversion")
+        return self._run_batch_job(job)
+
+    def batch_download_selected_dds_as_zip(self, dds_path_list: List[str], output_zip_path: str):
+        try:
+            job = self.job_journal_service.start_job("export_zip", dds_path_list, {"output_path": output_zip_path})
+        except HoHatchError as e:
+            return self._handle_error(e, "Failed to start batch conversion")
+        return self._run_batch_job(job)
+
+    def get_pending_batch_jobs(self):
+        try:
+            return {"success": True, "jobs": self.job_journal_service.list_pending_jobs()}
+        except HoHatchError as e:
+            return self._handle_error(e, "Failed to list pending batch jobs")
+
+    def resume_batch_job(self, job_id: str):
+        try:
+            job = self.job_journal_service.load_job(job_id)
+        except HoHatchError as e:
+            return self._handle_error(e, f"Failed to resume batch job {job_id}")
+        logging.info(f"Resuming batch job {job_id}: {len(job.completed)}/{len(job.items)} already done.")
+        return self._run_batch_job(job)
+
+    def discard_batch_job(self, job_id: str):
+        try:
+            self.job_journal_service.discard_job(job_id)
             return {"success": True}
         except HoHatchError as e:
-            return self._handle_error(e, "Failed during batch conversion")
+            return self._handle_error(e, f"Failed to discard batch job {job_id}")
+
+    def _run_batch_job(self, job):
+        self._await_startup()
+        try:
+            if job.kind == "export_jpg":
+                skipped = self._export_jpg_files(job)
+            elif job.kind == "export_zip":
+                skipped = self._export_jpg_zip(job)
+            else:
+                raise HoHatchError(f"Unknown batch job kind: {job.kind}")
+        except HoHatchError as e:
+            job.close()
+            return {**self._handle_error(e, "Failed during batch conversion"), "job_id": job.job_id}
+        if skipped:
+            # The journal is kept so the timed-out items can be retried with resume_batch_job.
+            job.close()
+            logging.warning(f"Batch job {job.job_id} skipped {len(skipped)} items that timed out.")
+            return {"success": True, "skipped": skipped, "job_id": job.job_id}
+        job.finish()
+        return {"success": True}
+
+    def _export_jpg_files(self, job) -> List[str]:
+        output_folder = job.params["output_folder"]
+        skipped = []
+        for index, dds_path in job.pending_items():
+            output_filename = f"{Path(dds_path).stem}.jpg"
+            output_file_path = str(Path(output_folder) / output_filename)
+            try:
+                self.texconv_service.convert_to_jpg(dds_path, output_file_path)
+            except TexconvTimeoutError as e:
+                logging.warning(f"Skipping {dds_path}: {e.message}")
+                skipped.append(dds_path)
+                continue
+            job.mark_done(index)
+        return skipped
+
+    def _export_jpg_zip(self, job) -> List[str]:
+        output_path = Path(job.params["output_path"])
+        entry_names = self._zip_entry_names(job.items)
+        # A resumed job appends to the archive it left behind, unless that archive was never finalized.
+        if job.completed and not zipfile.is_zipfile(output_path):
+            job.completed.clear()
+        mode = "a" if job.completed else "w"
+        skipped = []
+        try:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with zipfile.ZipFile(output_path, mode, compression=zipfile.ZIP_STORED) as zf:
+                for index, dds_path in job.pending_items():
+                    # The entry is only opened once texconv has succeeded, so a failed conversion
+                    # never leaves a truncated entry in the archive.
+                    try:
+                        with self.texconv_service.open_as_image(dds_path) as img:
+                            zinfo = zipfile.ZipInfo(entry_names[index], date_time=time.localtime()[:6])
+                            with zf.open(zinfo, "w") as entry:
+                                img.save(entry, format="JPEG")
+                    except TexconvTimeoutError as e:
+                        logging.warning(f"Skipping {dds_path}: {e.message}")
+                        skipped.append(dds_path)
+                        continue
+                    job.mark_done(index)
+        except (OSError, zipfile.BadZipFile) as e:
+            raise FileSystemError(f"Failed to write zip archive {output_path}: {e}")
+        return skipped
+
+    @staticmethod
+    def _zip_entry_names(dds_path_list: List[str]) -> List[str]:
+        names, seen = [], set()
+        for dds_path in dds_path_list:
+            stem = Path(dds_path).stem
+            name, n = f"{stem}.jpg", 1
+            while name.lower() in seen:
+                n += 1
+                name = f"{stem}_{n}.jpg"
+            seen.add(name.lower())
+            names.append(name)
+        return names
 
     def replace_dds(self, target_dds_path: str, replacement_image_path: str, is_dump_image: bool):
+        self._await_startup()
         logging.info(f"Starting DDS replacement process for target: {target_dds_path}")
         logging.info(f"Replacement image: {replacement_image_path}")
         logging.info(f"Is dump image: {is_dump_image}")
         try:
-            temp_dir = self.temp_base_dir / f"replace_{Path(target_dds_path).stem}"
-            logging.info(f"Using temporary directory: {temp_dir}")
-            self.file_service.clean_directory(temp_dir)
-
-            logging.info("Converting replacement image to DDS...")
-            final_dds = self.texconv_service.convert_to_dds(
-                replacement_image_path, str(temp_dir), Path(target_dds_path).name
-            )
-            logging.info(f"Successfully converted to DDS: {final_dds}")
-
-            if is_dump_image:
-                inject_folder = self.image_discovery_service.get_inject_folder_path()
-                if not inject_folder:
-                    logging.error("Could not determine inject folder path.")
-                    raise FileSystemError("Could not determine inject folder path.")
-                logging.info(f"Target inject folder: {inject_folder}")
-                final_path = Path(inject_folder) / Path(final_dds).name
-                self.file_service.move_file(final_dds, str(final_path))
-
-                logging.info(f"Deleting original dump image: {target_dds_path}")
-                self.file_service.delete_file(target_dds_path)
-            else:
-                final_path = Path(target_dds_path)
-                self.file_service.move_file(final_dds, str(final_path))
+            with self.file_service.scratch_dir() as scratch_dir:
+                logging.info(f"Using scratch directory: {scratch_dir}")
+                logging.info("Converting replacement image to DDS...")
+                source_pixels = []
+                final_dds = self.texconv_service.convert_to_dds(
+                    replacement_image_path, str(scratch_dir), Path(target_dds_path).name, on_image=source_pixels.append
+                )
+                logging.info(f"Successfully converted to DDS: {final_dds}")
+
+                if is_dump_image:
+                    inject_folder = self.image_discovery_service.get_inject_folder_path()
+                    if not inject_folder:
+                        logging.error("Could not determine inject folder path.")
+                        raise FileSystemError("Could not determine inject folder path.")
+                    logging.info(f"Target inject folder: {inject_folder}")
+                    final_path = Path(inject_folder) / Path(final_dds).name
+                    self.file_service.move_file(final_dds, str(final_path))
+
+                    logging.info(f"Deleting original dump image: {target_dds_path}")
+                    self._schedule_purge(self.file_service.delete_file(target_dds_path))
+                else:
+                    final_path = Path(target_dds_path)
+                    self.file_service.move_file(final_dds, str(final_path))
+
+                # The new thumbnail is cached from the pixels the DDS was just encoded from.
+                image = source_pixels[0] if source_pixels else None
+                self.events.publish(FileEvent(FILE_REPLACED, str(final_path), image=image))
 
             logging.info(f"DDS replacement successful. Final path: {final_path}")
             return {"success": True, "output_path": str(final_path)}
@@ -258,6 +725,26 @@ class BackendApi:
             logging.error(f"Failed to replace DDS file: {e.message}")
             return self._handle_error(e, "Failed to replace DDS file")
 
+    def export_mod_pack(self, output_path: str):
+        try:
+            inject_folder = self.image_discovery_service.get_inject_folder_path()
+            if not inject_folder:
+                raise FileSystemError("Could not determine inject folder path.")
+            result = self.mod_pack_service.export_pack(Path(inject_folder), Path(output_path))
+            return {"success": True, "output_path": output_path, **result}
+        except HoHatchError as e:
+            return self._handle_error(e, "Failed to export mod pack")
+
+    def import_mod_pack(self, pack_path: str):
+        try:
+            inject_folder = self.image_discovery_service.get_inject_folder_path()
+            if not inject_folder:
+                raise FileSystemError("Could not determine inject folder path.")
+            result = self.mod_pack_service.import_pack(Path(pack_path), Path(inject_folder))
+            return {"success": True, **result}
+        except HoHatchError as e:
+            return self._handle_error(e, "Failed to import mod pack")
+
     def validate_sk_folder(self, path: str) -> Dict[str, Any]:
         is_valid = Path(path).is_dir() and (Path(path) / "SKIF.exe").is_file()
         return {"is_valid": is_valid}
@@ -272,6 +759,15 @@ class BackendApi:
         except HoHatchError as e:
             return self._handle_error(e, "Failed to check for updates")
 
+    def get_metrics(self):
+        return {
+            "success": True,
+            "metrics": metrics.snapshot(),
+            "texconv_slow_runs": list(self.texconv_service.slow_runs),
+            "engine_seconds": self.texconv_service.engines.snapshot(),
+            "engine_concurrency": self.texconv_service.engines.limiter.snapshot(),
+        }
+
     def notify_settings_changed(self):
         # This method is a placeholder for now.
         return {"success": True}
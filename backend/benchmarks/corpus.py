@@ -0,0 +1,83 @@
+"""Generates synthetic Special K texture dumps for benchmarking."""
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Sequence, Tuple
+
+from backend.dds import build_dds_header, full_mip_count, mip_levels, parse_dds_header
+
+SK_RES = Path("Profiles") / "Shadowverse Worlds Beyond" / "SK_Res"
+DUMP_SUBDIR = SK_RES / "dump" / "textures" / "ShadowverseWB.exe"
+INJECT_SUBDIR = SK_RES / "inject" / "textures"
+
+_payload_cache: Dict[Tuple[int, int, str, int], Tuple[bytes, bytes]] = {}
+
+
+@dataclass
+class Corpus:
+    root: Path
+    dump_dir: Path
+    inject_dir: Path
+    dump_count: int
+    inject_count: int
+    total_bytes: int
+
+
+def texture_bytes(width: int, height: int, format: str, mip_count: int = 0, seed: int = 0) -> bytes:
+    """Returns a complete DDS file with a full (or mip_count deep) mip chain of random block data.
+
+    The payload is generated once per shape and only its first bytes are varied by seed, so
+    writing large trees is I/O bound while every file still hashes differently.
+    """
+    mip_count = mip_count or full_mip_count(width, height)
+    key = (width, height, format, mip_count)
+    if key not in _payload_cache:
+        header = build_dds_header(width, height, format, mip_count)
+        size = sum(level[3] for level in mip_levels(parse_dds_header(header)))
+        _payload_cache[key] = (header, random.Random(str(key)).randbytes(size))
+    header, payload = _payload_cache[key]
+    return header + seed.to_bytes(8, "little") + payload[8:]
+
+
+def generate_corpus(
+    root: Path,
+    count: int,
+    formats: Sequence[str] = ("BC1_UNORM", "BC7_UNORM"),
+    size: int = 256,
+    txt_ratio: float = 0.25,
+    inject_ratio: float = 0.05,
+    seed: int = 0,
+) -> Corpus:
+    """Writes `count` dump textures (plus a share of inject textures) under a fake Special K folder.
+
+    A txt_ratio share of the dumps use Special K's DDS-TXT layout: a folder holding the
+    texture and a same-named .txt, which HoHatch deletes as a unit.
+    """
+    rng = random.Random(seed)
+    dump_dir, inject_dir = root / DUMP_SUBDIR, root / INJECT_SUBDIR
+    dump_dir.mkdir(parents=True, exist_ok=True)
+    inject_dir.mkdir(parents=True, exist_ok=True)
+    (root / "SKIF.exe").touch()
+
+    total_bytes = 0
+    inject_count = int(count * inject_ratio)
+    for index in range(count + inject_count):
+        name = f"{rng.getrandbits(64):016x}"
+        # Mix square and 53:64 card-shaped textures, as found in real dumps.
+        height = size
+        width = size if rng.random() < 0.5 else size * 53 // 64 // 4 * 4
+        data = texture_bytes(width, height, rng.choice(formats), seed=index)
+        if index >= count:
+            target = inject_dir / f"{name}.dds"
+        elif rng.random() < txt_ratio:
+            folder = dump_dir / name
+            folder.mkdir(exist_ok=True)
+            (folder / f"{name}.txt").write_text(f"Texture: {name}\nSize: {width}x{height}\n", encoding="utf-8")
+            target = folder / f"{name}.dds"
+        else:
+            target = dump_dir / f"{name}.dds"
+        target.write_bytes(data)
+        total_bytes += len(data)
+
+    return Corpus(root, dump_dir, inject_dir, count, inject_count, total_bytes)
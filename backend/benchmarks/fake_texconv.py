@@ -0,0 +1,80 @@
+"""A stand-in for texconv.exe that runs anywhere Python and Pillow do.
+
+Understands the subset of texconv's command line HoHatch uses (-o, -ft, -w, -h, -f, -m, -y, -r)
+and performs the real work with Pillow: DDS inputs are decoded and resized, image inputs are
+written out as DDS files with a full mip chain of synthetic block data. Process start-up cost
+is simulated with FAKE_TEXCONV_LATENCY_MS plus FAKE_TEXCONV_MS_PER_MPIX per megapixel read.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from PIL import Image  # noqa: E402
+
+from backend.benchmarks.corpus import texture_bytes  # noqa: E402
+
+
+def parse_args(argv):
+    options, inputs = {}, []
+    value_flags = {"-o", "-ft", "-w", "-h", "-f", "-m"}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in value_flags:
+            options[arg] = argv[i + 1]
+            i += 2
+        elif arg.startswith("-"):
+            options[arg] = True
+            i += 1
+        else:
+            inputs.append(arg)
+            i += 1
+    return options, inputs
+
+
+def convert(input_path: Path, options) -> Path:
+    out_dir = Path(options.get("-o", input_path.parent))
+    with Image.open(input_path) as img:
+        img.load()
+        megapixels = img.width * img.height / 1_000_000
+        time.sleep(float(os.environ.get("FAKE_TEXCONV_MS_PER_MPIX", "15")) * megapixels / 1000)
+
+        if "-f" in options:
+            out_path = out_dir / f"{input_path.stem}.dds"
+            mip_count = int(options.get("-m", "0"))
+            out_path.write_bytes(texture_bytes(img.width, img.height, options["-f"], mip_count))
+            return out_path
+
+        size = (int(options.get("-w", img.width)), int(options.get("-h", img.height)))
+        result = img.resize(size) if size != img.size else img
+        ext = options.get("-ft", "dds").lower()
+        out_path = out_dir / f"{input_path.stem}.{ext}"
+        if ext in ("jpg", "jpeg", "bmp") and result.mode not in ("RGB", "L"):
+            result = result.convert("RGB")
+        result.save(out_path)
+        return out_path
+
+
+def main(argv) -> int:
+    time.sleep(float(os.environ.get("FAKE_TEXCONV_LATENCY_MS", "20")) / 1000)
+    options, inputs = parse_args(argv)
+    print("Microsoft (R) DirectX Texture Converter [fake]")
+    for input_path in map(Path, inputs):
+        if not input_path.is_file():
+            print(f"ERROR: File not found: {input_path}", file=sys.stderr)
+            return 1
+        try:
+            out_path = convert(input_path, options)
+        except (OSError, ValueError) as e:
+            print(f"FAILED ({e})", file=sys.stderr)
+            return 1
+        print(f"reading {input_path}\nwriting {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
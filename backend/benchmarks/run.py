@@ -0,0 +1,249 @@
+"""Throughput benchmarks for the HoHatch backend against a synthetic dump and a fake texconv.
+
+    $ python -m backend.benchmarks.run --files 1000 --output bench-1k.json
+
+Everything runs inside a throwaway work directory: the Special K tree, the HoHatch config
+(settings, cache, journals) and the texconv stand-in from fake_texconv.py. Results are printed
+and, with --output, written as JSON so runs can be compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from PIL import Image
+
+from backend import services
+from backend.benchmarks.corpus import generate_corpus
+from backend.metrics import metrics
+
+
+def install_fake_texconv(bin_dir: Path) -> Path:
+    """Creates an executable wrapper that runs fake_texconv.py with this interpreter."""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    script = Path(__file__).with_name("fake_texconv.py").resolve()
+    if os.name == "nt":
+        wrapper = bin_dir / "texconv.cmd"
+        wrapper.write_text(f'@"{sys.executable}" "{script}" %*\r\n', encoding="utf-8")
+    else:
+        wrapper = bin_dir / "texconv"
+        wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n', encoding="utf-8")
+        wrapper.chmod(wrapper.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return wrapper
+
+
+def make_replacement_images(out_dir: Path, count: int) -> List[Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = out_dir / f"replacement_{i:04d}.jpg"
+        Image.new("RGB", (848, 1024), ((i * 37) % 256, 96, 160)).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+STARTUP_PROBE = """
+import json, sys, time
+from pathlib import Path
+start = time.perf_counter()
+import backend.services as services
+services.get_config_dir = lambda: Path(sys.argv[1])
+from backend.api import Api
+api = Api()
+constructed = time.perf_counter()
+api.backend.wait_for_startup()
+ready = time.perf_counter()
+print(json.dumps({"construct": constructed - start, "ready": ready - start, "modules": len(sys.modules)}))
+"""
+
+
+def measure_cold_startup(config_dir: Path) -> Dict[str, Any]:
+    """Imports and constructs the API in a fresh interpreter, as the app does before showing its window."""
+    project_root = Path(__file__).resolve().parents[2]
+    env = {**os.environ, "PYTHONPATH": str(project_root)}
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_PROBE, str(config_dir)], capture_output=True, text=True, env=env, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_thumbnail_formats(bench: "BenchmarkRun", backend, sample: List[str], quality: int):
+    """Encodes the same decoded thumbnails in each supported format, recording encode time and size."""
+    decoded = []
+    for path in sample:
+        with backend.texconv_service.open_as_image(path) as img:
+            img.load()
+            decoded.append(img)
+    for thumbnail_format in services.supported_thumbnail_formats():
+        encoded = bench.measure(
+            f"thumbnail_encode.{thumbnail_format}",
+            lambda: [services.encode_thumbnail(img, thumbnail_format, quality) for img in decoded],
+            len(decoded),
+        )
+        total = sum(len(data) for data in encoded)
+        bench.results[-1].update({"bytes": total, "avg_bytes": total // max(1, len(encoded))})
+        print(f"  {'':<36} {total / max(1, len(encoded)) / 1024:>9.1f} KiB/thumbnail")
+
+
+class BenchmarkRun:
+    def __init__(self):
+        self.results: List[Dict[str, Any]] = []
+
+    def measure(self, name: str, fn: Callable[[], Any], count: int = 1) -> Any:
+        start = time.perf_counter()
+        value = fn()
+        seconds = time.perf_counter() - start
+        record: Dict[str, Any] = {
+            "name": name,
+            "count": count,
+            "seconds": round(seconds, 6),
+            "per_item_ms": round(seconds * 1000 / count, 4) if count else None,
+        }
+        if isinstance(value, dict) and value.get("success") is False:
+            record["error"] = value.get("error")
+        self.results.append(record)
+        per_item = f"{record['per_item_ms']:.3f} ms/item" if count > 1 else ""
+        print(f"  {name:<36} {seconds:>9.3f} s  {per_item}{'  ERROR: ' + record['error'] if 'error' in record else ''}")
+        return value
+
+
+def run(args) -> Dict[str, Any]:
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="hohatch-bench-"))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    config_dir = work_dir / "config"
+    config_dir.mkdir(exist_ok=True)
+    # Keep settings, cache and journals out of the real user profile.
+    services.get_config_dir = lambda: config_dir
+
+    os.environ.setdefault("FAKE_TEXCONV_LATENCY_MS", str(args.texconv_latency_ms))
+
+    print(f"Generating {args.files} textures in {work_dir} ...")
+    start = time.perf_counter()
+    corpus = generate_corpus(
+        work_dir / "Special K", args.files, args.formats.split(","), args.size, args.txt_ratio, seed=args.seed
+    )
+    corpus_seconds = time.perf_counter() - start
+
+    texconv = install_fake_texconv(work_dir / "bin")
+    config_service = services.ConfigService()
+    config_service.update_settings(
+        {
+            "special_k_folder_path": str(corpus.root),
+            "texconv_executable_path": str(texconv),
+            "output_height": args.output_height,
+        }
+    )
+
+    from backend.backend_api import BackendApi
+
+    bench = BenchmarkRun()
+    print("Running benchmarks ...")
+    startup = measure_cold_startup(config_dir)
+    for phase in ("construct", "ready"):
+        bench.results.append({"name": f"startup.cold_{phase}", "count": 1, "seconds": round(startup[phase], 6)})
+        print(f"  {'startup.cold_' + phase:<36} {startup[phase]:>9.3f} s")
+    backend = bench.measure("startup.backend_api_init", BackendApi)
+    bench.measure("startup.background_tasks", backend.wait_for_startup)
+
+    discovery = backend.image_discovery_service
+    images = bench.measure("discover_images", lambda: discovery.discover_images("dump"), args.files)
+    bench.measure("get_image_list", lambda: backend.get_image_list("dump"), args.files)
+    bench.measure("scan_images.streamed", lambda: backend.scan_images("dump", lambda images: None), args.files)
+    bench.measure("get_image_list.compact", lambda: backend.get_image_list("dump", compact=True), args.files)
+    bench.measure("get_image_counts", discovery.get_image_counts, args.files)
+
+    sample = [img.path for img in images[: args.sample]]
+    bench.measure(
+        "get_displayable_image.cold",
+        lambda: [backend.convert_dds_for_display(path, True) for path in sample],
+        len(sample),
+    )
+    bench.measure(
+        "get_displayable_image.warm",
+        lambda: [backend.convert_dds_for_display(path, True) for path in sample],
+        len(sample),
+    )
+
+    measure_thumbnail_formats(bench, backend, sample, args.thumbnail_quality)
+
+    export_dir = work_dir / "export"
+    bench.measure(
+        "batch_export.jpg_files",
+        lambda: backend.batch_download_selected_dds_as_jpg(sample, str(export_dir)),
+        len(sample),
+    )
+    bench.measure(
+        "batch_export.zip",
+        lambda: backend.batch_download_selected_dds_as_zip(sample, str(work_dir / "export.zip")),
+        len(sample),
+    )
+
+    replace_targets = sample[: args.replace_count]
+    replacements = make_replacement_images(work_dir / "replacements", len(replace_targets))
+    bench.measure(
+        "replace_dds",
+        lambda: [
+            backend.replace_dds(target, str(replacement), True)
+            for target, replacement in zip(replace_targets, replacements)
+        ],
+        len(replace_targets),
+    )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+            "corpus": {
+                "dump_count": corpus.dump_count,
+                "inject_count": corpus.inject_count,
+                "total_bytes": corpus.total_bytes,
+                "generate_seconds": round(corpus_seconds, 3),
+            },
+        },
+        "results": bench.results,
+        "metrics": metrics.snapshot(),
+    }
+
+    if not args.keep and not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=1000, help="number of dump textures to generate")
+    parser.add_argument("--formats", default="BC1_UNORM,BC7_UNORM", help="comma separated DDS formats")
+    parser.add_argument("--size", type=int, default=256, help="texture height in pixels")
+    parser.add_argument("--txt-ratio", type=float, default=0.25, help="share of dumps in DDS-TXT folders")
+    parser.add_argument("--sample", type=int, default=100, help="textures used for per-image benchmarks")
+    parser.add_argument("--replace-count", type=int, default=10, help="textures replaced by replace_dds")
+    parser.add_argument("--output-height", type=int, default=1024, help="HoHatch output_height setting")
+    parser.add_argument("--thumbnail-quality", type=int, default=75, help="quality for the thumbnail format runs")
+    parser.add_argument("--texconv-latency-ms", type=float, default=20, help="simulated texconv start-up")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", help="reuse this directory instead of a temporary one")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary work directory")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Hashable, Optional
+
+from backend.metrics import metrics
+
+
+class AdaptiveConcurrencyLimiter:
+    """Bounds how many conversions run at once and tunes the bound with AIMD.
+
+    Each slot's latency is compared with the fastest recent latency of the same kind of work
+    (engine, operation and format), so a quick Pillow decode and a texconv run can share one
+    limit. Every window of about `limit` completions the limiter decides: when latencies stayed
+    close to their baselines and the window used every slot, the limit grows by one; when they
+    grew while throughput did not, the machine is saturated (a running game, a slow disk, ...)
+    and the limit is cut to DECREASE_FACTOR of itself.
+
+    Interactive work, the thumbnails a user is waiting for, always goes first: background slots
+    are not handed out while an interactive request is waiting.
+    """
+
+    # A window is congested when latencies average more than this multiple of their baselines.
+    LATENCY_TOLERANCE = 2.0
+    DECREASE_FACTOR = 0.7
+    # Throughput must grow by more than this share for inflated latencies to be accepted.
+    THROUGHPUT_GAIN = 0.05
+    # Baselines rise by this share per sample, so a stale fastest run is forgotten over time.
+    BASELINE_DRIFT = 0.01
+
+    def __init__(self, initial: Optional[int] = None, minimum: int = 1, maximum: Optional[int] = None):
+        self.maximum = maximum or os.cpu_count() or 2
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = max(self.minimum, min(initial or min(4, self.maximum), self.maximum))
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.interactive_waiting = 0
+        self.background_waiting = 0
+        self._baselines: Dict[Hashable, float] = {}
+        self._window_start = time.perf_counter()
+        self._window_samples = 0
+        self._window_ratio_sum = 0.0
+        self._window_peak = 0
+        self._last_throughput = 0.0
+        metrics.set_gauge("engine.concurrency.limit", self.limit)
+
+    @contextmanager
+    def slot(self, kind: Hashable, interactive: bool = False):
+        """Holds one of the limit's slots for a conversion of the given kind.
+
+        Only runs that finish without an exception are measured, since a failed run says little
+        about how loaded the machine is.
+        """
+        self._acquire(interactive)
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self._release(None, None)
+            raise
+        self._release(kind, time.perf_counter() - start)
+
+    def _acquire(self, interactive: bool):
+        with self._condition:
+            if interactive:
+                self.interactive_waiting += 1
+                try:
+                    self._condition.wait_for(lambda: self.in_flight < self.limit)
+                finally:
+                    self.interactive_waiting -= 1
+            else:
+                self.background_waiting += 1
+                try:
+                    if self.interactive_waiting:
+                        metrics.increment("engine.concurrency.background_deferred")
+                    self._condition.wait_for(lambda: self.in_flight < self.limit and not self.interactive_waiting)
+                finally:
+                    self.background_waiting -= 1
+            self.in_flight += 1
+            self._window_peak = max(self._window_peak, self.in_flight)
+
+    def _release(self, kind: Optional[Hashable], seconds: Optional[float]):
+        with self._condition:
+            self.in_flight -= 1
+            if kind is not None and seconds is not None:
+                self._sample(kind, max(seconds, 1e-6))
+            self._condition.notify_all()
+
+    def _sample(self, kind: Hashable, seconds: float):
+        baseline = self._baselines.get(kind)
+        baseline = seconds if baseline is None else min(seconds, baseline * (1 + self.BASELINE_DRIFT))
+        self._baselines[kind] = baseline
+        self._window_samples += 1
+        self._window_ratio_sum += seconds / baseline
+        if self._window_samples >= self.limit:
+            self._adjust()
+
+    def _adjust(self):
+        now = time.perf_counter()
+        ratio = self._window_ratio_sum / self._window_samples
+        throughput = self._window_samples / max(now - self._window_start, 1e-6)
+        if ratio <= self.LATENCY_TOLERANCE:
+            # Only a window that used every slot shows whether one more would help.
+            if self._window_peak >= self.limit:
+                self.limit = min(self.limit + 1, self.maximum)
+        elif throughput <= self._last_throughput * (1 + self.THROUGHPUT_GAIN):
+            self.limit = max(self.minimum, int(self.limit * self.DECREASE_FACTOR))
+            metrics.increment("engine.concurrency.decreases")
+        self._last_throughput = throughput
+        self._window_start = now
+        self._window_samples = 0
+        self._window_ratio_sum = 0.0
+        self._window_peak = self.in_flight
+        metrics.set_gauge("engine.concurrency.limit", self.limit)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "interactive_waiting": self.interactive_waiting,
+                "background_waiting": self.background_waiting,
+            }
@@ -0,0 +1,206 @@
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AbstractSet, List, Optional, Tuple
+
+DDS_MAGIC = b"DDS "
+DDS_HEADER_SIZE = 128
+DX10_HEADER_SIZE = 20
+
+# Header flags
+DDSD_REQUIRED = 0x1 | 0x2 | 0x4 | 0x1000  # CAPS | HEIGHT | WIDTH | PIXELFORMAT
+DDSD_MIPMAPCOUNT = 0x20000
+DDSD_LINEARSIZE = 0x80000
+DDSCAPS_COMPLEX = 0x8
+DDSCAPS_TEXTURE = 0x1000
+DDSCAPS_MIPMAP = 0x400000
+D3D10_RESOURCE_DIMENSION_TEXTURE2D = 3
+
+# Pixel format flags
+DDPF_ALPHAPIXELS = 0x1
+DDPF_FOURCC = 0x4
+DDPF_RGB = 0x40
+
+# Compressed formats keyed by their FourCC code: (format name, bytes per 4x4 block)
+FOURCC_FORMATS = {
+    b"DXT1": ("BC1_UNORM", 8),
+    b"DXT2": ("BC2_UNORM", 16),
+    b"DXT3": ("BC2_UNORM", 16),
+    b"DXT4": ("BC3_UNORM", 16),
+    b"DXT5": ("BC3_UNORM", 16),
+    b"ATI1": ("BC4_UNORM", 8),
+    b"BC4U": ("BC4_UNORM", 8),
+    b"BC4S": ("BC4_SNORM", 8),
+    b"ATI2": ("BC5_UNORM", 16),
+    b"BC5U": ("BC5_UNORM", 16),
+    b"BC5S": ("BC5_SNORM", 16),
+}
+
+# FourCC written for formats that have a pre-DX10 encoding
+LEGACY_FOURCC = {
+    "BC1_UNORM": b"DXT1",
+    "BC2_UNORM": b"DXT3",
+    "BC3_UNORM": b"DXT5",
+    "BC4_UNORM": b"BC4U",
+    "BC5_UNORM": b"ATI2",
+}
+
+# DXGI formats found in DX10 headers: dxgi value -> (format name, bytes per 4x4 block or None, bits per pixel)
+DXGI_FORMATS = {
+    28: ("R8G8B8A8_UNORM", None, 32),
+    29: ("R8G8B8A8_UNORM_SRGB", None, 32),
+    71: ("BC1_UNORM", 8, 4),
+    72: ("BC1_UNORM_SRGB", 8, 4),
+    74: ("BC2_UNORM", 16, 8),
+    75: ("BC2_UNORM_SRGB", 16, 8),
+    77: ("BC3_UNORM", 16, 8),
+    78: ("BC3_UNORM_SRGB", 16, 8),
+    80: ("BC4_UNORM", 8, 4),
+    81: ("BC4_SNORM", 8, 4),
+    83: ("BC5_UNORM", 16, 8),
+    84: ("BC5_SNORM", 16, 8),
+    87: ("B8G8R8A8_UNORM", None, 32),
+    91: ("B8G8R8A8_UNORM_SRGB", None, 32),
+    95: ("BC6H_UF16", 16, 8),
+    96: ("BC6H_SF16", 16, 8),
+    98: ("BC7_UNORM", 16, 8),
+    99: ("BC7_UNORM_SRGB", 16, 8),
+}
+
+
+@dataclass
+class DdsInfo:
+    """Header metadata of a DDS texture."""
+
+    width: int
+    height: int
+    mip_count: int
+    format: str
+    data_offset: int
+    block_size: Optional[int] = None
+    bits_per_pixel: int = 0
+    dxgi_format: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return {"width": self.width, "height": self.height, "mip_count": self.mip_count, "format": self.format}
+
+
+def parse_dds_header(data: bytes) -> Optional[DdsInfo]:
+    """Parses the leading bytes of a DDS file. Returns None if they are not a DDS header."""
+    if len(data) < DDS_HEADER_SIZE or data[:4] != DDS_MAGIC:
+        return None
+
+    height, width = struct.unpack_from("<II", data, 12)
+    mip_count = struct.unpack_from("<I", data, 28)[0] or 1
+    pf_flags = struct.unpack_from("<I", data, 80)[0]
+    fourcc = data[84:88]
+    rgb_bit_count = struct.unpack_from("<I", data, 88)[0]
+
+    if pf_flags & DDPF_FOURCC and fourcc == b"DX10":
+        if len(data) < DDS_HEADER_SIZE + DX10_HEADER_SIZE:
+            return None
+        dxgi_format = struct.unpack_from("<I", data, DDS_HEADER_SIZE)[0]
+        name, block_size, bpp = DXGI_FORMATS.get(dxgi_format, (f"DXGI_{dxgi_format}", None, 0))
+        return DdsInfo(
+            width, height, mip_count, name, DDS_HEADER_SIZE + DX10_HEADER_SIZE, block_size, bpp, dxgi_format
+        )
+
+    if pf_flags & DDPF_FOURCC:
+        name, block_size = FOURCC_FORMATS.get(fourcc, (fourcc.decode("ascii", "replace"), None))
+        bpp = block_size // 2 if block_size else 0
+        return DdsInfo(width, height, mip_count, name, DDS_HEADER_SIZE, block_size, bpp)
+
+    if pf_flags & DDPF_RGB:
+        name = "B8G8R8A8_UNORM" if rgb_bit_count == 32 else f"RGB{rgb_bit_count}"
+        return DdsInfo(width, height, mip_count, name, DDS_HEADER_SIZE, None, rgb_bit_count)
+
+    return DdsInfo(width, height, mip_count, "UNKNOWN", DDS_HEADER_SIZE)
+
+
+def read_dds_info(path: Path) -> Optional[DdsInfo]:
+    """Reads only the header of a DDS file."""
+    with open(path, "rb") as f:
+        return parse_dds_header(f.read(DDS_HEADER_SIZE + DX10_HEADER_SIZE))
+
+
+def mip_levels(info: DdsInfo) -> List[Tuple[int, int, int, int]]:
+    """Returns (width, height, offset, size) for every mip level stored in the file."""
+    levels = []
+    width, height, offset = info.width, info.height, info.data_offset
+    for _ in range(info.mip_count):
+        if info.block_size:
+            size = max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * info.block_size
+        else:
+            size = width * height * info.bits_per_pixel // 8
+        levels.append((width, height, offset, size))
+        offset += size
+        if width == 1 and height == 1:
+            break
+        width, height = max(1, width // 2), max(1, height // 2)
+    return levels
+
+
+def smallest_sufficient_mip(info: DdsInfo, min_width: int, min_height: int) -> Tuple[int, int, int, int]:
+    """Returns the smallest stored mip level at least min_width x min_height, or the top level if none is."""
+    levels = mip_levels(info)
+    sufficient = [level for level in levels if level[0] >= min_width and level[1] >= min_height]
+    return sufficient[-1] if sufficient else levels[0]
+
+
+def extract_mip_level(
+    path: Path, formats: AbstractSet[str], min_size: Optional[Tuple[int, int]] = None
+) -> Optional[bytes]:
+    """Reads only the header and the smallest mip level of at least min_size (the top level if min_size is
+    None) of a DDS and returns that level as a standalone single-level DDS. Returns None if the texture's
+    format is not in formats.
+
+    sRGB formats are written with the header of their linear equivalent; the block data is the same.
+    """
+    with open(path, "rb") as f:
+        info = parse_dds_header(f.read(DDS_HEADER_SIZE + DX10_HEADER_SIZE))
+        if info is None or info.format not in formats or not (info.block_size or info.bits_per_pixel):
+            return None
+        if min_size is None:
+            width, height, offset, size = mip_levels(info)[0]
+        else:
+            width, height, offset, size = smallest_sufficient_mip(info, *min_size)
+        f.seek(offset)
+        data = f.read(size)
+    if len(data) < size:
+        return None
+    return build_dds_header(width, height, info.format.removesuffix("_SRGB")) + data
+
+
+def full_mip_count(width: int, height: int) -> int:
+    return max(width, height).bit_length()
+
+
+def build_dds_header(width: int, height: int, format: str, mip_count: int = 1) -> bytes:
+    """Builds a DDS header for a 2D texture. Legacy FourCC codes are used where one exists."""
+    fourcc = LEGACY_FOURCC.get(format)
+    dxgi_format = next((value for value, (name, _, _) in DXGI_FORMATS.items() if name == format), None)
+    if fourcc is None and dxgi_format is None:
+        raise ValueError(f"Unsupported DDS format: {format}")
+
+    flags = DDSD_REQUIRED | DDSD_LINEARSIZE
+    caps = DDSCAPS_TEXTURE
+    if mip_count > 1:
+        flags |= DDSD_MIPMAPCOUNT
+        caps |= DDSCAPS_COMPLEX | DDSCAPS_MIPMAP
+
+    info = DdsInfo(width, height, 1, format, 0)
+    if fourcc:
+        info.block_size = FOURCC_FORMATS[fourcc][1]
+    else:
+        _, info.block_size, info.bits_per_pixel = DXGI_FORMATS[dxgi_format]
+    top_level_size = mip_levels(info)[0][3]
+
+    header = bytearray(DDS_HEADER_SIZE)
+    header[0:4] = DDS_MAGIC
+    struct.pack_into("<IIIIIII", header, 4, 124, flags, height, width, top_level_size, 0, mip_count)
+    struct.pack_into("<II", header, 76, 32, DDPF_FOURCC)
+    header[84:88] = fourcc or b"DX10"
+    struct.pack_into("<I", header, 108, caps)
+    if not fourcc:
+        header += struct.pack("<IIIII", dxgi_format, D3D10_RESOURCE_DIMENSION_TEXTURE2D, 0, 1, 0)
+    return bytes(header)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 DEFAULT_LANG = "en"
 
@@ -15,6 +15,14 @@ class AppSettings:
     output_height: int = 1024
     last_active_view: str = "dump"
     theme: str = "dark"
+    texconv_timeout_seconds: int = 120
+    # Extra attempts when texconv fails to launch; timed-out runs are never retried.
+    texconv_retries: int = 1
+    # "files" keeps one .jpg and .hash per thumbnail; "packed" appends them to a few memory-mapped segment files.
+    thumbnail_cache_backend: str = "files"
+    # Display thumbnail encoding: "jpeg", "webp" or "avif" (where Pillow supports it), and its quality (1-100).
+    thumbnail_format: str = "jpeg"
+    thumbnail_quality: int = 75
 
     @property
     def output_width(self) -> int:
@@ -31,6 +39,24 @@ class ImageInfo:
     path: str
 
 
+@dataclass
+class ImageListing:
+    """Columnar listing of the DDS files under a single base folder."""
+
+    base: str
+    paths: List[str]
+    sizes: Optional[List[int]] = None
+    mtimes: Optional[List[int]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"format": "columnar", "base": self.base, "paths": self.paths}
+        if self.sizes is not None:
+            data["sizes"] = self.sizes
+        if self.mtimes is not None:
+            data["mtimes"] = self.mtimes
+        return data
+
+
 @dataclass
 class ImageListResponse:
     """Response for get_image_list."""
@@ -0,0 +1,286 @@
+import io
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, TypeVar
+
+from backend.concurrency import AdaptiveConcurrencyLimiter
+from backend.dds import build_dds_header, extract_mip_level
+from backend.exceptions import HoHatchError, TexconvError
+from backend.lazy import lazy_import
+from backend.metrics import metrics
+
+Image = lazy_import("PIL.Image")
+
+DECODE = "decode"
+ENCODE = "encode"
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class EngineCapabilities:
+    """What a conversion engine can do."""
+
+    # DDS formats it can decode; None means any format, including ones HoHatch cannot parse.
+    decode_formats: Optional[FrozenSet[str]] = None
+    encode_formats: FrozenSet[str] = field(default_factory=frozenset)
+    # Reads only the mip level needed for the requested size instead of the whole texture.
+    partial_mip_decode: bool = False
+    # Writes complete mip chains when encoding.
+    mip_generation: bool = False
+
+
+class ConversionEngine(ABC):
+    """Decodes DDS textures to images and encodes images to DDS.
+
+    Engines work on textures as stored: the vertical flip of Shadowverse textures is applied by
+    TexconvService for every engine alike.
+    """
+
+    name = "engine"
+    capabilities = EngineCapabilities()
+    # Seconds per operation assumed until the engine has been measured.
+    estimated_seconds = 1.0
+
+    def available(self) -> bool:
+        return True
+
+    def supports(self, operation: str, dds_format: Optional[str], mips: bool = False) -> bool:
+        caps = self.capabilities
+        if operation == DECODE:
+            return caps.decode_formats is None or dds_format in caps.decode_formats
+        if operation == ENCODE:
+            return dds_format in caps.encode_formats and (caps.mip_generation or not mips)
+        return False
+
+    @abstractmethod
+    def decode(self, dds_path: Path, size: Optional[Tuple[int, int]]):
+        """Returns the loaded image of a DDS, resized to size, or at full resolution if size is None."""
+        ...
+
+    @abstractmethod
+    def encode(self, image, out_dir: Path, stem: str, dds_format: str, mip_count: int) -> Path:
+        """Writes image as out_dir/<stem>.dds and returns its path."""
+        ...
+
+
+class TexconvEngine(ConversionEngine):
+    """Runs Microsoft's texconv.exe, which handles every DXGI format and builds mip chains."""
+
+    name = "texconv"
+    capabilities = EngineCapabilities(
+        decode_formats=None,
+        encode_formats=frozenset({"BC1_UNORM", "BC3_UNORM", "BC7_UNORM", "BC7_UNORM_SRGB", "R8G8B8A8_UNORM"}),
+        mip_generation=True,
+    )
+    estimated_seconds = 0.5
+
+    def __init__(
+        self,
+        run_texconv: Callable[[List[str]], Any],
+        scratch_dir: Callable[[], AbstractContextManager],
+        executable: Callable[[], Path],
+    ):
+        self._run_texconv = run_texconv
+        self._scratch_dir = scratch_dir
+        self._executable = executable
+
+    def available(self) -> bool:
+        return self._executable().is_file()
+
+    def decode(self, dds_path: Path, size: Optional[Tuple[int, int]]):
+        with self._scratch_dir() as scratch:
+            args = ["-o", str(scratch), str(dds_path), "-ft", "bmp"]
+            if size:
+                args += ["-w", str(size[0]), "-h", str(size[1])]
+            args += ["-r", "-y"]
+            self._run_texconv(args)
+
+            temp_output_file = Path(scratch) / f"{dds_path.stem}.bmp"
+            if not temp_output_file.is_file():
+                raise TexconvError("Conversion failed: Output file not found in scratch directory.")
+            try:
+                img = Image.open(temp_output_file)
+                img.load()  # also closes the file, so the scratch BMP can be removed
+                return img
+            finally:
+                temp_output_file.unlink(missing_ok=True)
+
+    def encode(self, image, out_dir: Path, stem: str, dds_format: str, mip_count: int) -> Path:
+        # Uncompressed BMP intermediate, so the image is only compressed once (by texconv).
+        # PNG is avoided on purpose because of known texconv issues with it.
+        temp_path = out_dir / f"{stem}.bmp"
+        try:
+            image.save(temp_path)
+            self._run_texconv(["-f", dds_format, "-o", str(out_dir), str(temp_path), "-m", str(mip_count), "-y"])
+            created_dds = out_dir / f"{stem}.dds"
+            if not created_dds.is_file():
+                raise TexconvError("Conversion to DDS failed.")
+            return created_dds
+        finally:
+            if temp_path.exists():
+                os.remove(temp_path)
+
+
+class PillowEngine(ConversionEngine):
+    """Converts in-process with Pillow; no process start-up, but fewer formats and no mip chains."""
+
+    name = "pillow"
+    # Formats Pillow decodes the same way texconv does. sRGB variants are read through the header
+    # of their linear format, since the block data is the same.
+    DECODE_FORMATS = frozenset(
+        {
+            "BC1_UNORM",
+            "BC1_UNORM_SRGB",
+            "BC2_UNORM",
+            "BC2_UNORM_SRGB",
+            "BC3_UNORM",
+            "BC3_UNORM_SRGB",
+            "BC4_UNORM",
+            "BC5_UNORM",
+            "BC7_UNORM",
+            "BC7_UNORM_SRGB",
+            "R8G8B8A8_UNORM",
+            "R8G8B8A8_UNORM_SRGB",
+        }
+    )
+    # Pillow's DDS writer names: DXGI format -> pixel_format.
+    ENCODE_PIXEL_FORMATS = {"BC1_UNORM": "DXT1", "BC2_UNORM": "DXT3", "BC3_UNORM": "DXT5"}
+    capabilities = EngineCapabilities(
+        decode_formats=DECODE_FORMATS,
+        encode_formats=frozenset(ENCODE_PIXEL_FORMATS),
+        partial_mip_decode=True,
+    )
+    estimated_seconds = 0.05
+
+    def decode(self, dds_path: Path, size: Optional[Tuple[int, int]]):
+        level = extract_mip_level(dds_path, self.DECODE_FORMATS, size)
+        if level is None:
+            raise ValueError(f"{dds_path.name} is not in a format Pillow decodes")
+        metrics.increment("engine.pillow.bytes_read", len(level))
+        with Image.open(io.BytesIO(level)) as img:
+            if size and img.size != size:
+                return img.resize(size, Image.LANCZOS)  # type: ignore
+            img.load()
+            return img.copy()
+
+    def encode(self, image, out_dir: Path, stem: str, dds_format: str, mip_count: int) -> Path:
+        out_path = out_dir / f"{stem}.dds"
+        rgba = image if image.mode == "RGBA" else image.convert("RGBA")
+        rgba.save(out_path, format="DDS", pixel_format=self.ENCODE_PIXEL_FORMATS[dds_format])
+        return out_path
+
+
+class FakeEngine(ConversionEngine):
+    """A stand-in for tests: decodes every texture to a solid colour and writes header-only DDS files."""
+
+    name = "fake"
+    capabilities = EngineCapabilities(
+        decode_formats=None,
+        encode_formats=frozenset({"BC1_UNORM", "BC3_UNORM", "BC7_UNORM"}),
+        partial_mip_decode=True,
+        mip_generation=True,
+    )
+    estimated_seconds = 0.0
+
+    def __init__(self, color=(128, 128, 128), size: Tuple[int, int] = (64, 64)):
+        self.color = color
+        self.size = size
+        self.calls: List[Tuple[str, str]] = []
+
+    def decode(self, dds_path: Path, size: Optional[Tuple[int, int]]):
+        self.calls.append((DECODE, str(dds_path)))
+        return Image.new("RGB", size or self.size, self.color)
+
+    def encode(self, image, out_dir: Path, stem: str, dds_format: str, mip_count: int) -> Path:
+        self.calls.append((ENCODE, stem))
+        out_path = out_dir / f"{stem}.dds"
+        out_path.write_bytes(build_dds_header(image.width, image.height, dds_format, mip_count))
+        return out_path
+
+
+class EngineRegistry:
+    """Chooses the engine for each conversion: among the engines capable of it, available ones
+    first, then the fastest by measured seconds for that operation and DDS format.
+
+    Until an engine has been measured for an operation and format, its estimated_seconds is used.
+    A failing engine hands the conversion to the next candidate; the last one's error is raised.
+    With a limiter, every engine call holds one of its slots while it runs.
+    """
+
+    # Weight of the newest run in the moving average of an engine's seconds.
+    SMOOTHING = 0.2
+
+    def __init__(self, engines: List[ConversionEngine], limiter: Optional[AdaptiveConcurrencyLimiter] = None):
+        self.engines = list(engines)
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._seconds: Dict[Tuple[str, str, Optional[str]], float] = {}
+
+    def expected_seconds(self, engine: ConversionEngine, operation: str, dds_format: Optional[str]) -> float:
+        with self._lock:
+            return self._seconds.get((engine.name, operation, dds_format), engine.estimated_seconds)
+
+    def rank(self, operation: str, dds_format: Optional[str], mips: bool = False) -> List[ConversionEngine]:
+        capable = [engine for engine in self.engines if engine.supports(operation, dds_format, mips)]
+        return sorted(
+            capable, key=lambda engine: (not engine.available(), self.expected_seconds(engine, operation, dds_format))
+        )
+
+    def record(self, engine: ConversionEngine, operation: str, dds_format: Optional[str], seconds: float):
+        key = (engine.name, operation, dds_format)
+        with self._lock:
+            previous = self._seconds.get(key)
+            self._seconds[key] = seconds if previous is None else previous + self.SMOOTHING * (seconds - previous)
+        metrics.observe(f"engine.{engine.name}.{operation}", seconds * 1000)
+
+    def run(
+        self,
+        operation: str,
+        dds_format: Optional[str],
+        call: Callable[[ConversionEngine], T],
+        mips: bool = False,
+        interactive: bool = False,
+    ) -> T:
+        """Runs call with the best engine for the operation, falling back on failure.
+
+        interactive marks work a user is waiting for, which the limiter lets ahead of background work.
+        """
+        engines = self.rank(operation, dds_format, mips)
+        if not engines:
+            raise TexconvError(f"No conversion engine can {operation} {dds_format or 'this texture'}.")
+        for engine, fallback in zip(engines, engines[1:]):
+            try:
+                return self._timed(engine, operation, dds_format, call, interactive)
+            except (HoHatchError, OSError, ValueError) as e:
+                logging.info(f"{engine.name} could not {operation} {dds_format}, trying {fallback.name}: {e}")
+        last = engines[-1]
+        try:
+            return self._timed(last, operation, dds_format, call, interactive)
+        except HoHatchError:
+            raise  # already meaningful to callers, e.g. TexconvTimeoutError skips a file in exports
+        except (OSError, ValueError) as e:
+            raise TexconvError(f"Conversion failed: {last.name} could not {operation} the texture: {e}") from e
+
+    def _timed(
+        self, engine: ConversionEngine, operation: str, dds_format: Optional[str], call: Callable, interactive: bool
+    ):
+        slot = (
+            self.limiter.slot((engine.name, operation, dds_format), interactive) if self.limiter else nullcontext()
+        )
+        with slot:
+            start = time.perf_counter()
+            result = call(engine)
+        self.record(engine, operation, dds_format, time.perf_counter() - start)
+        return result
+
+    def snapshot(self) -> Dict[str, float]:
+        """Returns the measured seconds per "engine.operation.format", for get_metrics."""
+        with self._lock:
+            return {f"{name}.{op}.{fmt}": round(seconds, 4) for (name, op, fmt), seconds in self._seconds.items()}
@@ -0,0 +1,52 @@
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# A DDS texture is gone for good (a direct delete, or a trash batch being purged).
+FILE_DELETED = "file.deleted"
+# A DDS texture was moved from src to path.
+FILE_MOVED = "file.moved"
+# path now holds new texture data. image, when set, is what the new texture decodes to.
+FILE_REPLACED = "file.replaced"
+
+
+@dataclass
+class FileEvent:
+    """A change to a DDS texture on disk."""
+
+    type: str
+    path: str
+    src: Optional[str] = None
+    image: Any = None
+
+
+class EventBus:
+    """Synchronous in-process publish/subscribe.
+
+    Handlers run on the publishing thread, in subscription order. A failing handler is logged and
+    does not affect the publisher or the other handlers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, List[Callable[[FileEvent], None]]] = defaultdict(list)
+
+    def subscribe(self, event_type: str, handler: Callable[[FileEvent], None]):
+        with self._lock:
+            self._handlers[event_type].append(handler)
+
+    def unsubscribe(self, event_type: str, handler: Callable[[FileEvent], None]):
+        with self._lock:
+            if handler in self._handlers[event_type]:
+                self._handlers[event_type].remove(handler)
+
+    def publish(self, event: FileEvent):
+        with self._lock:
+            handlers = list(self._handlers[event.type])
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception:
+                logging.exception(f"Event handler failed for {event.type} on {event.path}")
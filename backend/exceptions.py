@@ -18,6 +18,12 @@ class TexconvError(HoHatchError):
     pass
 
 
+class TexconvTimeoutError(TexconvError):
+    """Exception raised when texconv does not finish within the configured timeout."""
+
+    pass
+
+
 class FileSystemError(HoHatchError):
     """Exception related to file system operations."""
 
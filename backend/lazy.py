@@ -0,0 +1,41 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Attribute writes are forwarded too, so patching e.g. `backend.services.Image.open` in
+    tests behaves exactly as it would with an eager import.
+    """
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self):
+        module = object.__getattribute__(self, "_module")
+        if module is None:
+            with object.__getattribute__(self, "_lock"):
+                module = object.__getattribute__(self, "_module")
+                if module is None:
+                    module = importlib.import_module(object.__getattribute__(self, "_name"))
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module '{object.__getattribute__(self, '_name')}'>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
@@ -0,0 +1,150 @@
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+LOG_FILE_NAME = "hohatch.log"
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 14
+
+
+class CompressingRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Rolls the log over at midnight or when it exceeds max_bytes, whichever comes first.
+
+    Rotated logs are gzip-compressed to `<stem>-<last write time>.log.gz` and only the newest
+    backup_count archives are kept, so the log folder stays bounded.
+    """
+
+    def __init__(self, filename: Path, max_bytes: int = MAX_LOG_BYTES, backup_count: int = LOG_BACKUP_COUNT):
+        super().__init__(filename, when="midnight", backupCount=backup_count, encoding="utf-8", delay=True)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record) -> int:
+        if super().shouldRollover(record):
+            return 1
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.seek(0, os.SEEK_END)
+            if self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes:
+                return 1
+        return 0
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None  # type: ignore[assignment]
+
+        log_path = Path(self.baseFilename)
+        if log_path.is_file() and log_path.stat().st_size > 0:
+            stamp = datetime.fromtimestamp(log_path.stat().st_mtime).strftime("%Y-%m-%d_%H-%M-%S")
+            rotated = log_path.with_name(f"{log_path.stem}-{stamp}.log")
+            n = 1
+            while rotated.exists() or rotated.with_suffix(".log.gz").exists():
+                n += 1
+                rotated = log_path.with_name(f"{log_path.stem}-{stamp}-{n}.log")
+            os.replace(log_path, rotated)
+            compress_log(rotated)
+        self._prune(log_path)
+
+        self.rolloverAt = self.computeRollover(int(time.time()))
+        if not self.delay:
+            self.stream = self._open()
+
+    def _prune(self, log_path: Path):
+        archives = sorted(log_path.parent.glob(f"{log_path.stem}-*.log.gz"), key=lambda p: p.stat().st_mtime)
+        for old in archives[: max(0, len(archives) - self.backupCount)]:
+            old.unlink(missing_ok=True)
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most `burst` records per call site every `interval` seconds.
+
+    Hot paths (one line per texture or per texconv run) would otherwise flood the log during
+    batch operations. The first record after a suppressed window reports how many were dropped.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 10.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._windows: Dict[Tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+                    record.args = None
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+def compress_log(path: Path):
+    with open(path, "rb") as src, gzip.open(path.with_suffix(".log.gz"), "wb") as dest:
+        shutil.copyfileobj(src, dest)
+    path.unlink()
+
+
+def compress_legacy_logs(log_dir: Path):
+    """Compresses the per-day `YYYY-MM-DD.log` files written by earlier versions."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    for path in log_dir.glob("????-??-??.log"):
+        if path.stem != today:
+            try:
+                compress_log(path)
+            except OSError as e:
+                logging.warning(f"Failed to compress old log {path}: {e}")
+
+
+def setup_logging(log_dir: Path, level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Routes all logging through a queue so callers never wait on console or disk I/O.
+
+    A listener thread owns the stdout and rotating file handlers; it is stopped (and the
+    queue flushed) at interpreter exit.
+    """
+    log_dir.mkdir(parents=True, exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    file_handler = CompressingRotatingFileHandler(log_dir / LOG_FILE_NAME)
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    threading.Thread(target=compress_legacy_logs, args=(log_dir,), name="hohatch-log-compress", daemon=True).start()
+    return listener
@@ -20,23 +20,15 @@ else:
 # especially when bundled with PyInstaller.
 from datetime import datetime
 from backend.api import Api
+from backend.logging_setup import LOG_FILE_NAME, setup_logging as configure_logging
+from backend.metrics import metrics
+from backend.profiling import DEFAULT_PROFILE_RATE, DEFAULT_PROFILED_CALLS, enable_profiling
 
 def setup_logging():
     log_dir = Path(appdirs.user_data_dir("HoHatch", "")) / "logs"
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_dir / f"{datetime.now().strftime('%Y-%m-%d')}.log"
-
-    # Configure root logger
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(log_file, encoding="utf-8"),
-        ],
-    )
+    configure_logging(log_dir)
     logging.info("Logging initialized.")
-    logging.info(f"Log file path: {log_file}")
+    logging.info(f"Log file path: {log_dir / LOG_FILE_NAME}")
 
 if __name__ == "__main__":
     setup_logging()
@@ -58,6 +50,21 @@ if __name__ == "__main__":
 
     try:
         api = Api()
+
+        profile_mode = os.environ.get("HOHATCH_PROFILE", "false").lower() == "true"
+        if profile_mode:
+            try:
+                profile_rate = float(os.environ.get("HOHATCH_PROFILE_RATE", DEFAULT_PROFILE_RATE))
+            except ValueError:
+                logging.warning(
+                    f"Ignoring invalid HOHATCH_PROFILE_RATE {os.environ['HOHATCH_PROFILE_RATE']!r}, "
+                    f"profiling {DEFAULT_PROFILE_RATE} of calls"
+                )
+                profile_rate = DEFAULT_PROFILE_RATE
+            profile_calls = os.environ.get("HOHATCH_PROFILE_CALLS", ",".join(DEFAULT_PROFILED_CALLS)).split(",")
+            profile_dir = Path(api.backend.file_service.get_log_folder_path()) / "profiles"
+            enable_profiling(api, profile_dir, profile_rate, [c.strip() for c in profile_calls if c.strip()])
+
         window = webview.create_window(
             "HoHatch", url=str(html_file_path.resolve()), width=1280, height=720, js_api=api
         )
@@ -69,6 +76,13 @@ if __name__ == "__main__":
         window.events.loaded += on_loaded
 
         debug_mode = os.environ.get("HOHATCH_DEBUG", "false").lower() == "true"
+        metrics_mode = os.environ.get("HOHATCH_METRICS", "false").lower() == "true"
         webview.start(debug=debug_mode)
+
+        if metrics_mode:
+            log_dir = Path(api.backend.file_service.get_log_folder_path())
+            metrics_file = log_dir / f"metrics-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+            metrics.dump(metrics_file)
+            logging.info(f"Metrics written to {metrics_file}")
     except Exception as e:
         print(f"Error: {e}")
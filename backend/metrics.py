@@ -0,0 +1,157 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict
+
+# Upper bounds (in milliseconds) of the latency histogram buckets.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf"))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with approximate percentiles."""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value_ms: float):
+        self.count += 1
+        self.total += value_ms
+        self.min = min(self.min, value_ms)
+        self.max = max(self.max, value_ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if value_ms <= bound:
+                self.counts[i] += 1
+                break
+
+    def percentile(self, q: float) -> float:
+        """Returns the upper bound of the bucket holding the q-th percentile, capped at the observed max."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "buckets": {
+                ("inf" if bound == float("inf") else f"le_{bound}"): n
+                for bound, n in zip(LATENCY_BUCKETS_MS, self.counts)
+                if n
+            },
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and latency histograms for the whole process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, value_ms: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self._started, 3),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "histograms": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._started = time.time()
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def dump(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+
+
+metrics = MetricsRegistry()
+
+
+def instrumented(prefix: str):
+    """Class decorator that records call counts, errors and latency of every public method.
+
+    Wrappers carry the original signature, so pywebview still sees the real parameter names
+    when it exposes an instrumented class as a JS API. Generator and @contextmanager methods
+    are left alone: calling them only creates the generator, so the work they do would go
+    unmeasured.
+    """
+
+    def wrap(func, name):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = isinstance(result, dict) and result.get("success") is False
+                return result
+            finally:
+                metrics.observe(name, (time.perf_counter() - start) * 1000)
+                metrics.increment(f"{name}.calls")
+                if failed:
+                    metrics.increment(f"{name}.errors")
+
+        wrapper.__signature__ = inspect.signature(func)  # type: ignore[attr-defined]
+        return wrapper
+
+    def decorate(cls):
+        for attr_name, attr in list(vars(cls).items()):
+            if attr_name.startswith("_") or not inspect.isfunction(attr):
+                continue
+            if inspect.isgeneratorfunction(attr) or inspect.isgeneratorfunction(getattr(attr, "__wrapped__", None)):
+                continue
+            setattr(cls, attr_name, wrap(attr, f"{prefix}.{attr_name}"))
+        return cls
+
+    return decorate
@@ -0,0 +1,113 @@
+import cProfile
+import functools
+import logging
+import random
+import threading
+import time
+import tracemalloc
+import types
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+# Share of calls profiled when HOHATCH_PROFILE_RATE is not set.
+DEFAULT_PROFILE_RATE = 0.1
+# Api calls that do real work; cheap getters are not worth profiling.
+DEFAULT_PROFILED_CALLS = (
+    "get_image_list",
+    "get_image_counts",
+    "convert_dds_for_display",
+    "convert_single_dds_to_jpg",
+    "batch_download_selected_dds_as_jpg",
+    "batch_download_selected_dds_as_zip",
+    "resume_batch_job",
+    "replace_dds",
+    "batch_delete_selected_dds_files",
+    "clear_cache",
+    "export_mod_pack",
+    "import_mod_pack",
+)
+
+
+class CallProfiler:
+    """Profiles a sampled fraction of API calls with cProfile and tracemalloc.
+
+    Each sampled call writes `<timestamp>_<call>.prof` (loadable with pstats or snakeviz), the
+    raw tracemalloc snapshot as `<timestamp>_<call>.snapshot` and a readable summary of the
+    allocation sites still alive at return as `<timestamp>_<call>.mem.txt` into output_dir. Only
+    one call is profiled at a time; concurrent calls run unprofiled, which keeps the overhead
+    bounded when the mode is left on during real sessions.
+    """
+
+    TOP_ALLOCATIONS = 25
+
+    def __init__(self, output_dir: Path, sample_rate: float = 1.0):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self._busy = threading.Lock()
+
+    def wrap(self, name: str, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if random.random() >= self.sample_rate or not self._busy.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                return self._profile(name, func, args, kwargs)
+            finally:
+                self._busy.release()
+
+        return wrapper
+
+    def _profile(self, name: str, func, args, kwargs):
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._write(name, profiler, snapshot, elapsed_ms, current, peak)
+
+    def _write(self, name, profiler, snapshot, elapsed_ms, current, peak):
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            stem = f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S-%f')}_{name}"
+            profiler.dump_stats(str(self.output_dir / f"{stem}.prof"))
+            snapshot.dump(str(self.output_dir / f"{stem}.snapshot"))
+
+            lines = [
+                f"call: {name}",
+                f"elapsed_ms: {elapsed_ms:.3f}",
+                f"allocated_at_return_bytes: {current}",
+                f"peak_bytes: {peak}",
+                "",
+                f"top {self.TOP_ALLOCATIONS} allocation sites still alive at return:",
+            ]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[: self.TOP_ALLOCATIONS]]
+            (self.output_dir / f"{stem}.mem.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+            logging.debug(f"Profiled {name} in {elapsed_ms:.1f} ms; peak memory {peak} bytes.")
+        except OSError as e:
+            logging.warning(f"Failed to write profile for {name}: {e}")
+
+
+def enable_profiling(api, output_dir: Path, sample_rate: float, calls: Iterable[str] = DEFAULT_PROFILED_CALLS):
+    """Replaces the selected methods of an Api instance with profiling wrappers."""
+    profiler = CallProfiler(output_dir, sample_rate)
+    enabled = []
+    for name in calls:
+        method = getattr(api, name, None)
+        if method is None:
+            logging.warning(f"Cannot profile unknown API call: {name}")
+            continue
+        # Bound to the instance; functools.wraps carries over __signature__, so pywebview
+        # still sees the original parameters.
+        wrapper = profiler.wrap(name, method.__func__)
+        setattr(api, name, types.MethodType(wrapper, api))
+        enabled.append(name)
+    logging.info(f"Profiling enabled for {len(enabled)} API calls at sample rate {sample_rate}; output: {output_dir}")
+    return profiler
@@ -1,21 +1,73 @@
 import appdirs
 import base64
 import hashlib
+import io
 import json
 import logging
 import os
+import queue
+import re
 import shutil
+import signal
 import subprocess
-import tempfile
+import threading
+import time
+import uuid
+import zipfile
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from dataclasses import asdict, fields
 from pathlib import Path
-from typing import Any, Dict, List
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-import requests
-from PIL import Image
+from backend.concurrency import AdaptiveConcurrencyLimiter
+from backend.dds import parse_dds_header, read_dds_info, DDS_HEADER_SIZE, DX10_HEADER_SIZE
+from backend.dto import AppSettings, ImageInfo, ImageListing
+from backend.engines import DECODE, ENCODE, EngineRegistry, PillowEngine, TexconvEngine
+from backend.events import FILE_DELETED, FILE_MOVED, FILE_REPLACED, EventBus, FileEvent
+from backend.exceptions import (
+    ConfigError,
+    DownloadError,
+    FileSystemError,
+    HoHatchError,
+    TexconvError,
+    TexconvTimeoutError,
+)
+from backend.lazy import lazy_import
+from backend.metrics import instrumented, metrics
+from backend.thumbnail_store import FileThumbnailStore, PackedThumbnailStore, ThumbnailStore
 
-from backend.dto import AppSettings, ImageInfo
-from backend.exceptions import ConfigError, DownloadError, FileSystemError, TexconvError
+# Only the end of texconv's output is logged; the banner and per-file lines are noise on the hot path.
+TEXCONV_LOG_TAIL = 500
+# Runs at least this long are logged as slow outliers and kept for get_metrics.
+TEXCONV_SLOW_SECONDS = 10.0
+TEXCONV_RETRY_DELAY_SECONDS = 0.5
+# Large reads keep hashing disk-bound; hashlib releases the GIL on them, so hashes run in parallel.
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_WORKERS = min(8, os.cpu_count() or 4)
+# Deleted items are moved here, inside the Special K profile, until they are purged.
+TRASH_DIR_NAME = ".hohatch-trash"
+# Batch job ids as made by JobJournalService.start_job, e.g. "20240101-120000-0123abcd".
+JOB_ID_PATTERN = re.compile(r"\d{8}-\d{6}-[0-9a-f]{8}")
+# Folder listings are I/O bound, so a few more threads than cores still helps on large dump trees.
+SCAN_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+# Display thumbnail formats: the Pillow encoder and the data URI MIME type.
+THUMBNAIL_FORMATS = {"jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp"), "avif": ("AVIF", "image/avif")}
+# Pillow's JPEG default, which thumbnails cached before the format setting existed were written with.
+DEFAULT_THUMBNAIL_QUALITY = 75
+# Edge length of deep-zoom tiles; each pyramid level halves the one above until it fits a single tile.
+DEEP_ZOOM_TILE_SIZE = 256
+# Decoded textures kept for rendering further deep-zoom tiles; a 4096x4096 texture takes about 64 MB.
+DEEP_ZOOM_CACHED_TEXTURES = 2
+# Deep-zoom renders of one texture are serialised; textures are spread over this many locks.
+DEEP_ZOOM_LOCK_STRIPES = 16
+
+# Imported on first use to keep application start-up fast.
+requests = lazy_import("requests")
+Image = lazy_import("PIL.Image")
 
 
 # --- Path Helpers ---
@@ -33,6 +85,87 @@ def get_config_file() -> Path:
     return config_dir / "settings.json"
 
 
+def _to_posix(path: str) -> str:
+    return path.replace(os.sep, "/") if os.sep != "/" else path
+
+
+def _scan_directory(path: str):
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(".dds") and entry.is_file():
+                        files.append(entry)
+                except OSError:
+                    continue
+    except OSError as e:
+        logging.warning(f"Skipping unreadable folder {path}: {e}")
+    return files, subdirs
+
+
+_scan_executor: Optional[ThreadPoolExecutor] = None
+_scan_executor_lock = threading.Lock()
+
+
+def _get_scan_executor() -> ThreadPoolExecutor:
+    # One pool for every walk, so concurrent scans (counts, listings, reconciles) share SCAN_WORKERS threads.
+    global _scan_executor
+    with _scan_executor_lock:
+        if _scan_executor is None:
+            _scan_executor = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="hohatch-scan")
+        return _scan_executor
+
+
+def scan_dds_files(root: Path, workers: int = SCAN_WORKERS) -> Iterator[List[os.DirEntry]]:
+    """Walks root with os.scandir, listing up to `workers` subfolders at once on the shared scan pool.
+
+    Yields the DDS entries of each folder as soon as that folder has been listed. Folders are
+    taken from a stack, so the walk goes depth-first and the first textures arrive long before
+    the walk finishes; the order between folders is not deterministic. DirEntry objects carry
+    the file type (and on Windows the size and mtime) from the listing itself, so no extra stat
+    call is made per file.
+    """
+    if not root.is_dir():
+        return
+    executor = _get_scan_executor()
+    folders = [str(root)]
+    pending: set = set()
+    try:
+        while folders or pending:
+            while folders and len(pending) < workers:
+                pending.add(executor.submit(_scan_directory, folders.pop()))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                folders.extend(subdirs)
+                if files:
+                    yield files
+    finally:
+        # An abandoned walk leaves at most `workers` listings behind; queued ones are dropped.
+        for future in pending:
+            future.cancel()
+
+
+def _listing_index(listing: ImageListing) -> Dict[str, tuple]:
+    count = len(listing.paths)
+    return dict(zip(listing.paths, zip(listing.sizes or [None] * count, listing.mtimes or [None] * count)))
+
+
+def diff_listings(old: ImageListing | None, new: ImageListing) -> Dict[str, Any]:
+    """Returns the paths added, removed and changed (size or mtime) between two listings of a base."""
+    old_index = _listing_index(old) if old else {}
+    new_index = _listing_index(new)
+    return {
+        "base": new.base,
+        "added": sorted(p for p in new_index if p not in old_index),
+        "removed": sorted(p for p in old_index if p not in new_index),
+        "changed": sorted(p for p, meta in new_index.items() if p in old_index and old_index[p] != meta),
+    }
+
+
 # --- Service Classes ---
 class ConfigService:
     def __init__(self):
@@ -118,47 +251,149 @@ class DownloadService:
                 raise FileSystemError(f"Failed to delete texconv.exe: {e}")
 
 
+class TrashBatch:
+    """Files moved aside by one delete request, kept until they are purged or restored."""
+
+    def __init__(self, batch_id: str):
+        self.batch_id = batch_id
+        # One {"dds_path", "original", "trashed"} record per deleted item; "trashed" is None
+        # for items that had to be deleted directly.
+        self.items: List[Dict[str, Any]] = []
+        self.errors: List[str] = []
+
+    def in_trash(self) -> List[Dict[str, Any]]:
+        """Returns the items that are still in the trash, i.e. neither deleted directly nor restored."""
+        return [item for item in self.items if item["trashed"] and not item.get("restored")]
+
+
 class FileService:
-    def __init__(self, config_service: ConfigService):
+    def __init__(self, config_service: ConfigService, events: EventBus | None = None):
         self.config_service = config_service
+        # DDS deletes and moves are published here, so caches can follow them.
+        self.events = events or EventBus()
+        self._scratch_lock = threading.Lock()
+        self._free_scratch_dirs: List[Path] = []
+        self._scratch_dir_count = 0
 
-    def delete_file(self, file_path_str: str):
-        file_path = Path(file_path_str)
-        if not file_path.exists():
-            raise FileSystemError(f"File not found: {file_path_str}")
-
+    def _deletion_target(self, file_path: Path) -> Path:
         parent_dir = file_path.parent
         txt_file = parent_dir / f"{file_path.stem}.txt"
 
         if file_path.suffix.lower() == ".dds" and txt_file.is_file() and parent_dir.is_dir():
-            target_to_delete = parent_dir
-            logging.info(f"Detected DDS-TXT integrated type. Deleting folder: {target_to_delete}")
-        else:
-            target_to_delete = file_path
-            logging.info(f"Detected single DDS type. Deleting file: {target_to_delete}")
+            logging.info(f"Detected DDS-TXT integrated type. Deleting folder: {parent_dir}")
+            return parent_dir
+        logging.info(f"Detected single DDS type. Deleting file: {file_path}")
+        return file_path
 
+    def _remove(self, target: Path):
         try:
-            if target_to_delete.is_dir():
-                shutil.rmtree(target_to_delete)
+            if target.is_dir():
+                shutil.rmtree(target)
             else:
-                os.remove(target_to_delete)
-            logging.info(f"Successfully deleted: {target_to_delete}")
+                os.remove(target)
+            logging.info(f"Successfully deleted: {target}")
         except OSError as e:
-            logging.error(f"Failed to delete {target_to_delete}: {e}")
-            raise FileSystemError(f"Failed to delete {target_to_delete}: {e}")
+            logging.error(f"Failed to delete {target}: {e}")
+            raise FileSystemError(f"Failed to delete {target}: {e}")
+
+    def get_trash_dir(self, path: Path) -> Path | None:
+        """Returns the trash folder of the Special K profile holding path, which is on the same volume."""
+        for parent in path.parents:
+            if parent.name == "SK_Res":
+                return parent.parent / TRASH_DIR_NAME
+        return None
+
+    def delete_file(self, file_path_str: str) -> "TrashBatch":
+        batch = self.batch_delete_files([file_path_str])
+        if batch.errors:
+            raise FileSystemError(batch.errors[0])
+        return batch
+
+    def batch_delete_files(self, file_paths: List[str]) -> "TrashBatch":
+        """Moves the files (or their DDS-TXT folders) into the profile's trash folder.
 
-    def batch_delete_files(self, file_paths: List[str]):
-        errors = []
-        for path_str in file_paths:
+        A rename within a volume is O(1) even for whole folders, so this returns at once; the data
+        is removed later by purge_trash_batch, or put back by restore_trash_batch. Targets outside a
+        Special K profile, or on another volume than its trash, are deleted directly.
+        """
+        batch = TrashBatch(f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}")
+        for index, path_str in enumerate(file_paths):
             try:
-                self.delete_file(path_str)
+                self._move_to_trash(Path(path_str), batch, index)
             except FileSystemError as e:
-                errors.append(e.message)
+                batch.errors.append(e.message)
 
+        if batch.errors:
+            logging.error("Failed to delete one or more files: " + ", ".join(batch.errors))
+        return batch
+
+    def _move_to_trash(self, file_path: Path, batch: "TrashBatch", index: int):
+        if not file_path.exists():
+            raise FileSystemError(f"File not found: {file_path}")
+        target = self._deletion_target(file_path)
+        trash_dir = self.get_trash_dir(target)
+        if trash_dir:
+            # Each item gets its own folder, so equally named targets never collide.
+            trashed = trash_dir / batch.batch_id / str(index) / target.name
+            try:
+                trashed.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(target, trashed)
+                batch.items.append({"dds_path": str(file_path), "original": str(target), "trashed": str(trashed)})
+                return
+            except OSError as e:
+                logging.warning(f"Could not move {target} to the trash, deleting it directly: {e}")
+        self._remove(target)
+        batch.items.append({"dds_path": str(file_path), "original": str(target), "trashed": None})
+        self.events.publish(FileEvent(FILE_DELETED, str(file_path)))
+
+    def purge_trash_batch(self, batch: "TrashBatch"):
+        for batch_dir in {Path(item["trashed"]).parents[1] for item in batch.items if item["trashed"]}:
+            try:
+                shutil.rmtree(batch_dir)
+            except OSError as e:
+                logging.warning(f"Failed to purge trash {batch_dir}: {e}")
+        for item in batch.items:
+            if item["trashed"] and not item.get("restored"):
+                self.events.publish(FileEvent(FILE_DELETED, item["dds_path"]))
+        logging.info(f"Purged {len(batch.items)} deleted items of batch {batch.batch_id}.")
+
+    def restore_trash_batch(self, batch: "TrashBatch") -> int:
+        """Puts the batch's trashed items back where they were.
+
+        Items that cannot be put back, because their original path is taken again or the rename
+        fails, stay in the trash so the restore can be retried; only the restored items' trash
+        folders are removed.
+        """
+        restored, errors = 0, []
+        for item in batch.in_trash():
+            original = Path(item["original"])
+            if original.exists():
+                errors.append(f"{original} already exists")
+                continue
+            try:
+                os.rename(item["trashed"], original)
+                restored += 1
+            except OSError as e:
+                errors.append(f"{original}: {e}")
+            else:
+                item["restored"] = True
+        if batch.in_trash():
+            for item in batch.items:
+                if item.get("restored"):
+                    shutil.rmtree(Path(item["trashed"]).parent, ignore_errors=True)
+        else:
+            self.purge_trash_batch(batch)
         if errors:
-            error_message = "Failed to delete one or more files: " + ", ".join(errors)
-            logging.error(error_message)
-            raise FileSystemError(error_message)
+            raise FileSystemError("Failed to restore one or more files: " + ", ".join(errors))
+        logging.info(f"Restored {restored} deleted items of batch {batch.batch_id}.")
+        return restored
+
+    def purge_leftover_trash(self, base_dirs: List[str]):
+        """Removes trash left behind by a previous session that ended before its purge ran."""
+        for trash_dir in {self.get_trash_dir(Path(base_dir)) for base_dir in base_dirs} - {None}:
+            if trash_dir.is_dir():
+                logging.info(f"Purging leftover trash: {trash_dir}")
+                shutil.rmtree(trash_dir, ignore_errors=True)
 
     def open_folder(self, folder_path: str):
         if not os.path.isdir(folder_path):
@@ -170,6 +405,7 @@ class FileService:
             logging.info(f"Moving file from {src} to {dest}")
             shutil.move(src, dest)
             logging.info(f"Successfully moved file to {dest}")
+            self.events.publish(FileEvent(FILE_MOVED, str(dest), src=str(src)))
         except (shutil.Error, OSError) as e:
             logging.error(f"Failed to move file from {src} to {dest}: {e}")
             raise FileSystemError(f"Failed to move file: {e}")
@@ -179,14 +415,39 @@ class FileService:
             shutil.rmtree(dir_path, onexc=lambda f, p, e: (os.chmod(p, 0o777), f(p)))
         dir_path.mkdir(parents=True, exist_ok=True)
 
+    def get_temp_base_dir(self) -> Path:
+        return Path(self.config_service.get_settings().texconv_executable_path).parent / "temp"
+
+    @contextmanager
+    def scratch_dir(self):
+        """Leases a long-lived scratch directory for conversion intermediates.
+
+        Directories are reused across calls instead of being created and removed for every
+        conversion; callers remove the files they create before returning the lease.
+        """
+        with self._scratch_lock:
+            if self._free_scratch_dirs:
+                path = self._free_scratch_dirs.pop()
+            else:
+                self._scratch_dir_count += 1
+                path = self.get_temp_base_dir() / "scratch" / f"worker-{self._scratch_dir_count}"
+        try:
+            # Cheap when it already exists; recreates it if the temp folder was cleaned meanwhile.
+            path.mkdir(parents=True, exist_ok=True)
+            yield path
+        finally:
+            with self._scratch_lock:
+                self._free_scratch_dirs.append(path)
+
     def get_log_folder_path(self) -> str:
         return str(Path(appdirs.user_data_dir("HoHatch", "")) / "logs")
 
     def get_file_hash(self, file_path: Path) -> str:
         hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+        with metrics.timer("file.hash"), open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
                 hash_md5.update(chunk)
+            metrics.increment("file.hash_bytes", f.tell())
         return hash_md5.hexdigest()
 
     def open_log_folder(self):
@@ -204,11 +465,38 @@ class ImageService:
         self.cache_dir.mkdir(exist_ok=True)
         self.dump_cache_dir.mkdir(exist_ok=True)
         self.inject_cache_dir.mkdir(exist_ok=True)
+        self._thumbnail_store: Optional[ThumbnailStore] = None
+        self._thumbnail_store_backend: Optional[str] = None
+        self._thumbnail_store_lock = threading.Lock()
+
+    def get_thumbnail_store(self) -> ThumbnailStore:
+        """Returns the thumbnail store selected by the thumbnail_cache_backend setting."""
+        backend = self.config_service.get_settings().thumbnail_cache_backend
+        with self._thumbnail_store_lock:
+            if self._thumbnail_store is None or self._thumbnail_store_backend != backend:
+                if self._thumbnail_store is not None:
+                    self._thumbnail_store.close()
+                if backend == "packed":
+                    self._thumbnail_store = PackedThumbnailStore(self.cache_dir / "packs")
+                else:
+                    self._thumbnail_store = FileThumbnailStore(self.cache_dir)
+                self._thumbnail_store_backend = backend
+            return self._thumbnail_store
+
+    def close_thumbnail_store(self):
+        """Releases open segment files and mappings, e.g. before the cache folder is deleted."""
+        with self._thumbnail_store_lock:
+            if self._thumbnail_store is not None:
+                self._thumbnail_store.close()
+                self._thumbnail_store = None
 
 
 class ImageDiscoveryService:
+    SNAPSHOT_VERSION = 1
+
     def __init__(self, config_service: ConfigService):
         self.config_service = config_service
+        self.snapshot_dir = get_config_dir() / "listings"
 
     def get_dump_folder_path(self) -> str | None:
         path = self._get_image_dir("dump")
@@ -240,140 +528,979 @@ class ImageDiscoveryService:
         dirs = [d for d in profiles.iterdir() if d.is_dir()]
         return dirs[0] if len(dirs) == 1 else None
 
-    def discover_images(self, folder_type: str) -> List[ImageInfo]:
+    def _get_base_path(self, folder_type: str) -> Path | None:
         base_path_str = self.get_dump_folder_path() if folder_type == "dump" else self.get_inject_folder_path()
-        if not base_path_str:
-            return []
-        base_path = Path(base_path_str)
-        pattern = "**/*.dds"
-        return [ImageInfo(src="", alt=f.name, path=f.as_posix()) for f in base_path.glob(pattern)]
+        return Path(base_path_str) if base_path_str else None
+
+    def iter_images(self, folder_type: str) -> Iterator[List[ImageInfo]]:
+        """Yields the images of a folder in batches, one per subfolder, as the scan progresses."""
+        base_path = self._get_base_path(folder_type)
+        if not base_path:
+            return
+        for entries in scan_dds_files(base_path):
+            yield [ImageInfo(src="", alt=entry.name, path=_to_posix(entry.path)) for entry in entries]
+
+    def discover_images(self, folder_type: str) -> List[ImageInfo]:
+        images = [image for batch in self.iter_images(folder_type) for image in batch]
+        images.sort(key=lambda image: image.path)
+        return images
+
+    def discover_listing(self, folder_type: str, include_metadata: bool = False) -> ImageListing | None:
+        """Lists DDS files as paths relative to the folder's base, with optional size/mtime columns."""
+        base_path = self._get_base_path(folder_type)
+        if not base_path:
+            return None
+        entries = [entry for batch in scan_dds_files(base_path) for entry in batch]
+        entries.sort(key=lambda entry: entry.path)
+        prefix_len = len(str(base_path)) + 1
+        listing = ImageListing(base=base_path.as_posix(), paths=[_to_posix(e.path[prefix_len:]) for e in entries])
+        if include_metadata:
+            listing.sizes, listing.mtimes = [], []
+            for entry in entries:
+                st = entry.stat()
+                listing.sizes.append(st.st_size)
+                listing.mtimes.append(int(st.st_mtime))
+        return listing
+
+    def load_snapshot(self, folder_type: str) -> ImageListing | None:
+        """Returns the listing saved by the last reconcile, if it belongs to the current base folder."""
+        base_path = self._get_base_path(folder_type)
+        snapshot_path = self.snapshot_dir / f"{folder_type}.json"
+        if not base_path or not snapshot_path.is_file():
+            return None
+        try:
+            data = json.loads(snapshot_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Ignoring unreadable listing snapshot {snapshot_path}: {e}")
+            return None
+        if data.get("version") != self.SNAPSHOT_VERSION or data.get("base") != base_path.as_posix():
+            return None
+        return ImageListing(base=data["base"], paths=data["paths"], sizes=data.get("sizes"), mtimes=data.get("mtimes"))
+
+    def save_snapshot(self, folder_type: str, listing: ImageListing):
+        snapshot_path = self.snapshot_dir / f"{folder_type}.json"
+        temp_path = snapshot_path.with_suffix(".json.tmp")
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps({"version": self.SNAPSHOT_VERSION, **listing.to_dict()}), encoding="utf-8")
+            os.replace(temp_path, snapshot_path)
+        except OSError as e:
+            raise FileSystemError(f"Failed to save listing snapshot {snapshot_path}: {e}")
+
+    def reconcile_listing(self, folder_type: str, served: ImageListing | None = None) -> Dict[str, Any] | None:
+        """Rescans a folder, stores it as the new snapshot and returns how it differs from what was served.
+
+        served is the listing the caller already showed; without it the diff is taken against the
+        saved snapshot. Diffing against the served listing keeps the result right even when another
+        reconcile replaced the snapshot in the meantime.
+        """
+        current = self.discover_listing(folder_type, include_metadata=True)
+        if current is None:
+            return None
+        snapshot = self.load_snapshot(folder_type)
+        snapshot_diff = diff_listings(snapshot, current)
+        if snapshot is None or snapshot_diff["added"] or snapshot_diff["removed"] or snapshot_diff["changed"]:
+            self.save_snapshot(folder_type, current)
+        return snapshot_diff if served is None else diff_listings(served, current)
 
     def get_image_counts(self) -> Dict[str, int]:
-        dump_dir_str = self.get_dump_folder_path()
-        inject_dir_str = self.get_inject_folder_path()
-        dump_dir = Path(dump_dir_str) if dump_dir_str else None
-        inject_dir = Path(inject_dir_str) if inject_dir_str else None
+        counts = {}
+        for folder_type in ("dump", "inject"):
+            base_path = self._get_base_path(folder_type)
+            counts[f"{folder_type}_count"] = sum(len(batch) for batch in scan_dds_files(base_path)) if base_path else 0
+        return counts
+
+
+class ModPackService:
+    MANIFEST_NAME = "hohatch-manifest.json"
+    MANIFEST_FORMAT = "hohatch-mod-pack"
+    MANIFEST_VERSION = 1
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, file_service: FileService):
+        self.file_service = file_service
+
+    def export_pack(self, source_dir: Path, pack_path: Path) -> Dict[str, int]:
+        """Streams every file under source_dir into a zip, hashing each one as it is written."""
+        if not source_dir.is_dir():
+            raise FileSystemError(f"Folder not found: {source_dir}")
+
+        entries = []
+        total_bytes = 0
+        try:
+            # Listed before the zip is created, and without it, so a pack saved inside source_dir
+            # is never read into itself.
+            pack_file = pack_path.resolve()
+            source_files = sorted(p for p in source_dir.rglob("*") if p.is_file() and p.resolve() != pack_file)
+            pack_path.parent.mkdir(parents=True, exist_ok=True)
+            with zipfile.ZipFile(pack_path, "w") as zf:
+                for file_path in source_files:
+                    arcname = file_path.relative_to(source_dir).as_posix()
+                    zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+                    # Block-compressed DDS data barely deflates, so it is stored as is.
+                    is_dds = file_path.suffix.lower() == ".dds"
+                    zinfo.compress_type = zipfile.ZIP_STORED if is_dds else zipfile.ZIP_DEFLATED
+
+                    hash_md5 = hashlib.md5()
+                    header = b""
+                    with open(file_path, "rb") as src, zf.open(zinfo, "w") as dest:
+                        for chunk in iter(lambda: src.read(self.CHUNK_SIZE), b""):
+                            if not header:
+                                header = chunk[: DDS_HEADER_SIZE + DX10_HEADER_SIZE]
+                            hash_md5.update(chunk)
+                            dest.write(chunk)
+
+                    dds_info = parse_dds_header(header) if is_dds else None
+                    entries.append(
+                        {
+                            "path": arcname,
+                            "size": zinfo.file_size,
+                            "md5": hash_md5.hexdigest(),
+                            "dds": dds_info.to_dict() if dds_info else None,
+                        }
+                    )
+                    total_bytes += zinfo.file_size
+
+                manifest = {
+                    "format": self.MANIFEST_FORMAT,
+                    "version": self.MANIFEST_VERSION,
+                    "files": entries,
+                }
+                zf.writestr(self.MANIFEST_NAME, json.dumps(manifest, indent=2), zipfile.ZIP_DEFLATED)
+        except (OSError, zipfile.BadZipFile) as e:
+            raise FileSystemError(f"Failed to export mod pack: {e}")
+
+        logging.info(f"Exported {len(entries)} files ({total_bytes} bytes) to mod pack {pack_path}")
+        return {"file_count": len(entries), "total_bytes": total_bytes}
+
+    def import_pack(self, pack_path: Path, target_dir: Path) -> Dict[str, int]:
+        """Extracts a mod pack into target_dir, skipping files that are already present with the same hash."""
+        if not pack_path.is_file():
+            raise FileSystemError(f"File not found: {pack_path}")
+
+        installed = skipped = bytes_written = 0
+        try:
+            with zipfile.ZipFile(pack_path, "r") as zf:
+                manifest = self._read_manifest(zf)
+                target_root = target_dir.resolve()
+                for entry in manifest["files"]:
+                    dest = (target_dir / entry["path"]).resolve()
+                    if not dest.is_relative_to(target_root):
+                        raise FileSystemError(f"Refusing to extract outside the target folder: {entry['path']}")
+
+                    if (
+                        dest.is_file()
+                        and dest.stat().st_size == entry["size"]
+                        and self.file_service.get_file_hash(dest) == entry["md5"]
+                    ):
+                        skipped += 1
+                        continue
+
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    partial = dest.with_name(f"{dest.name}.part")
+                    hash_md5 = hashlib.md5()
+                    with zf.open(entry["path"], "r") as src, open(partial, "wb") as out:
+                        for chunk in iter(lambda: src.read(self.CHUNK_SIZE), b""):
+                            hash_md5.update(chunk)
+                            out.write(chunk)
+
+                    if hash_md5.hexdigest() != entry["md5"]:
+                        os.remove(partial)
+                        raise FileSystemError(f"Hash mismatch for {entry['path']} in mod pack.")
+                    os.replace(partial, dest)
+                    self.file_service.events.publish(FileEvent(FILE_REPLACED, str(dest)))
+                    installed += 1
+                    bytes_written += entry["size"]
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            raise FileSystemError(f"Failed to import mod pack: {e}")
+
+        logging.info(f"Imported mod pack {pack_path}: {installed} installed, {skipped} unchanged.")
+        return {"installed_count": installed, "skipped_count": skipped, "bytes_written": bytes_written}
+
+    def _read_manifest(self, zf: zipfile.ZipFile) -> Dict[str, Any]:
+        try:
+            manifest = json.loads(zf.read(self.MANIFEST_NAME))
+        except KeyError:
+            raise FileSystemError("Not a HoHatch mod pack: manifest is missing.")
+        except json.JSONDecodeError as e:
+            raise FileSystemError(f"Failed to parse mod pack manifest: {e}")
+        if not isinstance(manifest, dict) or manifest.get("format") != self.MANIFEST_FORMAT:
+            raise FileSystemError("Not a HoHatch mod pack: unknown manifest format.")
+        files = manifest.get("files")
+        if not isinstance(files, list):
+            raise FileSystemError("Failed to parse mod pack manifest: the file list is missing.")
+        for entry in files:
+            if not (
+                isinstance(entry, dict)
+                and isinstance(entry.get("path"), str)
+                and type(entry.get("size")) is int
+                and isinstance(entry.get("md5"), str)
+            ):
+                raise FileSystemError(f"Failed to parse mod pack manifest: invalid file entry {entry!r:.200}")
+        return manifest
+
+
+class BatchJob:
+    """A batch operation backed by an append-only journal of completed items."""
+
+    def __init__(self, journal_path: Path, job_id: str, kind: str, items: List[str], params: Dict[str, Any]):
+        self.journal_path = journal_path
+        self.job_id = job_id
+        self.kind = kind
+        self.items = items
+        self.params = params
+        self.completed: set[int] = set()
+        self._journal = None
+
+    def pending_items(self):
+        return [(index, item) for index, item in enumerate(self.items) if index not in self.completed]
+
+    def mark_done(self, index: int):
+        self.completed.add(index)
+        self._append({"event": "done", "index": index})
+
+    def finish(self):
+        """Removes the journal once every item has completed."""
+        self.close()
+        try:
+            self.journal_path.unlink(missing_ok=True)
+        except OSError as e:
+            logging.warning(f"Failed to remove job journal {self.journal_path}: {e}")
+
+    def close(self):
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    def summary(self) -> Dict[str, Any]:
         return {
-            "dump_count": len(list(dump_dir.rglob("*.dds"))) if dump_dir and dump_dir.is_dir() else 0,
-            "inject_count": len(list(inject_dir.rglob("*.dds"))) if inject_dir and inject_dir.is_dir() else 0,
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "total": len(self.items),
+            "completed": len(self.completed),
+            "params": self.params,
         }
 
+    def _append(self, record: Dict[str, Any]):
+        try:
+            if not self._journal:
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+        except OSError as e:
+            raise FileSystemError(f"Failed to write job journal: {e}")
+
+
+class JobJournalService:
+    def __init__(self):
+        self.jobs_dir = get_config_dir() / "jobs"
+
+    def start_job(self, kind: str, items: List[str], params: Dict[str, Any]) -> BatchJob:
+        try:
+            self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            raise FileSystemError(f"Failed to create the job journal folder {self.jobs_dir}: {e}")
+        job_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        job = BatchJob(self.jobs_dir / f"{job_id}.jsonl", job_id, kind, list(items), params)
+        job._append({"event": "start", "job_id": job_id, "kind": kind, "items": job.items, "params": params})
+        logging.info(f"Started batch job {job_id} ({kind}) with {len(job.items)} items.")
+        return job
+
+    def _journal_path(self, job_id: str) -> Path:
+        # Job ids come from the frontend, so only ids this service could have made are turned into paths.
+        if not isinstance(job_id, str) or not JOB_ID_PATTERN.fullmatch(job_id):
+            raise FileSystemError(f"Invalid batch job id: {job_id!r}")
+        return self.jobs_dir / f"{job_id}.jsonl"
+
+    def load_job(self, job_id: str) -> BatchJob:
+        journal_path = self._journal_path(job_id)
+        if not journal_path.is_file():
+            raise FileSystemError(f"Batch job not found: {job_id}")
 
+        job: Optional[BatchJob] = None
+        try:
+            with open(journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted write; everything before it is valid.
+                        break
+                    if record["event"] == "start":
+                        if not isinstance(record["items"], list) or not isinstance(record["params"], dict):
+                            raise TypeError("the start record has malformed items or params")
+                        job = BatchJob(journal_path, job_id, record["kind"], record["items"], record["params"])
+                    elif record["event"] == "done" and job:
+                        if type(record["index"]) is not int:
+                            raise TypeError(f"malformed item index {record['index']!r}")
+                        job.completed.add(record["index"])
+        except (OSError, KeyError, TypeError) as e:
+            raise FileSystemError(f"Failed to read job journal {journal_path}: {e}")
+
+        if not job:
+            raise FileSystemError(f"Job journal is corrupt: {journal_path}")
+        return job
+
+    def list_pending_jobs(self) -> List[Dict[str, Any]]:
+        if not self.jobs_dir.is_dir():
+            return []
+        jobs = []
+        for journal_path in sorted(self.jobs_dir.glob("*.jsonl")):
+            try:
+                jobs.append(self.load_job(journal_path.stem).summary())
+            except FileSystemError as e:
+                logging.warning(f"Skipping unreadable job journal: {e.message}")
+        return jobs
+
+    def discard_job(self, job_id: str):
+        journal_path = self._journal_path(job_id)
+        try:
+            journal_path.unlink(missing_ok=True)
+        except OSError as e:
+            raise FileSystemError(f"Failed to discard batch job {job_id}: {e}")
+
+
+def _kill_process_tree(process: subprocess.Popen):
+    """Kills a process together with any children it spawned."""
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True, check=False)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError as e:
+        logging.warning(f"Failed to kill texconv process tree {process.pid}: {e}")
+    if process.poll() is None:
+        process.kill()
+
+
+def supported_thumbnail_formats() -> List[str]:
+    """Returns the thumbnail formats this Pillow build can encode (AVIF needs a libavif-enabled build)."""
+    Image.init()
+    return [name for name, (encoder, _) in THUMBNAIL_FORMATS.items() if encoder in Image.SAVE]
+
+
+def encode_thumbnail(image, thumbnail_format: str = "jpeg", quality: int = DEFAULT_THUMBNAIL_QUALITY) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=THUMBNAIL_FORMATS[thumbnail_format][0], quality=quality)
+    return buffer.getvalue()
+
+
+def thumbnail_mime(data: bytes) -> str:
+    """Returns the MIME type of encoded thumbnail data, whichever format setting it was cached under."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:12] in (b"ftypavif", b"ftypavis"):
+        return "image/avif"
+    return "image/jpeg"
+
+
+@instrumented("texconv_service")
 class TexconvService:
     def __init__(self, config_service: ConfigService, file_service: FileService, image_service: ImageService):
         self.config_service = config_service
         self.file_service = file_service
         self.image_service = image_service
+        # The most recent slow outliers, newest last.
+        self.slow_runs: deque = deque(maxlen=20)
+        self._unsupported_formats_logged: set = set()
+        # Guards the deep-zoom bookkeeping below; renders only hold the lock stripe of their own texture.
+        self._deep_zoom_lock = threading.Lock()
+        self._deep_zoom_texture_locks = [threading.Lock() for _ in range(DEEP_ZOOM_LOCK_STRIPES)]
+        # (zoom key, validator) -> decoded pyramid levels of the most recently zoomed textures.
+        self._deep_zoom_images: OrderedDict = OrderedDict()
+        # Thumbnail cache key -> keys of the cached contact sheets its texture is on.
+        self._contact_sheets: Dict[str, set] = {}
+        self._contact_sheets_lock = threading.Lock()
+        # Pillow handles the common block formats in-process; texconv covers everything else. The
+        # limiter tunes how many conversions run at once to what this machine sustains right now.
+        self.engines = EngineRegistry(
+            [
+                PillowEngine(),
+                TexconvEngine(
+                    self._run_texconv,
+                    self.file_service.scratch_dir,
+                    lambda: Path(self.config_service.get_settings().texconv_executable_path),
+                ),
+            ],
+            limiter=AdaptiveConcurrencyLimiter(),
+        )
 
     def _run_texconv(self, args: List[str]):
         settings = self.config_service.get_settings()
         cmd = [str(settings.texconv_executable_path)] + args
-        logging.info(f"Running texconv command: {' '.join(cmd)}")
+        timeout = settings.texconv_timeout_seconds or None
+        attempts = 1 + max(0, settings.texconv_retries)
+        logging.debug(f"Running texconv command: {' '.join(cmd)}")
+        for attempt in range(1, attempts + 1):
+            try:
+                result = self._invoke_texconv(cmd, timeout)
+                logging.debug(f"Texconv stdout: {result.stdout[-TEXCONV_LOG_TAIL:]}")
+                if result.stderr:
+                    logging.warning(f"Texconv stderr: {result.stderr}")
+                return result
+            except subprocess.CalledProcessError as e:
+                # A non-zero exit is deterministic for a given input, so it is not retried.
+                logging.error(f"Texconv execution failed for command: {' '.join(cmd)}")
+                logging.error(f"Texconv stdout: {e.stdout}")
+                logging.error(f"Texconv stderr: {e.stderr}")
+                raise TexconvError(f"Texconv execution failed: {e.stderr}")
+            except FileNotFoundError as e:
+                logging.error(f"Texconv executable not found at {settings.texconv_executable_path}")
+                raise TexconvError(f"Texconv executable not found: {e}")
+            except TexconvTimeoutError:
+                # A hung run already cost a full timeout; retrying would only double the wait.
+                raise
+            except OSError as e:
+                # Launch failures (e.g. the executable locked by a virus scan) are often transient.
+                if attempt == attempts:
+                    raise TexconvError(f"Failed to start texconv: {e}")
+                metrics.increment("texconv.retries")
+                logging.warning(f"Texconv attempt {attempt}/{attempts} failed, retrying: {e}")
+                time.sleep(TEXCONV_RETRY_DELAY_SECONDS * attempt)
+            except Exception as e:
+                logging.error(f"An unexpected error occurred during texconv execution: {e}")
+                raise TexconvError(f"An unexpected error occurred during texconv execution: {e}")
+
+    def _invoke_texconv(self, cmd: List[str], timeout: Optional[float]) -> subprocess.CompletedProcess:
+        metrics.increment("texconv.invocations")
+        start = time.perf_counter()
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, encoding="utf-8", errors="replace")
-            logging.info(f"Texconv stdout: {result.stdout}")
-            if result.stderr:
-                logging.warning(f"Texconv stderr: {result.stderr}")
-            return result
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Texconv execution failed for command: {' '.join(cmd)}")
-            logging.error(f"Texconv stdout: {e.stdout}")
-            logging.error(f"Texconv stderr: {e.stderr}")
-            raise TexconvError(f"Texconv execution failed: {e.stderr}")
-        except FileNotFoundError as e:
-            logging.error(f"Texconv executable not found at {settings.texconv_executable_path}")
-            raise TexconvError(f"Texconv executable not found: {e}")
-        except Exception as e:
-            logging.error(f"An unexpected error occurred during texconv execution: {e}")
-            raise TexconvError(f"An unexpected error occurred during texconv execution: {e}")
+            # texconv gets its own process group so a hung run can be killed together with its children.
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                start_new_session=os.name != "nt",
+            )
+            metrics.observe("texconv.spawn", (time.perf_counter() - start) * 1000)
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                _kill_process_tree(process)
+                process.communicate()
+                metrics.increment("texconv.timeouts")
+                logging.error(f"Texconv timed out after {timeout} s and was killed: {' '.join(cmd)}")
+                raise TexconvTimeoutError(f"Texconv timed out after {timeout} seconds.")
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe("texconv.run", elapsed * 1000)
+            if elapsed >= TEXCONV_SLOW_SECONDS:
+                metrics.increment("texconv.slow")
+                self.slow_runs.append({"seconds": round(elapsed, 3), "command": cmd, "at": datetime.now().isoformat()})
+                logging.warning(f"Slow texconv run ({elapsed:.1f} s): {' '.join(cmd)}")
+
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
 
     def convert_to_jpg(self, dds_path: str, output_file_path: str) -> str:
+        out_p = Path(output_file_path)
+        with self.open_as_image(dds_path) as img:
+            out_p.parent.mkdir(parents=True, exist_ok=True)
+            img.save(out_p)
+        return str(out_p)
+
+    @contextmanager
+    def open_as_image(self, dds_path: str, full_resolution: bool = False, interactive: bool = False):
+        """Decodes a DDS with the best engine for its format and yields the upright, output-sized image.
+
+        Nothing is encoded on the way, so the only lossy step is the caller's final encode straight
+        to its destination (a file, a zip entry, ...). With full_resolution the image keeps the
+        texture's own size. interactive decodes go ahead of exports and other background work.
+        """
         settings = self.config_service.get_settings()
-        dds_p, out_p = Path(dds_path), Path(output_file_path)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            args = [
-                "-o",
-                str(temp_dir),
-                str(dds_p),
-                "-ft",
-                "jpg",
-                "-w",
-                str(settings.output_width),
-                "-h",
-                str(settings.output_height),
-                "-r",
-                "-y",
-            ]
-            self._run_texconv(args)
-
-            temp_output_file = Path(temp_dir) / f"{dds_p.stem}.jpg"
-            if temp_output_file.is_file():
-                out_p.parent.mkdir(parents=True, exist_ok=True)
-                shutil.move(str(temp_output_file), str(out_p))
-                with Image.open(out_p) as img:
-                    img.transpose(Image.FLIP_TOP_BOTTOM).save(out_p)  # type: ignore
-                return str(out_p)
-            raise TexconvError("Conversion failed: Output file not found in temporary directory.")
-
-    def convert_to_dds(self, jpg_path: str, out_dir: str, new_name: str) -> str:
-        # settings = self.config_service.get_settings()
-        temp_flipped_path = Path(out_dir) / f"flipped_{Path(jpg_path).name}"
+        size = None if full_resolution else (settings.output_width, settings.output_height)
+        dds_p = Path(dds_path)
+        img = self.engines.run(
+            DECODE, self._dds_format(dds_p), lambda engine: engine.decode(dds_p, size), interactive=interactive
+        )
+        flipped = img.transpose(Image.FLIP_TOP_BOTTOM)  # type: ignore
+        yield flipped if flipped.mode in ("RGB", "L") else flipped.convert("RGB")
+
+    @staticmethod
+    def _dds_format(dds_path: Path) -> Optional[str]:
         try:
-            with Image.open(jpg_path) as img:
-                # Always resize to 1024x1024 for injected DDS images
-                resized_img = img.resize((1024, 1024), Image.LANCZOS)  # type: ignore
-                resized_img.transpose(Image.FLIP_TOP_BOTTOM).save(temp_flipped_path)  # type: ignore
+            info = read_dds_info(dds_path)
+        except OSError:
+            return None
+        return info.format if info else None
 
-            args = ["-f", "BC7_UNORM", "-o", out_dir, str(temp_flipped_path), "-m", "11", "-y"]
-            self._run_texconv(args)
+    def convert_to_dds(
+        self, jpg_path: str, out_dir: str, new_name: str, on_image: Optional[Callable[[Any], None]] = None
+    ) -> str:
+        """Converts an image to a BC7 DDS named new_name in out_dir.
 
-            created_dds = Path(out_dir) / f"{temp_flipped_path.stem}.dds"
-            final_dds = Path(out_dir) / new_name
+        on_image, if given, receives the upright 1024x1024 image the DDS was encoded from, so
+        callers can build previews of the new texture without decoding it again.
+        """
+        with Image.open(jpg_path) as img:
+            # Always resize to 1024x1024 for injected DDS images
+            resized_img = img.resize((1024, 1024), Image.LANCZOS)  # type: ignore
+            flipped = resized_img.transpose(Image.FLIP_TOP_BOTTOM)  # type: ignore
 
-            if created_dds.is_file():
-                created_dds.rename(final_dds)
-                return str(final_dds)
-            raise TexconvError("Conversion to DDS failed.")
-        finally:
-            if temp_flipped_path.exists():
-                os.remove(temp_flipped_path)
+        out_p = Path(out_dir)
+        stem = f"flipped_{Path(jpg_path).stem}"
+        created_dds = self.engines.run(
+            ENCODE, "BC7_UNORM", lambda engine: engine.encode(flipped, out_p, stem, "BC7_UNORM", 11), mips=True
+        )
+        final_dds = out_p / new_name
+        created_dds.replace(final_dds)
+        if on_image:
+            on_image(resized_img)
+        return str(final_dds)
+
+    def _cache_key(self, dds_path: str, is_dump_image: bool, base_dir: Path) -> str:
+        """Returns the thumbnail store key of a DDS, e.g. "dump/card_01/card_01"."""
+        # Use os.path.relpath for robustness
+        relative_path = Path(os.path.relpath(dds_path, base_dir)).with_suffix("")
+        return f"{'dump' if is_dump_image else 'inject'}/{relative_path.as_posix()}"
+
+    def find_stale_cache_entries(
+        self, dds_paths: List[str], is_dump_image: bool, base_dir: Path, workers: int = HASH_WORKERS
+    ) -> Dict[str, Any]:
+        """Checks the cached thumbnails of dds_paths against their DDS hashes, hashing in parallel.
+
+        Textures without a thumbnail are not stale; they are simply converted on first display.
+        """
+        store = self.image_service.get_thumbnail_store()
+        cached = []
+        for dds_path in dds_paths:
+            cached_hash = store.get_hash(self._cache_key(dds_path, is_dump_image, base_dir))
+            if cached_hash is not None:
+                cached.append((dds_path, cached_hash))
+        encoding = self._thumbnail_encoding()
+
+        def is_stale(item) -> bool:
+            dds_path, cached_hash = item
+            try:
+                return cached_hash != self._cache_validator(self.file_service.get_file_hash(Path(dds_path)), encoding)
+            except OSError:
+                return True
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hohatch-hash") as executor:
+            stale = [item[0] for item, result in zip(cached, executor.map(is_stale, cached)) if result]
+        metrics.increment("cache_verify.checked", len(cached))
+        metrics.increment("cache_verify.stale", len(stale))
+        return {"checked": len(cached), "stale": stale}
 
-    def get_displayable_image(self, dds_path: str, is_dump_image: bool, base_dir: Path) -> str:
-        cache_dir = self.image_service.dump_cache_dir if is_dump_image else self.image_service.inject_cache_dir
+    def write_cache_entry(self, dds_path: str, is_dump_image: bool, base_dir: Path, image):
+        """Caches the thumbnail of a DDS from its already decoded, upright pixels."""
+        settings = self.config_service.get_settings()
+        thumbnail = image.resize((settings.output_width, settings.output_height), Image.LANCZOS)  # type: ignore
+        if thumbnail.mode not in ("RGB", "L"):
+            thumbnail = thumbnail.convert("RGB")
+        encoding = self._thumbnail_encoding()
+        try:
+            validator = self._cache_validator(self.file_service.get_file_hash(Path(dds_path)), encoding)
+        except OSError as e:
+            raise FileSystemError(f"Failed to hash {dds_path}: {e}")
+        key = self._cache_key(dds_path, is_dump_image, base_dir)
+        self.image_service.get_thumbnail_store().put(key, encode_thumbnail(thumbnail, *encoding), validator)
+        self._drop_contact_sheets(key)
+
+    def _thumbnail_encoding(self) -> Tuple[str, int]:
+        """Returns the configured (format, quality), falling back to JPEG if Pillow cannot encode the format."""
+        settings = self.config_service.get_settings()
+        thumbnail_format = settings.thumbnail_format
+        if thumbnail_format != "jpeg" and thumbnail_format not in supported_thumbnail_formats():
+            if thumbnail_format not in self._unsupported_formats_logged:
+                self._unsupported_formats_logged.add(thumbnail_format)
+                logging.warning(f"Thumbnail format {thumbnail_format!r} is not supported here; using JPEG.")
+            thumbnail_format = "jpeg"
+        return thumbnail_format, settings.thumbnail_quality
+
+    def _cache_validator(self, dds_hash: str, encoding: Tuple[str, int]) -> str:
+        """Returns what is stored alongside a thumbnail: the DDS hash, tagged with the encoding when it is not
+        the original default, so changing the format or quality invalidates existing thumbnails."""
+        if encoding == ("jpeg", DEFAULT_THUMBNAIL_QUALITY):
+            return dds_hash
+        return f"{dds_hash}:{encoding[0]}{encoding[1]}"
+
+    def move_cache_entry(
+        self, src: str, src_is_dump: bool, src_base: Path, dest: str, dest_is_dump: bool, dest_base: Path
+    ):
+        """Moves a cached thumbnail along with its DDS; the DDS content, and so its hash, is unchanged."""
+        src_key = self._cache_key(src, src_is_dump, src_base)
+        dest_key = self._cache_key(dest, dest_is_dump, dest_base)
+        store = self.image_service.get_thumbnail_store()
+        if not store.move(src_key, dest_key):
+            store.delete(src_key)
+            store.delete(dest_key)
+        self._drop_contact_sheets(src_key)
+        self._drop_contact_sheets(dest_key)
+        self._drop_deep_zoom(src_key)
+        self._drop_deep_zoom(dest_key)
+
+    def drop_cache_entry(self, dds_path: str, is_dump_image: bool, base_dir: Path):
+        key = self._cache_key(dds_path, is_dump_image, base_dir)
+        self.image_service.get_thumbnail_store().delete(key)
+        self._drop_contact_sheets(key)
+        self._drop_deep_zoom(key)
+
+    def get_displayable_image(
+        self, dds_path: str, is_dump_image: bool, base_dir: Path, interactive: bool = True
+    ) -> str:
+        """Returns a cached or freshly rendered thumbnail; interactive=False renders it as background work."""
+        src = self.get_cached_display_image(dds_path, is_dump_image, base_dir)
+        return src if src is not None else self.render_display_image(dds_path, is_dump_image, base_dir, interactive)
+
+    def get_cached_display_image(self, dds_path: str, is_dump_image: bool, base_dir: Path) -> Optional[str]:
+        """Returns the data URI of an up-to-date cached thumbnail, or None if the DDS has to be converted."""
+        data = self._cached_thumbnail(dds_path, is_dump_image, base_dir)
+        return None if data is None else self._display_src(data)
+
+    def render_display_image(self, dds_path: str, is_dump_image: bool, base_dir: Path, interactive: bool = True) -> str:
+        """Converts a DDS for display and caches the thumbnail, without consulting the cache first."""
+        return self._display_src(self._render_thumbnail(dds_path, is_dump_image, base_dir, interactive))
+
+    def _cached_thumbnail(self, dds_path: str, is_dump_image: bool, base_dir: Path) -> Optional[bytes]:
         dds_p = Path(dds_path)
         if not dds_p.exists():
             raise FileSystemError(f"DDS file not found: {dds_path}")
 
-        # Use os.path.relpath for robustness
-        relative_path_str = os.path.relpath(dds_path, base_dir)
-        relative_path = Path(relative_path_str)
+        store = self.image_service.get_thumbnail_store()
+        data = None
+        # The thumbnail and its hash are read as one pair, so a concurrent re-render cannot mix them up.
+        entry = store.get_entry(self._cache_key(dds_path, is_dump_image, base_dir))
+        if entry and entry[1]:
+            try:
+                current_hash = self._cache_validator(self.file_service.get_file_hash(dds_p), self._thumbnail_encoding())
+                if current_hash == entry[1]:
+                    data = entry[0]
+            except OSError as e:
+                logging.warning(f"Could not hash {dds_path}, proceeding to recache: {e}")
 
-        cache_file = (cache_dir / relative_path).with_suffix(".jpg")
-        hash_file = (cache_dir / relative_path).with_suffix(".hash")
+        metrics.increment("display_cache.misses" if data is None else "display_cache.hits")
+        if data is not None:
+            logging.debug(f"Using existing cache for {dds_path}")
+        return data
 
-        should_recache = True
-        if hash_file.exists() and cache_file.exists():
-            try:
-                current_hash = self.file_service.get_file_hash(dds_p)
-                cached_hash = hash_file.read_text(encoding="utf-8")
-                if current_hash == cached_hash:
-                    should_recache = False
-            except (IOError, FileNotFoundError) as e:
-                logging.warning(f"Could not read cache or hash file, proceeding to recache: {e}")
-                pass
-
-        if should_recache:
-            logging.info(f"Recaching display image for {dds_path}")
-            cache_file.parent.mkdir(parents=True, exist_ok=True)
-            self.convert_to_jpg(dds_path, str(cache_file))
-            new_hash = self.file_service.get_file_hash(dds_p)
-            try:
-                hash_file.write_text(new_hash, encoding="utf-8")
-            except IOError as e:
-                logging.error(f"Failed to write hash file for {dds_path}: {e}")
+    def _render_thumbnail(self, dds_path: str, is_dump_image: bool, base_dir: Path, interactive: bool = True) -> bytes:
+        logging.debug(f"Recaching display image for {dds_path}")
+        encoding = self._thumbnail_encoding()
+        with self.open_as_image(dds_path, interactive=interactive) as img:
+            data = encode_thumbnail(img, *encoding)
+        try:
+            validator = self._cache_validator(self.file_service.get_file_hash(Path(dds_path)), encoding)
+            self.image_service.get_thumbnail_store().put(
+                self._cache_key(dds_path, is_dump_image, base_dir), data, validator
+            )
+        except (OSError, FileSystemError) as e:
+            logging.error(f"Failed to cache display image for {dds_path}: {e}")
+        return data
+
+    def get_contact_sheet(
+        self,
+        dds_paths: List[str],
+        is_dump_image: bool,
+        base_dir: Path,
+        columns: int,
+        tile_height: int,
+        workers: int = HASH_WORKERS,
+    ) -> Dict[str, Any]:
+        """Renders dds_paths row by row into one sprite sheet and returns it with the tile rectangle of each DDS.
+
+        The sheet is cached under a key made from the page's paths and layout, with the sizes and
+        modification times of its textures as the validator, so an unchanged page is served with a
+        single store read and a changed one replaces its own entry. Deleting, moving or replacing
+        a texture also drops the cached sheets it is on.
+        """
+        if not dds_paths:
+            raise HoHatchError("No textures to put on a contact sheet.")
+        tile_width = int(tile_height * (53 / 64))
+        columns = max(1, min(columns, len(dds_paths)))
+        rows = -(-len(dds_paths) // columns)
+        tiles = {
+            path: [(i % columns) * tile_width, (i // columns) * tile_height, tile_width, tile_height]
+            for i, path in enumerate(dds_paths)
+        }
+        encoding = self._thumbnail_encoding()
+        store = self.image_service.get_thumbnail_store()
+        key, validator = self._contact_sheet_key(dds_paths, is_dump_image, base_dir, columns, tile_height, encoding)
+        self._track_contact_sheet(key, dds_paths, is_dump_image, base_dir)
+        errors: Dict[str, str] = {}
+
+        entry = store.get_entry(key)
+        data = entry[0] if entry and entry[1] == validator else None
+        metrics.increment("contact_sheet.misses" if data is None else "contact_sheet.hits")
+        if data is None:
+
+            def load_tile(dds_path: str):
+                try:
+                    thumbnail = self._cached_thumbnail(dds_path, is_dump_image, base_dir)
+                    if thumbnail is None:
+                        thumbnail = self._render_thumbnail(dds_path, is_dump_image, base_dir)
+                except HoHatchError as e:
+                    return e
+                with Image.open(io.BytesIO(thumbnail)) as img:
+                    return img.convert("RGB").resize((tile_width, tile_height), Image.LANCZOS)  # type: ignore
+
+            sheet = Image.new("RGB", (columns * tile_width, rows * tile_height))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hohatch-sheet") as executor:
+                for dds_path, tile in zip(dds_paths, executor.map(load_tile, dds_paths)):
+                    if isinstance(tile, HoHatchError):
+                        logging.warning(f"Leaving contact sheet tile of {dds_path} blank: {tile.message}")
+                        errors[dds_path] = tile.message
+                    else:
+                        sheet.paste(tile, tuple(tiles[dds_path][:2]))
+            data = encode_thumbnail(sheet, *encoding)
+            # A sheet with blank tiles is not cached, so the failed textures are retried next time.
+            if not errors:
+                try:
+                    store.put(key, data, validator)
+                except FileSystemError as e:
+                    logging.error(f"Failed to cache contact sheet: {e}")
+
+        return {
+            "src": self._display_src(data),
+            "columns": columns,
+            "tile_width": tile_width,
+            "tile_height": tile_height,
+            "tiles": tiles,
+            "errors": errors,
+        }
+
+    def get_deep_zoom_info(self, dds_path: str, is_dump_image: bool, base_dir: Path) -> Dict[str, Any]:
+        """Returns the size and level count of the tile pyramid of a DDS.
+
+        Level 0 is the full-resolution texture and each further level halves the previous one.
+        Tiles are only rendered when get_deep_zoom_tiles asks for them, and are cached with the
+        display thumbnails under "zoom/<thumbnail key>/<level>/<col>_<row>" together with the
+        validator of the DDS they were cut from, so a replaced texture never serves old tiles.
+        """
+        key, validator, _ = self._deep_zoom_source(dds_path, is_dump_image, base_dir)
+        return {**self._deep_zoom_info(dds_path, key, validator), "key": key}
+
+    def _deep_zoom_source(self, dds_path: str, is_dump_image: bool, base_dir: Path) -> Tuple[str, str, Tuple[str, int]]:
+        dds_p = Path(dds_path)
+        if not dds_p.exists():
+            raise FileSystemError(f"DDS file not found: {dds_path}")
+        encoding = self._thumbnail_encoding()
+        try:
+            validator = self._cache_validator(self.file_service.get_file_hash(dds_p), encoding)
+        except OSError as e:
+            raise FileSystemError(f"Failed to hash {dds_path}: {e}")
+        return f"zoom/{self._cache_key(dds_path, is_dump_image, base_dir)}", validator, encoding
+
+    def _deep_zoom_info(self, dds_path: str, key: str, validator: str) -> Dict[str, Any]:
+        store = self.image_service.get_thumbnail_store()
+        entry = store.get_entry(f"{key}/info")
+        if entry and entry[1] == validator:
+            return json.loads(entry[0])
+        header = self._dds_info(Path(dds_path))
+        if header:
+            width, height = header.width, header.height
         else:
-            logging.debug(f"Using existing cache for {dds_path}")
+            # Only textures whose header HoHatch cannot parse have to be decoded for their size.
+            with self._deep_zoom_texture_lock(key):
+                width, height = self._deep_zoom_level(dds_path, key, validator, 0).size
+        levels = 1
+        while max(self._deep_zoom_level_size(width, height, levels - 1)) > DEEP_ZOOM_TILE_SIZE:
+            levels += 1
+        info = {"width": width, "height": height, "tile_size": DEEP_ZOOM_TILE_SIZE, "levels": levels}
+        try:
+            store.put(f"{key}/info", json.dumps(info).encode("utf-8"), validator)
+        except FileSystemError as e:
+            logging.error(f"Failed to cache deep-zoom info of {dds_path}: {e}")
+        return info
 
-        with open(cache_file, "rb") as f:
-            return f"data:image/jpeg;base64,{base64.b64encode(f.read()).decode('utf-8')}"
+    @staticmethod
+    def _dds_info(dds_path: Path):
+        try:
+            return read_dds_info(dds_path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _deep_zoom_level_size(width: int, height: int, level: int) -> Tuple[int, int]:
+        for _ in range(level):
+            width, height = max(1, -(-width // 2)), max(1, -(-height // 2))
+        return width, height
+
+    def _deep_zoom_texture_lock(self, key: str) -> threading.Lock:
+        return self._deep_zoom_texture_locks[zlib.crc32(key.encode("utf-8")) % DEEP_ZOOM_LOCK_STRIPES]
+
+    def _drop_deep_zoom(self, cache_key: str):
+        """Drops the cached tiles, info and decoded levels of the texture with the given thumbnail key."""
+        key = f"zoom/{cache_key}"
+        self.image_service.get_thumbnail_store().delete_prefix(key)
+        with self._deep_zoom_lock:
+            for cached in [cached for cached in self._deep_zoom_images if cached[0] == key]:
+                del self._deep_zoom_images[cached]
+
+    def _deep_zoom_level(self, dds_path: str, key: str, validator: str, level: int):
+        """Returns the image of a pyramid level; callers hold the texture's deep-zoom lock.
+
+        The decoded texture and the levels made from it are kept for the few most recently
+        zoomed textures, so panning across a level decodes the DDS only once.
+        """
+        with self._deep_zoom_lock:
+            levels = self._deep_zoom_images.get((key, validator))
+            if levels is not None:
+                self._deep_zoom_images.move_to_end((key, validator))
+        if levels is None:
+            with self.open_as_image(dds_path, full_resolution=True, interactive=True) as img:
+                levels = {0: img}
+            with self._deep_zoom_lock:
+                self._deep_zoom_images[(key, validator)] = levels
+                while len(self._deep_zoom_images) > DEEP_ZOOM_CACHED_TEXTURES:
+                    self._deep_zoom_images.popitem(last=False)
+        for missing in range(max(levels) + 1, level + 1):
+            above = levels[missing - 1]
+            size = self._deep_zoom_level_size(above.width, above.height, 1)
+            levels[missing] = above.resize(size, Image.LANCZOS)  # type: ignore
+        return levels[level]
+
+    def get_deep_zoom_tiles(
+        self, dds_path: str, is_dump_image: bool, base_dir: Path, level: int, tiles: List[List[int]]
+    ) -> Dict[str, Any]:
+        """Returns the requested [col, row] tiles of one pyramid level as data URIs keyed by "<col>_<row>".
+
+        Tiles that are not cached for the texture's current content are rendered now.
+        """
+        key, validator, encoding = self._deep_zoom_source(dds_path, is_dump_image, base_dir)
+        info = self._deep_zoom_info(dds_path, key, validator)
+        if type(level) is not int or not 0 <= level < info["levels"]:
+            raise HoHatchError(f"Invalid deep-zoom level {level!r} for {dds_path}")
+        width, height = self._deep_zoom_level_size(info["width"], info["height"], level)
+        tile_size = info["tile_size"]
+        columns, rows = -(-width // tile_size), -(-height // tile_size)
+        if not isinstance(tiles, (list, tuple)):
+            raise HoHatchError(f"Invalid deep-zoom tile list for {dds_path}")
+        for tile in tiles:
+            if not (
+                isinstance(tile, (list, tuple))
+                and len(tile) == 2
+                and all(type(v) is int for v in tile)
+                and 0 <= tile[0] < columns
+                and 0 <= tile[1] < rows
+            ):
+                raise HoHatchError(f"Invalid deep-zoom tile {tile!r} for level {level} of {dds_path}")
+
+        store = self.image_service.get_thumbnail_store()
+        result, missing = {}, []
+        for col, row in tiles:
+            entry = store.get_entry(f"{key}/{level}/{col}_{row}")
+            if entry and entry[1] == validator:
+                result[f"{col}_{row}"] = self._display_src(entry[0])
+            else:
+                missing.append((col, row))
+        metrics.increment("deep_zoom.tile_hits", len(result))
+        if not missing:
+            return result
+
+        start = time.perf_counter()
+        with self._deep_zoom_texture_lock(key):
+            level_img = self._deep_zoom_level(dds_path, key, validator, level)
+            for col, row in missing:
+                box = (
+                    col * tile_size,
+                    row * tile_size,
+                    min((col + 1) * tile_size, level_img.width),
+                    min((row + 1) * tile_size, level_img.height),
+                )
+                data = encode_thumbnail(level_img.crop(box), *encoding)
+                try:
+                    store.put(f"{key}/{level}/{col}_{row}", data, validator)
+                except FileSystemError as e:
+                    logging.error(f"Failed to cache deep-zoom tile of {dds_path}: {e}")
+                result[f"{col}_{row}"] = self._display_src(data)
+        metrics.increment("deep_zoom.tiles_rendered", len(missing))
+        metrics.observe("deep_zoom.render", (time.perf_counter() - start) * 1000)
+        return result
+
+    def _contact_sheet_key(
+        self,
+        dds_paths: List[str],
+        is_dump_image: bool,
+        base_dir: Path,
+        columns: int,
+        tile_height: int,
+        encoding: Tuple[str, int],
+    ) -> Tuple[str, str]:
+        """Returns the store key of a page's sheet and the validator of its textures' current state."""
+        key = hashlib.sha1(f"{columns}:{tile_height}:{encoding[0]}{encoding[1]}".encode("utf-8"))
+        validator = hashlib.sha1()
+        for dds_path in dds_paths:
+            try:
+                st = os.stat(dds_path)
+                fingerprint = f"{st.st_size}:{st.st_mtime_ns}"
+            except OSError:
+                fingerprint = "missing"
+            key.update(f"\0{self._cache_key(dds_path, is_dump_image, base_dir)}".encode("utf-8"))
+            validator.update(f"\0{fingerprint}".encode("utf-8"))
+        return f"sheets/{key.hexdigest()}", validator.hexdigest()
+
+    def _track_contact_sheet(self, sheet_key: str, dds_paths: List[str], is_dump_image: bool, base_dir: Path):
+        with self._contact_sheets_lock:
+            for dds_path in dds_paths:
+                cache_key = self._cache_key(dds_path, is_dump_image, base_dir)
+                self._contact_sheets.setdefault(cache_key, set()).add(sheet_key)
+
+    def _drop_contact_sheets(self, cache_key: str):
+        """Drops the cached sheets showing the thumbnail with cache_key, once its DDS has changed."""
+        with self._contact_sheets_lock:
+            sheet_keys = self._contact_sheets.pop(cache_key, set())
+        store = self.image_service.get_thumbnail_store()
+        for sheet_key in sheet_keys:
+            store.delete(sheet_key)
+
+    def _display_src(self, data: bytes) -> str:
+        src = f"data:{thumbnail_mime(data)};base64,{base64.b64encode(data).decode('utf-8')}"
+        metrics.increment("display.bytes_returned", len(src))
+        return src
+
+
+class CacheMaintainer:
+    """Keeps the dump and inject thumbnail caches in step with DDS deletes, moves and replacements."""
+
+    def __init__(
+        self, events: EventBus, texconv_service: TexconvService, image_discovery_service: ImageDiscoveryService
+    ):
+        self.texconv_service = texconv_service
+        self.image_discovery_service = image_discovery_service
+        events.subscribe(FILE_DELETED, self._on_deleted)
+        events.subscribe(FILE_MOVED, self._on_moved)
+        events.subscribe(FILE_REPLACED, self._on_replaced)
+
+    def _locate(self, dds_path: str):
+        """Returns (is_dump_image, base_dir) for a DDS inside the dump or inject folder, else None."""
+        for is_dump_image, base_dir in (
+            (True, self.image_discovery_service.get_dump_folder_path()),
+            (False, self.image_discovery_service.get_inject_folder_path()),
+        ):
+            if base_dir and Path(dds_path).is_relative_to(base_dir):
+                return is_dump_image, Path(base_dir)
+        return None
+
+    def _on_deleted(self, event: FileEvent):
+        location = self._locate(event.path)
+        if location:
+            self.texconv_service.drop_cache_entry(event.path, *location)
+
+    def _on_moved(self, event: FileEvent):
+        src_location = self._locate(event.src) if event.src else None
+        dest_location = self._locate(event.path)
+        if src_location and dest_location:
+            self.texconv_service.move_cache_entry(event.src, *src_location, event.path, *dest_location)
+        elif src_location:
+            self.texconv_service.drop_cache_entry(event.src, *src_location)
+        elif dest_location:
+            # New data from outside the image folders; whatever was cached for the path is stale.
+            self.texconv_service.drop_cache_entry(event.path, *dest_location)
+
+    def _on_replaced(self, event: FileEvent):
+        location = self._locate(event.path)
+        if not location:
+            return
+        if event.image is None:
+            self.texconv_service.drop_cache_entry(event.path, *location)
+            return
+        try:
+            self.texconv_service.write_cache_entry(event.path, *location, event.image)
+        except FileSystemError as e:
+            logging.warning(e.message)
+            self.texconv_service.drop_cache_entry(event.path, *location)
@@ -3,14 +3,23 @@ a = Analysis(
         "../main.py",
         "../api.py",
         "../backend_api.py",
+        "../concurrency.py",
+        "../dds.py",
         "../dto.py",
+        "../engines.py",
+        "../events.py",
         "../exceptions.py",
+        "../lazy.py",
+        "../logging_setup.py",
+        "../metrics.py",
+        "../profiling.py",
         "../services.py",
+        "../thumbnail_store.py",
         "../version.py",
     ],
     binaries=[],
     datas=[("..\\..\\frontend\\dist", "frontend/dist")],
-    hiddenimports=["appdirs"],
+    hiddenimports=["appdirs", "PIL.Image", "requests", "webview"],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -102,4 +102,113 @@ def test_open_file_dialog_exception(mock_api_instance):
     api_instance, _, MockWebview, mock_active_window, _, mock_logging_error = mock_api_instance
     mock_active_window.create_file_dialog.side_effect = Exception("Mock dialog error")
     with pytest.raises(Exception, match="Mock dialog error"):
-        api_instance.open_file_dialog("file_open")
\ No newline at end of file
+        api_instance.open_file_dialog("file_open")
+
+def test_image_scan_streams_custom_events(mock_api_instance):
+    api_instance, mock_backend, _, mock_active_window, _, _ = mock_api_instance
+
+    def fake_scan(folder_type, on_batch):
+        on_batch([{"src": "", "alt": "a.dds", "path": "/mock/a.dds"}])
+        return {"success": True, "cancelled": False, "total": 1}
+
+    mock_backend.scan_images.side_effect = fake_scan
+    api_instance._scan_ids["dump"] = "scan-1"
+    api_instance._run_image_scan("dump", "scan-1")
+
+    scripts = [c.args[0] for c in mock_active_window.evaluate_js.call_args_list]
+    assert len(scripts) == 2
+    assert scripts[0].startswith('window.dispatchEvent(new CustomEvent("imageScanBatch", {detail: {"scan_id": "scan-1"')
+    assert '"path": "/mock/a.dds"' in scripts[0]
+    assert 'new CustomEvent("imageScanComplete"' in scripts[1]
+
+
+def test_superseded_image_scan_stops_streaming(mock_api_instance):
+    api_instance, mock_backend, _, mock_active_window, _, _ = mock_api_instance
+    continued = []
+
+    def fake_scan(folder_type, on_batch):
+        continued.append(on_batch([{"src": "", "alt": "a.dds", "path": "/mock/a.dds"}]))
+        return {"success": True, "cancelled": True, "total": 1}
+
+    mock_backend.scan_images.side_effect = fake_scan
+    api_instance._scan_ids["dump"] = "newer-scan"
+    api_instance._run_image_scan("dump", "older-scan")
+
+    assert continued == [False]
+    scripts = [c.args[0] for c in mock_active_window.evaluate_js.call_args_list]
+    assert len(scripts) == 1 and "imageScanComplete" in scripts[0]
+
+
+def test_display_batch_streams_rendered_thumbnails(mock_api_instance):
+    api_instance, mock_backend, _, mock_active_window, _, _ = mock_api_instance
+    mock_backend.convert_dds_for_display_batch.return_value = {
+        "success": True, "images": {"/mock/a.dds": "data:a"}, "missing": ["/mock/b.dds"], "errors": {}
+    }
+
+    def fake_render(dds_paths, is_dump_image, on_batch, on_error):
+        on_batch({"/mock/b.dds": "data:b"})
+        return {"success": True, "cancelled": False, "total": 1, "errors": {}}
+
+    mock_backend.render_display_images.side_effect = fake_render
+    with patch("backend.api.threading.Thread") as mock_thread:
+        result = api_instance.convert_dds_for_display_batch(["/mock/a.dds", "/mock/b.dds"], True)
+    request_id = result["request_id"]
+    mock_thread.call_args.kwargs["target"](*mock_thread.call_args.kwargs["args"])
+
+    scripts = [c.args[0] for c in mock_active_window.evaluate_js.call_args_list]
+    assert len(scripts) == 2
+    assert f'new CustomEvent("displayImageBatch", {{detail: {{"request_id": "{request_id}"' in scripts[0]
+    assert '"/mock/b.dds": "data:b"' in scripts[0]
+    assert 'new CustomEvent("displayImageComplete"' in scripts[1]
+
+
+def test_cancelled_display_batch_stops_streaming(mock_api_instance):
+    api_instance, mock_backend, _, mock_active_window, _, _ = mock_api_instance
+    continued = []
+
+    def fake_render(dds_paths, is_dump_image, on_batch, on_error):
+        continued.append(on_batch({"/mock/b.dds": "data:b"}))
+        return {"success": True, "cancelled": True, "total": 1, "errors": {}}
+
+    mock_backend.render_display_images.side_effect = fake_render
+    api_instance._display_requests.add("request-1")
+    api_instance.cancel_display_batch("request-1")
+    api_instance._run_display_batch("request-1", ["/mock/b.dds"], True)
+
+    assert continued == [False]
+    scripts = [c.args[0] for c in mock_active_window.evaluate_js.call_args_list]
+    assert len(scripts) == 1 and "displayImageComplete" in scripts[0]
+
+
+def test_display_batch_reports_failed_paths_and_always_completes(mock_api_instance):
+    api_instance, mock_backend, _, mock_active_window, _, _ = mock_api_instance
+
+    def fake_render(dds_paths, is_dump_image, on_batch, on_error):
+        on_error("/mock/b.dds", "cannot write mode P as JPEG")
+        raise RuntimeError("executor shut down")
+
+    mock_backend.render_display_images.side_effect = fake_render
+    api_instance._run_display_batch("request-1", ["/mock/b.dds"], True)
+
+    scripts = [c.args[0] for c in mock_active_window.evaluate_js.call_args_list]
+    assert len(scripts) == 2
+    assert "displayImageError" in scripts[0] and '"path": "/mock/b.dds"' in scripts[0]
+    assert "displayImageComplete" in scripts[1] and '"success": false' in scripts[1]
+
+
+def test_reconcile_emits_image_list_diff(mock_api_instance):
+    api_instance, mock_backend, _, mock_active_window, _, _ = mock_api_instance
+    mock_backend.reconcile_image_list.return_value = {
+        "success": True, "base": "/mock/dump", "added": ["a.dds"], "removed": [], "changed": []
+    }
+
+    served = {"success": True, "snapshot": True, "format": "columnar", "base": "/mock/dump", "paths": []}
+
+    api_instance._run_reconcile("dump", "request-1", served)
+
+    mock_backend.reconcile_image_list.assert_called_once_with("dump", served)
+    script = mock_active_window.evaluate_js.call_args.args[0]
+    assert script.startswith(
+        'window.dispatchEvent(new CustomEvent("imageListDiff", {detail: {"request_id": "request-1", "folder_type": "dump"'
+    )
+    assert '"added": ["a.dds"]' in script
@@ -1,5 +1,7 @@
 import json
 import os
+import threading
+import zipfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -9,12 +11,14 @@ from PIL import Image
 from backend.backend_api import BackendApi
 from backend.services import get_config_file
 from backend.dto import ImageInfo
+from backend.exceptions import FileSystemError, HoHatchError, TexconvTimeoutError
 
 
 @pytest.fixture
-def backend():
+def backend(tmp_path):
     """Provides a backend instance with mocked services."""
-    with patch("backend.backend_api.ConfigService") as MockConfigService, \
+    with patch("backend.services.get_config_dir", return_value=tmp_path), \
+         patch("backend.backend_api.ConfigService") as MockConfigService, \
          patch("backend.backend_api.DownloadService") as MockDownloadService, \
          patch("backend.backend_api.FileService") as MockFileService, \
          patch("backend.backend_api.ImageService") as MockImageService, \
@@ -34,6 +38,7 @@ def backend():
 
         # Instantiate the backend - it will get the mocked services
         backend_instance = BackendApi()
+        backend_instance.wait_for_startup(timeout=5)
 
         # Attach mocks to the instance for easy access in tests
         backend_instance.mock_config_service = mock_config_service
@@ -66,6 +71,71 @@ class TestBackendApi:
         backend.delete_dds_file(test_path)
         backend.mock_file_service.delete_file.assert_called_once_with(test_path)
 
+    def test_delete_can_be_undone_until_purged(self, backend):
+        from backend.services import TrashBatch
+
+        backend.UNDO_DELETE_SECONDS = 60
+        backend.mock_image_discovery_service.get_dump_folder_path.return_value = "/mock/dump"
+        backend.mock_image_discovery_service.get_inject_folder_path.return_value = "/mock/inject"
+        first, second = TrashBatch("batch-1"), TrashBatch("batch-2")
+        second.items.append({"dds_path": "/mock/inject/a/a.dds", "original": "/mock/inject/a", "trashed": "/t/a"})
+        backend.mock_file_service.batch_delete_files.side_effect = [first, second]
+        backend.mock_file_service.restore_trash_batch.return_value = 0
+
+        result = backend.batch_delete_selected_dds_files(["/mock/dump/x.dds"])
+        assert result == {"success": True, "undo_id": "batch-1", "undo_seconds": 60}
+        assert backend.undo_delete("batch-1") == {"success": True, "restored": 0}
+        backend.mock_file_service.restore_trash_batch.assert_called_once_with(first)
+        assert backend.undo_delete("batch-1")["success"] is False
+
+        backend.batch_delete_selected_dds_files(["/mock/inject/a/a.dds"])
+        backend._purge_deleted("batch-2")
+        backend.mock_file_service.purge_trash_batch.assert_called_once_with(second)
+        assert backend.undo_delete("batch-2")["success"] is False
+
+    def test_partial_delete_and_failed_undo_keep_the_undo_available(self, backend):
+        from backend.services import TrashBatch
+
+        backend.UNDO_DELETE_SECONDS = 60
+        batch = TrashBatch("batch-1")
+        batch.items.append({"dds_path": "/mock/dump/a.dds", "original": "/mock/dump/a.dds", "trashed": "/t/a"})
+        batch.errors.append("File not found: /mock/dump/b.dds")
+        backend.mock_file_service.batch_delete_files.return_value = batch
+        backend.mock_file_service.restore_trash_batch.side_effect = FileSystemError("/mock/dump/a.dds already exists")
+
+        result = backend.batch_delete_selected_dds_files(["/mock/dump/a.dds", "/mock/dump/b.dds"])
+        assert result["success"] is False and result["errors"] == batch.errors
+        assert (result["undo_id"], result["undo_seconds"]) == ("batch-1", 60)
+
+        result = backend.undo_delete("batch-1")
+        assert result["success"] is False and result["undo_id"] == "batch-1"
+        backend.mock_file_service.restore_trash_batch.side_effect = None
+        backend.mock_file_service.restore_trash_batch.return_value = 1
+        assert backend.undo_delete("batch-1") == {"success": True, "restored": 1}
+
+    def test_file_events_maintain_thumbnail_cache(self, backend):
+        from backend.events import FILE_DELETED, FILE_MOVED, FILE_REPLACED, FileEvent
+
+        backend.mock_image_discovery_service.get_dump_folder_path.return_value = "/mock/dump"
+        backend.mock_image_discovery_service.get_inject_folder_path.return_value = "/mock/inject"
+        texconv = backend.mock_texconv_service
+        image = Image.new("RGB", (4, 4))
+
+        backend.events.publish(FileEvent(FILE_DELETED, "/mock/inject/a/a.dds"))
+        texconv.drop_cache_entry.assert_called_once_with("/mock/inject/a/a.dds", False, Path("/mock/inject"))
+
+        backend.events.publish(FileEvent(FILE_MOVED, "/mock/inject/b.dds", src="/mock/dump/b.dds"))
+        texconv.move_cache_entry.assert_called_once_with(
+            "/mock/dump/b.dds", True, Path("/mock/dump"), "/mock/inject/b.dds", False, Path("/mock/inject")
+        )
+
+        backend.events.publish(FileEvent(FILE_REPLACED, "/mock/inject/c.dds", image=image))
+        texconv.write_cache_entry.assert_called_once_with("/mock/inject/c.dds", False, Path("/mock/inject"), image)
+
+        texconv.drop_cache_entry.reset_mock()
+        backend.events.publish(FileEvent(FILE_DELETED, "/elsewhere/d.dds"))
+        texconv.drop_cache_entry.assert_not_called()
+
     def test_batch_delete_selected_dds_files(self, backend):
         test_paths = ["/path/to/file1.dds", "/path/to/file2.dds"]
         backend.batch_delete_selected_dds_files(test_paths)
@@ -96,6 +166,79 @@ class TestBackendApi:
         
         backend.mock_texconv_service.get_displayable_image.assert_called_once_with(test_path, True, Path(dump_path))
 
+    def test_convert_dds_for_display_batch_serves_hits_and_lists_misses(self, backend):
+        backend.mock_image_discovery_service.get_dump_folder_path.reset_mock()
+        backend.mock_image_discovery_service.get_dump_folder_path.return_value = "/path/to/dump"
+        cached = {"/path/to/dump/a.dds": "data:image/jpeg;base64,AA==", "/path/to/dump/b.dds": None}
+
+        def fake_cached(path, is_dump_image, base_dir):
+            if path not in cached:
+                raise FileSystemError(f"DDS file not found: {path}")
+            return cached[path]
+
+        backend.mock_texconv_service.get_cached_display_image.side_effect = fake_cached
+        result = backend.convert_dds_for_display_batch(list(cached) + ["/path/to/dump/gone.dds"], True)
+
+        assert result["images"] == {"/path/to/dump/a.dds": "data:image/jpeg;base64,AA=="}
+        assert result["missing"] == ["/path/to/dump/b.dds"]
+        assert list(result["errors"]) == ["/path/to/dump/gone.dds"]
+        backend.mock_image_discovery_service.get_dump_folder_path.assert_called_once()
+
+    def test_render_display_images_coalesces_and_can_be_cancelled(self, backend):
+        backend.mock_image_discovery_service.get_dump_folder_path.return_value = "/path/to/dump"
+        backend.mock_texconv_service.render_display_image.side_effect = lambda path, *_: f"src:{path}"
+        backend.DISPLAY_BATCH_INTERVAL_SECONDS = 60
+        backend.DISPLAY_BATCH_MAX_IMAGES = 100
+        paths = [f"/path/to/dump/{i}.dds" for i in range(5)]
+
+        received = []
+        result = backend.render_display_images(paths, True, received.append)
+
+        assert result["success"] is True and result["total"] == 5
+        assert len(received) == 1 and received[0] == {path: f"src:{path}" for path in paths}
+
+        gate = threading.Event()
+        backend.mock_texconv_service.render_display_image.side_effect = (
+            lambda path, *_: path if path == paths[0] or gate.wait(5) else None
+        )
+        backend.DISPLAY_BATCH_MAX_IMAGES = 1
+        result = backend.render_display_images(paths, True, lambda images: False)
+        gate.set()
+        assert result["cancelled"] is True and result["total"] == 1
+
+    def test_render_display_images_reports_unexpected_errors_per_path(self, backend):
+        backend.mock_image_discovery_service.get_dump_folder_path.return_value = "/path/to/dump"
+
+        def render(path, *_):
+            if path.endswith("bad.dds"):
+                raise OSError("cannot write mode P as JPEG")
+            return f"src:{path}"
+
+        backend.mock_texconv_service.render_display_image.side_effect = render
+        paths = ["/path/to/dump/bad.dds", "/path/to/dump/good.dds"]
+        received, failed = [], []
+
+        result = backend.render_display_images(paths, True, received.append, lambda *args: failed.append(args))
+
+        assert result["success"] is True and result["total"] == 1
+        assert [path for path, _ in failed] == ["/path/to/dump/bad.dds"] and "mode P" in failed[0][1]
+        assert list(result["errors"]) == ["/path/to/dump/bad.dds"]
+        assert {path for batch in received for path in batch} == {"/path/to/dump/good.dds"}
+
+    def test_contact_sheet_uses_the_default_layout(self, backend):
+        backend.mock_texconv_service.get_contact_sheet.return_value = {"sheet": "data:", "tiles": {}}
+
+        assert backend.get_contact_sheet(["/path/to/dump/a.dds"], True)["success"] is True
+        args = backend.mock_texconv_service.get_contact_sheet.call_args.args
+        assert args[3:] == (backend.CONTACT_SHEET_COLUMNS, backend.CONTACT_SHEET_TILE_HEIGHT)
+
+    @pytest.mark.parametrize("columns, tile_height", [(0, 128), (101, 128), (10, 8), (10, 4096), (2.5, 128), (10, "64")])
+    def test_contact_sheet_rejects_out_of_range_layouts(self, backend, columns, tile_height):
+        result = backend.get_contact_sheet(["/path/to/dump/a.dds"], True, columns, tile_height)
+
+        assert result["success"] is False
+        backend.mock_texconv_service.get_contact_sheet.assert_not_called()
+
     def test_convert_single_dds_to_jpg(self, backend):
         dds_path = "/path/to/file.dds"
         output_folder = "/path/to/output"
@@ -119,6 +262,68 @@ class TestBackendApi:
         for dds_path, expected_output_file_path in expected_calls:
             backend.mock_texconv_service.convert_to_jpg.assert_any_call(dds_path, expected_output_file_path)
 
+    def test_batch_download_records_progress_and_resumes(self, backend):
+        dds_paths = ["/path/to/file1.dds", "/path/to/file2.dds", "/path/to/file3.dds"]
+        output_folder = "/path/to/output"
+        backend.mock_texconv_service.convert_to_jpg.side_effect = [None, HoHatchError("texconv crashed")]
+
+        result = backend.batch_download_selected_dds_as_jpg(dds_paths, output_folder)
+        assert result["success"] is False
+        pending = backend.get_pending_batch_jobs()["jobs"]
+        assert [(job["job_id"], job["completed"], job["total"]) for job in pending] == [(result["job_id"], 1, 3)]
+
+        backend.mock_texconv_service.convert_to_jpg.reset_mock(side_effect=True)
+        assert backend.resume_batch_job(result["job_id"])["success"] is True
+        assert [c.args[0] for c in backend.mock_texconv_service.convert_to_jpg.call_args_list] == dds_paths[1:]
+        assert backend.get_pending_batch_jobs()["jobs"] == []
+
+    def test_batch_download_skips_timed_out_items(self, backend):
+        dds_paths = ["/path/to/file1.dds", "/path/to/hung.dds", "/path/to/file3.dds"]
+        backend.mock_texconv_service.convert_to_jpg.side_effect = [None, TexconvTimeoutError("timed out"), None]
+
+        result = backend.batch_download_selected_dds_as_jpg(dds_paths, "/path/to/output")
+
+        assert result["success"] is True
+        assert result["skipped"] == ["/path/to/hung.dds"]
+        assert backend.mock_texconv_service.convert_to_jpg.call_count == 3
+        pending = backend.get_pending_batch_jobs()["jobs"]
+        assert [(job["job_id"], job["completed"]) for job in pending] == [(result["job_id"], 2)]
+
+    @pytest.mark.parametrize("job_id", ["../escape", "20240101-120000-0123abcd/../../x", "not-a-job"])
+    def test_batch_job_ids_outside_the_journal_format_are_rejected(self, backend, tmp_path, job_id):
+        outside = tmp_path / "escape.jsonl"
+        outside.write_text("{}")
+
+        assert backend.discard_batch_job(job_id)["success"] is False
+        assert backend.resume_batch_job(job_id)["success"] is False
+        assert outside.exists()
+
+    @pytest.mark.parametrize("record", [
+        {"event": "start", "kind": "export_jpg", "items": "file.dds", "params": {}},
+        {"event": "start", "kind": "export_jpg", "items": [], "params": None},
+    ])
+    def test_malformed_batch_job_journals_are_skipped(self, backend, tmp_path, record):
+        journal = tmp_path / "jobs" / "20240101-120000-0123abcd.jsonl"
+        journal.parent.mkdir()
+        journal.write_text(json.dumps(record) + "\n" + json.dumps({"event": "done", "index": "0"}) + "\n")
+
+        assert backend.get_pending_batch_jobs()["jobs"] == []
+        assert backend.resume_batch_job(journal.stem)["success"] is False
+
+    def test_batch_download_as_zip_streams_stored_entries(self, backend, tmp_path):
+        dds_paths = ["/path/a/card.dds", "/path/b/card.dds", "/path/to/other.dds"]
+        output_zip = tmp_path / "export.zip"
+        backend.mock_texconv_service.open_as_image.return_value.__enter__.return_value = Image.new("RGB", (8, 8))
+
+        result = backend.batch_download_selected_dds_as_zip(dds_paths, str(output_zip))
+
+        assert result["success"] is True
+        backend.mock_texconv_service.convert_to_jpg.assert_not_called()
+        with zipfile.ZipFile(output_zip) as zf:
+            assert zf.namelist() == ["card.jpg", "card_2.jpg", "other.jpg"]
+            assert all(info.compress_type == zipfile.ZIP_STORED for info in zf.infolist())
+            assert Image.open(zf.open("other.jpg")).format == "JPEG"
+
     @patch("shutil.move")
     @patch("os.rename")
     def test_replace_dds(self, mock_rename, mock_move, backend):
@@ -132,6 +337,25 @@ class TestBackendApi:
         
         backend.mock_texconv_service.convert_to_dds.assert_called_once()
         backend.mock_file_service.move_file.assert_called_once()
+        # The replaced dump goes to the trash and is purged like any other delete.
+        batch = backend.mock_file_service.delete_file.return_value
+        assert batch.batch_id in backend._pending_deletes
+
+    def test_replace_dds_caches_thumbnail_from_source_pixels(self, backend):
+        backend.mock_image_discovery_service.get_inject_folder_path.return_value = "/mock/inject"
+        source = Image.new("RGB", (1024, 1024))
+
+        def fake_convert(jpg_path, out_dir, new_name, on_image=None):
+            on_image(source)
+            return f"{out_dir}/{new_name}"
+
+        backend.mock_texconv_service.convert_to_dds.side_effect = fake_convert
+        result = backend.replace_dds("/mock/inject/card.dds", "/path/to/new.jpg", False)
+
+        assert result["success"] is True
+        backend.mock_texconv_service.write_cache_entry.assert_called_once_with(
+            "/mock/inject/card.dds", False, Path("/mock/inject"), source
+        )
 
     def test_validate_sk_folder(self, backend):
         folder_path = "/path/to/sk_folder"
@@ -143,6 +367,12 @@ class TestBackendApi:
         backend.validate_texconv_executable(executable_path)
         assert backend.validate_texconv_executable(executable_path) == {"is_valid": False}
 
+    def test_startup_tasks_run_in_background(self, backend):
+        status = backend.get_startup_status()
+        assert status["success"] is True
+        assert status["state"] == "ready"
+        backend.mock_file_service.clean_directory.assert_called_once_with(backend.temp_base_dir)
+
     def test_get_current_settings(self, backend):
         backend.mock_config_service.get_settings.reset_mock()
         backend.get_current_settings()
@@ -0,0 +1,60 @@
+import threading
+import time
+from contextlib import ExitStack
+
+from backend import concurrency
+from backend.concurrency import AdaptiveConcurrencyLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+def run_window(limiter, clock, seconds):
+    """Runs `limit` conversions side by side, each taking seconds."""
+    with ExitStack() as stack:
+        for _ in range(limiter.limit):
+            stack.enter_context(limiter.slot(("pillow", "decode", "BC7_UNORM")))
+        clock.now += seconds
+
+
+def test_limit_grows_while_latency_holds_and_backs_off_when_it_inflates(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(concurrency, "time", clock)
+    limiter = AdaptiveConcurrencyLimiter(initial=2, maximum=4)
+
+    limits = []
+    for _ in range(3):
+        run_window(limiter, clock, 0.1)
+        limits.append(limiter.limit)
+    run_window(limiter, clock, 1.0)  # ten times slower with no gain in throughput, e.g. the game started
+
+    assert limits == [3, 4, 4]
+    assert limiter.limit == 2
+    assert concurrency.metrics.snapshot()["gauges"]["engine.concurrency.limit"] == 2
+
+
+def test_background_work_waits_while_interactive_requests_are_queued():
+    limiter = AdaptiveConcurrencyLimiter(initial=1, maximum=1)
+    order = []
+
+    def convert(name, interactive):
+        with limiter.slot(name, interactive):
+            order.append(name)
+
+    with limiter.slot("busy"):
+        background = threading.Thread(target=convert, args=("background", False))
+        background.start()
+        interactive = threading.Thread(target=convert, args=("interactive", True))
+        interactive.start()
+        while limiter.snapshot()["interactive_waiting"] + limiter.snapshot()["background_waiting"] < 2:
+            time.sleep(0.001)
+    background.join()
+    interactive.join()
+
+    assert order == ["interactive", "background"]
+    assert limiter.snapshot()["in_flight"] == 0
@@ -0,0 +1,73 @@
+import pytest
+from pathlib import Path
+from PIL import Image
+
+from backend.dds import read_dds_info
+from backend.engines import DECODE, ENCODE, ConversionEngine, EngineRegistry, FakeEngine, PillowEngine
+from backend.exceptions import TexconvError
+
+
+class UnavailableEngine(FakeEngine):
+    name = "unavailable"
+
+    def available(self):
+        return False
+
+
+def make_fake(name, seconds):
+    engine = FakeEngine()
+    engine.name, engine.estimated_seconds = name, seconds
+    return engine
+
+
+def test_registry_prefers_available_engines_then_measured_speed():
+    slow, fast, missing = make_fake("slow", 0.5), make_fake("fast", 0.1), UnavailableEngine()
+    registry = EngineRegistry([missing, slow, fast])
+
+    assert [engine.name for engine in registry.rank(DECODE, "BC7_UNORM")] == ["fast", "slow", "unavailable"]
+
+    for _ in range(3):
+        registry.record(fast, DECODE, "BC7_UNORM", 2.0)
+    assert registry.rank(DECODE, "BC7_UNORM")[0] is slow
+    # Measurements are per format, so other formats keep their own ranking.
+    assert registry.rank(DECODE, "BC1_UNORM")[0] is fast
+    assert "fast.decode.BC7_UNORM" in registry.snapshot()
+
+
+def test_registry_filters_by_capability_and_falls_back_on_failure(tmp_path):
+    fake = make_fake("fake", 1.0)
+    registry = EngineRegistry([PillowEngine(), fake])
+
+    # Pillow cannot build mip chains, so a mipmapped encode goes to the other engine.
+    assert registry.rank(ENCODE, "BC1_UNORM", mips=True) == [fake]
+    # Pillow fails on a file that is not really BC1, so the next engine decodes it.
+    bogus = tmp_path / "bogus.dds"
+    bogus.write_bytes(b"not a dds")
+    image = registry.run(DECODE, "BC1_UNORM", lambda engine: engine.decode(bogus, (8, 8)))
+    assert image.size == (8, 8) and fake.calls == [("decode", str(bogus))]
+
+    with pytest.raises(TexconvError, match="No conversion engine"):
+        EngineRegistry([PillowEngine()]).run(ENCODE, "BC7_UNORM", lambda engine: None)
+
+    # When the last candidate fails too, its error reaches callers as a TexconvError.
+    with pytest.raises(TexconvError, match="pillow could not decode") as raised:
+        EngineRegistry([PillowEngine()]).run(DECODE, "BC1_UNORM", lambda engine: engine.decode(bogus, (8, 8)))
+    assert isinstance(raised.value.__cause__, ValueError)
+
+
+def test_engines_must_implement_decode_and_encode():
+    class DecodeOnly(ConversionEngine):
+        def decode(self, dds_path, size):
+            return None
+
+    with pytest.raises(TypeError):
+        DecodeOnly()
+
+
+def test_pillow_engine_round_trips_block_compressed_textures(tmp_path):
+    engine = PillowEngine()
+    path = engine.encode(Image.new("RGB", (64, 32), (255, 0, 0)), tmp_path, "card", "BC1_UNORM", 1)
+
+    assert path == tmp_path / "card.dds" and read_dds_info(path).format == "BC1_UNORM"
+    decoded = engine.decode(Path(path), (16, 8))
+    assert decoded.size == (16, 8) and decoded.convert("RGB").getpixel((8, 4))[0] > 200
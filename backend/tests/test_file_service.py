@@ -0,0 +1,106 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.events import FILE_DELETED, FILE_MOVED, EventBus
+from backend.exceptions import FileSystemError
+from backend.services import TRASH_DIR_NAME, FileService
+
+
+@pytest.fixture
+def profile(tmp_path):
+    textures = tmp_path / "Profile" / "SK_Res" / "dump" / "textures"
+    textures.mkdir(parents=True)
+    single = textures / "single.dds"
+    single.write_bytes(b"dds")
+    card = textures / "card_01"
+    card.mkdir()
+    (card / "card_01.dds").write_bytes(b"dds")
+    (card / "card_01.txt").write_text("", encoding="utf-8")
+    return tmp_path / "Profile", single, card
+
+
+def test_batch_delete_moves_targets_to_trash_and_purges(profile):
+    profile_dir, single, card = profile
+    file_service = FileService(MagicMock())
+
+    batch = file_service.batch_delete_files([str(single), str(card / "card_01.dds")])
+
+    assert batch.errors == []
+    assert not single.exists() and not card.exists()
+    trashed = [Path(item["trashed"]) for item in batch.items]
+    assert all(path.exists() and profile_dir / TRASH_DIR_NAME in path.parents for path in trashed)
+    assert [item["original"] for item in batch.items] == [str(single), str(card)]
+
+    file_service.purge_trash_batch(batch)
+    assert not (profile_dir / TRASH_DIR_NAME / batch.batch_id).exists()
+
+
+def test_restore_trash_batch_puts_files_back(profile):
+    _, single, card = profile
+    file_service = FileService(MagicMock())
+    batch = file_service.batch_delete_files([str(single), str(card / "card_01.dds")])
+
+    assert file_service.restore_trash_batch(batch) == 2
+    assert single.read_bytes() == b"dds"
+    assert (card / "card_01.txt").exists()
+
+
+def test_failed_restore_keeps_the_items_it_could_not_put_back(profile):
+    _, single, card = profile
+    file_service = FileService(MagicMock())
+    batch = file_service.batch_delete_files([str(single), str(card / "card_01.dds")])
+    single.write_bytes(b"new file in the way")
+
+    with pytest.raises(FileSystemError, match="already exists"):
+        file_service.restore_trash_batch(batch)
+
+    assert (card / "card_01.dds").exists()
+    assert [Path(item["trashed"]).read_bytes() for item in batch.in_trash()] == [b"dds"]
+
+    single.unlink()
+    assert file_service.restore_trash_batch(batch) == 1
+    assert single.read_bytes() == b"dds" and batch.in_trash() == []
+
+
+def test_delete_outside_profile_removes_directly_and_reports_missing(tmp_path):
+    loose = tmp_path / "loose.dds"
+    loose.write_bytes(b"dds")
+    file_service = FileService(MagicMock())
+
+    batch = file_service.delete_file(str(loose))
+    assert not loose.exists()
+    assert batch.items[0]["trashed"] is None
+
+    with pytest.raises(FileSystemError, match="File not found"):
+        file_service.delete_file(str(loose))
+
+
+def test_purge_leftover_trash(profile):
+    profile_dir, single, _ = profile
+    file_service = FileService(MagicMock())
+    file_service.batch_delete_files([str(single)])
+
+    file_service.purge_leftover_trash([str(profile_dir / "SK_Res" / "dump" / "textures"), str(single.parent)])
+
+    assert not (profile_dir / TRASH_DIR_NAME).exists()
+
+
+def test_file_operations_publish_events(profile, tmp_path):
+    _, single, card = profile
+    events = EventBus()
+    received = []
+    for event_type in (FILE_DELETED, FILE_MOVED):
+        events.subscribe(event_type, lambda event: received.append((event.type, event.path, event.src)))
+    file_service = FileService(MagicMock(), events)
+
+    moved = single.with_name("moved.dds")
+    file_service.move_file(str(single), str(moved))
+    batch = file_service.batch_delete_files([str(moved), str(card / "card_01.dds")])
+    assert received == [(FILE_MOVED, str(moved), str(single))]
+
+    # Deletes are only published once the trash is purged; restored items are never published.
+    batch.items[1]["restored"] = True
+    file_service.purge_trash_batch(batch)
+    assert received[1:] == [(FILE_DELETED, str(moved), None)]
@@ -72,4 +72,195 @@ def test_get_image_list_dump_success(backend):
 
     result = backend.get_image_list("dump")
     assert result["success"] is True
-    assert len(result["images"]) == 2
\ No newline at end of file
+    assert len(result["images"]) == 2
+
+
+def test_discover_listing_is_relative_to_base(mock_sk_folder_with_images):
+    from backend.services import ImageDiscoveryService
+
+    dump_base = mock_sk_folder_with_images / "Profiles" / "Shadowverse Worlds Beyond" / "SK_Res" / "dump" / "textures"
+    nested = dump_base / "ShadowverseWB.exe" / "card_01"
+    nested.mkdir(parents=True)
+    (nested / "card_01.dds").write_text("dummy dds content")
+    (nested / "card_01.txt").write_text("")
+
+    config_service = MagicMock()
+    config_service.get_settings.return_value.special_k_folder_path = str(mock_sk_folder_with_images)
+    listing = ImageDiscoveryService(config_service).discover_listing("dump", include_metadata=True)
+
+    assert listing.base == (dump_base / "ShadowverseWB.exe").as_posix()
+    assert listing.paths == ["card_01/card_01.dds"]
+    assert listing.sizes == [len("dummy dds content")]
+    assert listing.to_dict()["format"] == "columnar"
+
+
+def test_get_image_list_compact(backend):
+    from backend.dto import ImageListing
+
+    backend.mock_image_discovery_service.discover_listing.return_value = ImageListing(
+        base="/mock/dump", paths=["a.dds", "sub/b.dds"]
+    )
+
+    result = backend.get_image_list("dump", compact=True)
+    assert result == {"success": True, "format": "columnar", "base": "/mock/dump", "paths": ["a.dds", "sub/b.dds"]}
+    backend.mock_image_discovery_service.discover_images.assert_not_called()
+
+
+def test_scan_dds_files_walks_nested_folders(tmp_path):
+    from backend.services import scan_dds_files
+
+    for i in range(5):
+        folder = tmp_path / f"card_{i:02d}" / "DDS-TXT"
+        folder.mkdir(parents=True)
+        (folder / f"card_{i:02d}.dds").write_text("dds")
+        (folder / f"card_{i:02d}.txt").write_text("")
+    (tmp_path / "UPPER.DDS").write_text("dds")
+
+    batches = list(scan_dds_files(tmp_path, workers=3))
+
+    names = sorted(entry.name for batch in batches for entry in batch)
+    assert names == ["UPPER.DDS"] + [f"card_{i:02d}.dds" for i in range(5)]
+    assert len(batches) == 6  # one batch per folder holding textures
+    assert list(scan_dds_files(tmp_path / "missing")) == []
+
+
+def test_scan_dds_files_share_one_bounded_pool(tmp_path):
+    import threading
+    from backend.services import SCAN_WORKERS, scan_dds_files
+
+    for i in range(20):
+        (tmp_path / f"card_{i:02d}").mkdir()
+        (tmp_path / f"card_{i:02d}" / "card.dds").write_text("dds")
+
+    walks = [scan_dds_files(tmp_path) for _ in range(4)]
+    assert all(next(walk) for walk in walks)  # several walks in flight at once
+    for walk in walks:
+        walk.close()
+    assert sum(len(batch) for batch in scan_dds_files(tmp_path)) == 20
+
+    scan_threads = [t for t in threading.enumerate() if t.name.startswith("hohatch-scan")]
+    assert 0 < len(scan_threads) <= SCAN_WORKERS
+
+
+def test_discover_images_is_sorted(mock_sk_folder_with_images):
+    from backend.services import ImageDiscoveryService
+
+    inject_base = mock_sk_folder_with_images / "Profiles" / "Shadowverse Worlds Beyond" / "SK_Res" / "inject" / "textures"
+    (inject_base / "sub").mkdir()
+    (inject_base / "sub" / "a.dds").write_text("dds")
+
+    config_service = MagicMock()
+    config_service.get_settings.return_value.special_k_folder_path = str(mock_sk_folder_with_images)
+    service = ImageDiscoveryService(config_service)
+    images = service.discover_images("inject")
+
+    assert [img.path for img in images] == sorted([
+        (inject_base / "injected_image_01.dds").as_posix(),
+        (inject_base / "sub" / "a.dds").as_posix(),
+    ])
+    assert service.get_image_counts() == {"dump_count": 0, "inject_count": 2}
+
+
+def test_scan_images_coalesces_batches_and_can_be_cancelled(backend):
+    batches = [[ImageInfo(src="", alt=f"{i}.dds", path=f"/mock/{i}.dds")] for i in range(6)]
+    backend.mock_image_discovery_service.iter_images.return_value = iter(batches)
+    backend.SCAN_BATCH_MAX_IMAGES = 2
+    backend.SCAN_BATCH_INTERVAL_SECONDS = 60
+
+    received = []
+    result = backend.scan_images("dump", lambda images: received.append([img["alt"] for img in images]))
+
+    assert result["success"] is True and result["total"] == 6
+    # The first batch is sent right away, later ones once SCAN_BATCH_MAX_IMAGES have accumulated.
+    assert received == [["0.dds"], ["1.dds", "2.dds"], ["3.dds", "4.dds"], ["5.dds"]]
+
+    backend.mock_image_discovery_service.iter_images.return_value = iter(batches)
+    result = backend.scan_images("dump", lambda images: False)
+    assert result == {"success": True, "cancelled": True, "total": 1}
+
+
+def test_snapshot_reconcile_reports_differences(mock_sk_folder_with_images, tmp_path):
+    import os
+    from backend.dto import ImageListing
+    from backend.services import ImageDiscoveryService
+
+    inject_base = mock_sk_folder_with_images / "Profiles" / "Shadowverse Worlds Beyond" / "SK_Res" / "inject" / "textures"
+    config_service = MagicMock()
+    config_service.get_settings.return_value.special_k_folder_path = str(mock_sk_folder_with_images)
+    with patch("backend.services.get_config_dir", return_value=tmp_path / "config"):
+        service = ImageDiscoveryService(config_service)
+
+    assert service.load_snapshot("inject") is None
+    first = service.reconcile_listing("inject")
+    assert first["added"] == ["injected_image_01.dds"] and first["removed"] == []
+    assert service.load_snapshot("inject").paths == ["injected_image_01.dds"]
+
+    (inject_base / "new.dds").write_text("dds")
+    changed = inject_base / "injected_image_01.dds"
+    changed.write_text("different content")
+    os.utime(changed, (1_000_000, 1_000_000))
+    second = service.reconcile_listing("inject")
+    assert (second["added"], second["removed"], second["changed"]) == (["new.dds"], [], ["injected_image_01.dds"])
+
+    (inject_base / "new.dds").unlink()
+    third = service.reconcile_listing("inject")
+    assert (third["added"], third["removed"], third["changed"]) == ([], ["new.dds"], [])
+
+    # A caller still showing an older listing gets the differences from that one, not from the snapshot.
+    served = ImageListing(base=first["base"], paths=["gone.dds"])
+    fourth = service.reconcile_listing("inject", served)
+    assert (fourth["added"], fourth["removed"]) == (["injected_image_01.dds"], ["gone.dds"])
+
+    # A snapshot taken for another Special K folder is not served.
+    config_service.get_settings.return_value.special_k_folder_path = str(tmp_path / "elsewhere")
+    assert service.load_snapshot("inject") is None
+
+
+def test_get_cached_image_list(backend):
+    from backend.dto import ImageListing
+
+    backend.mock_image_discovery_service.load_snapshot.return_value = None
+    assert backend.get_cached_image_list("dump") == {
+        "success": True, "snapshot": False, "format": "columnar", "base": "", "paths": []
+    }
+
+    backend.mock_image_discovery_service.load_snapshot.return_value = ImageListing(base="/mock/dump", paths=["a.dds"])
+    result = backend.get_cached_image_list("dump")
+    assert result["snapshot"] is True and result["paths"] == ["a.dds"]
+    backend.mock_image_discovery_service.discover_listing.assert_not_called()
+
+
+def test_reconcile_image_list_diffs_against_served_listing(backend):
+    from backend.dto import ImageListing
+
+    backend.mock_image_discovery_service.reconcile_listing.return_value = {
+        "base": "/mock/dump", "added": [], "removed": [], "changed": []
+    }
+    served = {"success": True, "snapshot": True, "format": "columnar", "base": "/mock/dump", "paths": ["a.dds"]}
+
+    assert backend.reconcile_image_list("dump", served)["success"] is True
+    backend.mock_image_discovery_service.reconcile_listing.assert_called_once_with(
+        "dump", ImageListing(base="/mock/dump", paths=["a.dds"])
+    )
+
+
+def test_get_image_list_hash_check_reports_and_regenerates_stale(backend):
+    images = [ImageInfo(src="", alt=f"{n}.dds", path=f"/mock/dump/{n}.dds") for n in ("a", "b")]
+    backend.mock_image_discovery_service.discover_images.return_value = images
+    backend.mock_image_discovery_service.get_dump_folder_path.return_value = "/mock/dump"
+    backend.mock_texconv_service.find_stale_cache_entries.return_value = {"checked": 2, "stale": ["/mock/dump/b.dds"]}
+
+    with patch("backend.backend_api.threading.Thread") as MockThread:
+        result = backend.get_image_list("dump", use_hash_check=True)
+
+    assert result["stale_count"] == 1
+    backend.mock_texconv_service.find_stale_cache_entries.assert_called_once_with(
+        ["/mock/dump/a.dds", "/mock/dump/b.dds"], True, Path("/mock/dump")
+    )
+    target = MockThread.call_args.kwargs["target"]
+    target(*MockThread.call_args.kwargs["args"])
+    backend.mock_texconv_service.get_displayable_image.assert_called_once_with(
+        "/mock/dump/b.dds", True, Path("/mock/dump"), interactive=False
+    )
+
+    assert "stale_count" not in backend.get_image_list("dump")
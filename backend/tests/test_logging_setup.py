@@ -0,0 +1,79 @@
+import gzip
+import logging
+import os
+import time
+
+from backend.logging_setup import CompressingRotatingFileHandler, RateLimitFilter, compress_legacy_logs
+
+
+def make_record(msg, level=logging.INFO, lineno=10):
+    return logging.LogRecord("test", level, "/src/module.py", lineno, msg, None, None)
+
+
+def test_handler_rolls_over_on_size_and_compresses(tmp_path):
+    log_file = tmp_path / "hohatch.log"
+    handler = CompressingRotatingFileHandler(log_file, max_bytes=200, backup_count=5)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        for i in range(10):
+            handler.emit(make_record(f"line {i:02d} " + "x" * 40))
+    finally:
+        handler.close()
+
+    archives = sorted(tmp_path.glob("hohatch-*.log.gz"))
+    assert archives
+    assert not list(tmp_path.glob("hohatch-*.log"))
+    assert log_file.stat().st_size < 200
+    archived = "".join(gzip.decompress(a.read_bytes()).decode("utf-8") for a in archives)
+    assert "line 00" in archived
+    assert "line 09" in log_file.read_text(encoding="utf-8")
+
+
+def test_handler_keeps_only_backup_count_archives(tmp_path):
+    log_file = tmp_path / "hohatch.log"
+    for i in range(4):
+        archive = tmp_path / f"hohatch-old-{i}.log.gz"
+        archive.write_bytes(b"")
+        os.utime(archive, (time.time() - 100 + i, time.time() - 100 + i))
+
+    handler = CompressingRotatingFileHandler(log_file, max_bytes=50, backup_count=2)
+    try:
+        handler.emit(make_record("x" * 60))
+        handler.emit(make_record("y" * 60))
+    finally:
+        handler.close()
+
+    archives = list(tmp_path.glob("hohatch-*.log.gz"))
+    assert len(archives) == 2
+    assert not (tmp_path / "hohatch-old-0.log.gz").exists()
+
+
+def test_rate_limit_filter_suppresses_and_reports(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("backend.logging_setup.time.monotonic", lambda: clock[0])
+    rate_filter = RateLimitFilter(burst=3, interval=10)
+
+    passed = [rate_filter.filter(make_record(f"msg {i}")) for i in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+
+    # Other call sites and warnings are not affected.
+    assert rate_filter.filter(make_record("elsewhere", lineno=99))
+    assert rate_filter.filter(make_record("warning", level=logging.WARNING))
+
+    clock[0] = 11.0
+    record = make_record("next window")
+    assert rate_filter.filter(record)
+    assert record.getMessage() == "next window (7 similar messages suppressed)"
+
+
+def test_compress_legacy_logs_skips_today(tmp_path):
+    old = tmp_path / "2020-01-01.log"
+    old.write_text("old", encoding="utf-8")
+    today = tmp_path / f"{time.strftime('%Y-%m-%d')}.log"
+    today.write_text("today", encoding="utf-8")
+
+    compress_legacy_logs(tmp_path)
+
+    assert not old.exists()
+    assert (tmp_path / "2020-01-01.log.gz").exists()
+    assert today.exists()
@@ -0,0 +1,75 @@
+import inspect
+from contextlib import contextmanager
+
+from backend.metrics import Histogram, MetricsRegistry, instrumented, metrics
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = Histogram()
+    for value in [3] * 90 + [40] * 9 + [700]:
+        histogram.observe(value)
+
+    data = histogram.to_dict()
+    assert data["count"] == 100
+    assert data["p50_ms"] == 5
+    assert data["p95_ms"] == 50
+    assert data["p99_ms"] == 50
+    assert data["max_ms"] == 700
+    assert data["buckets"] == {"le_5": 90, "le_50": 9, "le_1000": 1}
+
+
+def test_registry_snapshot_and_reset():
+    registry = MetricsRegistry()
+    registry.increment("hits")
+    registry.increment("hits", 2)
+    registry.set_gauge("limit", 4)
+    with registry.timer("work"):
+        pass
+
+    snapshot = registry.snapshot()
+    assert snapshot["counters"] == {"hits": 3}
+    assert snapshot["gauges"] == {"limit": 4}
+    assert snapshot["histograms"]["work"]["count"] == 1
+
+    registry.reset()
+    assert registry.snapshot()["counters"] == {}
+
+
+def test_instrumented_keeps_signature_and_counts_errors():
+    @instrumented("sample")
+    class Sample:
+        def ok(self, path, is_dump_image=False):
+            return {"success": True}
+
+        def fails(self):
+            return {"success": False, "error": "boom"}
+
+    metrics.reset()
+    sample = Sample()
+    sample.ok("a.dds")
+    sample.fails()
+
+    assert inspect.getfullargspec(sample.ok).args == ["self", "path", "is_dump_image"]
+    counters = metrics.snapshot()["counters"]
+    assert counters["sample.ok.calls"] == 1
+    assert "sample.ok.errors" not in counters
+    assert counters["sample.fails.errors"] == 1
+
+
+def test_instrumented_skips_generator_and_context_manager_methods():
+    @instrumented("sample")
+    class Sample:
+        def items(self):
+            yield 1
+
+        @contextmanager
+        def opened(self):
+            yield "handle"
+
+    metrics.reset()
+    sample = Sample()
+    assert list(sample.items()) == [1]
+    with sample.opened() as handle:
+        assert handle == "handle"
+
+    assert metrics.snapshot()["counters"] == {}
@@ -0,0 +1,98 @@
+import json
+import struct
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from backend.exceptions import FileSystemError
+from backend.services import FileService, ModPackService
+
+
+def make_dds_bytes(width=64, height=64, mip_count=7, fourcc=b"DXT1", payload=b"\x00" * 32):
+    header = bytearray(128)
+    header[0:4] = b"DDS "
+    struct.pack_into("<IIII", header, 4, 124, 0x1007, height, width)
+    struct.pack_into("<I", header, 28, mip_count)
+    struct.pack_into("<II", header, 76, 32, 0x4)
+    header[84:88] = fourcc
+    return bytes(header) + payload
+
+
+@pytest.fixture
+def mod_pack_service():
+    return ModPackService(FileService(config_service=None))
+
+
+@pytest.fixture
+def inject_dir(tmp_path):
+    inject = tmp_path / "inject"
+    (inject / "cards").mkdir(parents=True)
+    (inject / "texture_a.dds").write_bytes(make_dds_bytes())
+    (inject / "cards" / "texture_b.dds").write_bytes(make_dds_bytes(128, 256, 9, b"DXT5"))
+    (inject / "cards" / "texture_b.txt").write_text("notes")
+    return inject
+
+
+def test_export_writes_manifest_with_hashes_and_dds_metadata(mod_pack_service, inject_dir, tmp_path):
+    pack = tmp_path / "pack.zip"
+    result = mod_pack_service.export_pack(inject_dir, pack)
+
+    assert result["file_count"] == 3
+    with zipfile.ZipFile(pack) as zf:
+        manifest = json.loads(zf.read(ModPackService.MANIFEST_NAME))
+        assert zf.getinfo("texture_a.dds").compress_type == zipfile.ZIP_STORED
+
+    files = {entry["path"]: entry for entry in manifest["files"]}
+    assert set(files) == {"texture_a.dds", "cards/texture_b.dds", "cards/texture_b.txt"}
+    assert files["cards/texture_b.dds"]["dds"] == {"width": 128, "height": 256, "mip_count": 9, "format": "BC3_UNORM"}
+    assert files["cards/texture_b.txt"]["dds"] is None
+    assert files["texture_a.dds"]["md5"] == FileService(None).get_file_hash(inject_dir / "texture_a.dds")
+
+
+def test_export_into_the_source_folder_leaves_the_pack_itself_out(mod_pack_service, inject_dir):
+    pack = inject_dir / "pack.zip"
+    pack.write_bytes(b"an older export")
+
+    result = mod_pack_service.export_pack(inject_dir, pack)
+
+    assert result["file_count"] == 3
+    with zipfile.ZipFile(pack) as zf:
+        assert "pack.zip" not in zf.namelist()
+
+
+def test_import_installs_then_skips_identical_files(mod_pack_service, inject_dir, tmp_path):
+    pack = tmp_path / "pack.zip"
+    mod_pack_service.export_pack(inject_dir, pack)
+    target = tmp_path / "target"
+
+    first = mod_pack_service.import_pack(pack, target)
+    assert first["installed_count"] == 3
+    assert (target / "cards" / "texture_b.txt").read_text() == "notes"
+
+    (target / "texture_a.dds").write_bytes(b"modified")
+    second = mod_pack_service.import_pack(pack, target)
+    assert second == {"installed_count": 1, "skipped_count": 2, "bytes_written": len(make_dds_bytes())}
+    assert (target / "texture_a.dds").read_bytes() == make_dds_bytes()
+
+
+def test_import_rejects_zip_without_manifest(mod_pack_service, tmp_path):
+    pack = tmp_path / "plain.zip"
+    with zipfile.ZipFile(pack, "w") as zf:
+        zf.writestr("texture.dds", b"data")
+
+    with pytest.raises(FileSystemError, match="manifest is missing"):
+        mod_pack_service.import_pack(pack, tmp_path / "target")
+
+
+@pytest.mark.parametrize(
+    "files",
+    [None, ["texture.dds"], [{"path": 1, "size": 4, "md5": "x"}], [{"path": "texture.dds", "size": "4", "md5": "x"}]],
+)
+def test_import_rejects_malformed_manifest_entries(mod_pack_service, tmp_path, files):
+    pack = tmp_path / "bad.zip"
+    with zipfile.ZipFile(pack, "w") as zf:
+        zf.writestr(ModPackService.MANIFEST_NAME, json.dumps({"format": ModPackService.MANIFEST_FORMAT, "files": files}))
+
+    with pytest.raises(FileSystemError, match="mod pack manifest"):
+        mod_pack_service.import_pack(pack, tmp_path / "target")
@@ -0,0 +1,29 @@
+import inspect
+from unittest.mock import patch
+
+from backend.api import Api
+from backend.profiling import enable_profiling
+
+
+@patch("backend.api.BackendApi")
+def test_enable_profiling_writes_profile_and_memory_files(MockBackendApi, tmp_path):
+    MockBackendApi.return_value.get_image_counts.return_value = {"success": True, "dump_count": 1}
+    api = Api()
+
+    enable_profiling(api, tmp_path, sample_rate=1.0, calls=["get_image_counts", "convert_dds_for_display"])
+
+    assert api.get_image_counts() == {"success": True, "dump_count": 1}
+    assert inspect.getfullargspec(api.convert_dds_for_display).args == ["self", "dds_path", "is_dump_image"]
+    suffixes = sorted(p.name.split(".", 1)[1] for p in tmp_path.iterdir())
+    assert suffixes == ["mem.txt", "prof", "snapshot"]
+    assert "call: get_image_counts" in next(tmp_path.glob("*.mem.txt")).read_text()
+
+
+@patch("backend.api.BackendApi")
+def test_enable_profiling_respects_sample_rate(MockBackendApi, tmp_path):
+    api = Api()
+    enable_profiling(api, tmp_path, sample_rate=0.0, calls=["get_image_counts"])
+
+    api.get_image_counts()
+
+    assert not tmp_path.exists() or not any(tmp_path.iterdir())
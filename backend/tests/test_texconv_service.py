@@ -1,10 +1,22 @@
+import base64
+import io
 import pytest
+import subprocess
 from unittest.mock import MagicMock, patch
 from pathlib import Path
 from PIL import Image
 
 from backend.services import TexconvService
 from backend.dto import AppSettings
+from backend.exceptions import HoHatchError, TexconvError, TexconvTimeoutError
+from backend.metrics import metrics
+from backend.thumbnail_store import FileThumbnailStore
+
+
+def fake_popen(returncode=0, stdout="texconv output", stderr=""):
+    process = MagicMock(returncode=returncode, pid=4242)
+    process.communicate.return_value = (stdout, stderr)
+    return process
 
 
 @pytest.fixture
@@ -34,9 +46,9 @@ def texconv_service_fixture():
         yield service, mock_config_service, mock_file_service, mock_image_service
 
 
-@patch("backend.services.subprocess.run")
+@patch("backend.services.subprocess.Popen")
 @patch("backend.services.Image.open")
-def test_convert_to_dds_resizes_to_1024x1024(mock_image_open, mock_subprocess_run, texconv_service_fixture, tmp_path):
+def test_convert_to_dds_resizes_to_1024x1024(mock_image_open, mock_popen, texconv_service_fixture, tmp_path):
     texconv_service, _, _, _ = texconv_service_fixture
 
     # Create a mock for the Image object returned by Image.open
@@ -61,7 +73,7 @@ def test_convert_to_dds_resizes_to_1024x1024(mock_image_open, mock_subprocess_ru
     Path(out_dir).mkdir()
     new_name = "output.dds"
 
-    mock_subprocess_run.return_value = MagicMock(stdout="texconv output", stderr="", returncode=0)
+    mock_popen.return_value = fake_popen()
 
     # Simulate creation of the output DDS file by texconv
     (Path(out_dir) / "flipped_test.dds").touch()  # This is the file renamed to new_name
@@ -72,4 +84,318 @@ def test_convert_to_dds_resizes_to_1024x1024(mock_image_open, mock_subprocess_ru
     mock_resized_image.transpose.assert_called_once_with(Image.FLIP_TOP_BOTTOM)  # type: ignore
     mock_transposed_image.save.assert_called_once()
     assert result == str(Path(out_dir) / new_name)
-    mock_subprocess_run.assert_called_once()
+    mock_popen.assert_called_once()
+
+
+def test_convert_to_jpg_reuses_scratch_dir_and_flips(tmp_path):
+    from backend.services import FileService
+
+    mock_config_service = MagicMock()
+    mock_config_service.get_settings.return_value = AppSettings(
+        texconv_executable_path=str(tmp_path / "texconv.exe"), output_height=64
+    )
+    file_service = FileService(mock_config_service)
+    service = TexconvService(mock_config_service, file_service, MagicMock())
+
+    def fake_texconv(cmd, **kwargs):
+        out_dir = Path(cmd[cmd.index("-o") + 1])
+        img = Image.new("RGB", (53, 64), "black")
+        img.paste((255, 0, 0), (0, 0, 53, 32))  # top half red in texconv output
+        img.save(out_dir / f"{Path(cmd[3]).stem}.bmp")
+        return fake_popen(stdout="")
+
+    with patch("backend.services.subprocess.Popen", side_effect=fake_texconv):
+        first = service.convert_to_jpg(str(tmp_path / "a.dds"), str(tmp_path / "out" / "a.jpg"))
+        service.convert_to_jpg(str(tmp_path / "b.dds"), str(tmp_path / "out" / "b.jpg"))
+
+    with Image.open(first) as result:
+        assert result.format == "JPEG"
+        assert result.getpixel((26, 60))[0] > 200  # flipped to the bottom half
+    scratch_root = tmp_path / "temp" / "scratch"
+    assert [p.name for p in scratch_root.iterdir()] == ["worker-1"]
+    assert not any((scratch_root / "worker-1").iterdir())
+
+
+def test_run_texconv_kills_hung_process_without_retrying(texconv_service_fixture):
+    texconv_service, mock_config_service, _, _ = texconv_service_fixture
+    mock_config_service.get_settings.return_value.texconv_timeout_seconds = 5
+    mock_config_service.get_settings.return_value.texconv_retries = 1
+
+    hung = fake_popen()
+    hung.communicate.side_effect = [subprocess.TimeoutExpired("texconv", 5), ("", "")]
+    hung.poll.return_value = None
+
+    with patch("backend.services.subprocess.Popen", side_effect=[hung, fake_popen()]) as mock_popen, patch(
+        "backend.services._kill_process_tree"
+    ) as mock_kill, patch("backend.services.time.sleep"):
+        with pytest.raises(TexconvTimeoutError):
+            texconv_service._run_texconv(["-y"])
+
+    assert mock_popen.call_count == 1
+    assert hung.communicate.call_args_list[0].kwargs == {"timeout": 5}
+    mock_kill.assert_called_once_with(hung)
+
+
+def test_run_texconv_raises_timeout_when_retries_exhausted(texconv_service_fixture):
+    texconv_service, mock_config_service, _, _ = texconv_service_fixture
+    mock_config_service.get_settings.return_value.texconv_retries = 0
+
+    hung = fake_popen()
+    hung.communicate.side_effect = [subprocess.TimeoutExpired("texconv", 120), ("", "")]
+
+    with patch("backend.services.subprocess.Popen", return_value=hung), patch("backend.services._kill_process_tree"):
+        with pytest.raises(TexconvTimeoutError):
+            texconv_service._run_texconv(["-y"])
+
+
+def test_run_texconv_retries_launch_failures(texconv_service_fixture):
+    texconv_service, mock_config_service, _, _ = texconv_service_fixture
+    mock_config_service.get_settings.return_value.texconv_retries = 1
+
+    with patch(
+        "backend.services.subprocess.Popen", side_effect=[PermissionError("locked"), fake_popen()]
+    ) as mock_popen, patch("backend.services.time.sleep"):
+        result = texconv_service._run_texconv(["-y"])
+
+    assert result.stdout == "texconv output"
+    assert mock_popen.call_count == 2
+
+
+def test_run_texconv_does_not_retry_failed_conversion(texconv_service_fixture):
+    texconv_service, _, _, _ = texconv_service_fixture
+
+    with patch("backend.services.subprocess.Popen", return_value=fake_popen(1, "", "bad file")) as mock_popen:
+        with pytest.raises(TexconvError, match="bad file"):
+            texconv_service._run_texconv(["-y"])
+    mock_popen.assert_called_once()
+
+
+def test_run_texconv_records_slow_outliers(texconv_service_fixture):
+    texconv_service, _, _, _ = texconv_service_fixture
+    metrics.reset()
+
+    with patch("backend.services.subprocess.Popen", return_value=fake_popen()), patch(
+        "backend.services.TEXCONV_SLOW_SECONDS", 0
+    ):
+        texconv_service._run_texconv(["-y"])
+
+    histograms = metrics.snapshot()["histograms"]
+    assert histograms["texconv.spawn"]["count"] == histograms["texconv.run"]["count"] == 1
+    assert len(texconv_service.slow_runs) == 1
+    assert texconv_service.slow_runs[0]["command"][-1] == "-y"
+
+
+def test_find_stale_cache_entries_hashes_cached_textures(tmp_path):
+    from backend.services import FileService
+
+    base_dir = tmp_path / "dump"
+    cache_dir = tmp_path / "cache" / "dump"
+    base_dir.mkdir()
+    image_service = MagicMock()
+    image_service.get_thumbnail_store.return_value = FileThumbnailStore(tmp_path / "cache")
+    config_service = MagicMock()
+    config_service.get_settings.return_value = AppSettings()
+    file_service = FileService(config_service)
+    service = TexconvService(config_service, file_service, image_service)
+
+    paths = {}
+    for name in ("fresh", "stale", "no_hash", "uncached"):
+        dds = base_dir / name / f"{name}.dds"
+        dds.parent.mkdir()
+        dds.write_bytes(name.encode() * 1000)
+        paths[name] = str(dds)
+        if name != "uncached":
+            (cache_dir / name).mkdir(parents=True)
+            (cache_dir / name / f"{name}.jpg").write_bytes(b"jpg")
+    (cache_dir / "fresh" / "fresh.hash").write_text(file_service.get_file_hash(Path(paths["fresh"])))
+    (cache_dir / "stale" / "stale.hash").write_text("0" * 32)
+
+    result = service.find_stale_cache_entries(list(paths.values()), True, base_dir, workers=2)
+
+    assert result["checked"] == 3
+    assert sorted(result["stale"]) == sorted([paths["stale"], paths["no_hash"]])
+
+
+def test_write_and_move_cache_entries(tmp_path):
+    from backend.services import FileService
+
+    base_dir = tmp_path / "inject"
+    (base_dir / "sub").mkdir(parents=True)
+    dds = base_dir / "sub" / "card.dds"
+    dds.write_bytes(b"new texture")
+    config_service = MagicMock()
+    config_service.get_settings.return_value = AppSettings(output_height=64)
+    file_service = FileService(config_service)
+    image_service = MagicMock()
+    image_service.get_thumbnail_store.return_value = FileThumbnailStore(tmp_path / "cache")
+    service = TexconvService(config_service, file_service, image_service)
+
+    service.write_cache_entry(str(dds), False, base_dir, Image.new("RGBA", (1024, 1024), (255, 0, 0, 255)))
+
+    cache_file = tmp_path / "cache" / "inject" / "sub" / "card.jpg"
+    with Image.open(cache_file) as thumbnail:
+        assert thumbnail.format == "JPEG" and thumbnail.size == (53, 64)
+    assert cache_file.with_suffix(".hash").read_text() == file_service.get_file_hash(dds)
+
+    service.move_cache_entry(str(dds), False, base_dir, str(base_dir / "card.dds"), False, base_dir)
+    assert not cache_file.exists()
+    moved = tmp_path / "cache" / "inject" / "card"
+    assert moved.with_suffix(".jpg").exists() and moved.with_suffix(".hash").exists()
+
+
+@pytest.mark.parametrize("thumbnail_format", ["webp", "avif"])
+def test_display_thumbnails_use_the_configured_format(tmp_path, thumbnail_format):
+    from backend.services import FileService, supported_thumbnail_formats
+
+    if thumbnail_format not in supported_thumbnail_formats():
+        pytest.skip(f"Pillow cannot encode {thumbnail_format} here")
+    base_dir = tmp_path / "dump"
+    base_dir.mkdir()
+    dds = base_dir / "card.dds"
+    dds.write_bytes(b"texture")
+    config_service = MagicMock()
+    config_service.get_settings.return_value = AppSettings(output_height=64, thumbnail_format="jpeg")
+    store = FileThumbnailStore(tmp_path / "cache")
+    image_service = MagicMock()
+    image_service.get_thumbnail_store.return_value = store
+    service = TexconvService(config_service, FileService(config_service), image_service)
+    service.write_cache_entry(str(dds), True, base_dir, Image.new("RGB", (1024, 1024), "red"))
+    assert service.get_displayable_image(str(dds), True, base_dir).startswith("data:image/jpeg;")
+
+    config_service.get_settings.return_value = AppSettings(output_height=64, thumbnail_format=thumbnail_format)
+    assert service.find_stale_cache_entries([str(dds)], True, base_dir)["stale"] == [str(dds)]
+    with patch.object(service, "open_as_image") as mock_open:
+        mock_open.return_value.__enter__.return_value = Image.new("RGB", (53, 64), "red")
+        src = service.get_displayable_image(str(dds), True, base_dir, interactive=False)
+
+    # Regenerating stale thumbnails is background work for the conversion limiter.
+    mock_open.assert_called_once_with(str(dds), interactive=False)
+    assert src.startswith(f"data:image/{thumbnail_format};base64,")
+    assert service.find_stale_cache_entries([str(dds)], True, base_dir)["stale"] == []
+
+
+def test_contact_sheet_lays_out_tiles_and_is_cached_by_content(tmp_path):
+    from backend.services import FileService
+
+    base_dir = tmp_path / "dump"
+    base_dir.mkdir()
+    colors = {"a": "red", "b": "lime", "c": "blue"}
+    paths = []
+    for name in colors:
+        (base_dir / f"{name}.dds").write_bytes(name.encode())
+        paths.append(str(base_dir / f"{name}.dds"))
+    config_service = MagicMock()
+    config_service.get_settings.return_value = AppSettings(output_height=64)
+    image_service = MagicMock()
+    image_service.get_thumbnail_store.return_value = FileThumbnailStore(tmp_path / "cache")
+    service = TexconvService(config_service, FileService(config_service), image_service)
+
+    def fake_open(dds_path, interactive=False):
+        image = MagicMock()
+        image.__enter__.return_value = Image.new("RGB", (53, 64), colors[Path(dds_path).stem])
+        return image
+
+    with patch.object(service, "open_as_image", side_effect=fake_open) as mock_open:
+        sheet = service.get_contact_sheet(paths, True, base_dir, columns=2, tile_height=32, workers=2)
+        again = service.get_contact_sheet(paths, True, base_dir, columns=2, tile_height=32, workers=2)
+
+    assert mock_open.call_count == 3
+    assert sheet["tiles"][paths[2]] == [0, 32, 26, 32] and sheet["errors"] == {}
+    assert again["src"] == sheet["src"]
+    with Image.open(io.BytesIO(base64.b64decode(sheet["src"].split(",", 1)[1]))) as img:
+        assert img.size == (52, 64)
+        assert img.getpixel((39, 16))[1] > 200 and img.getpixel((13, 48))[2] > 200
+
+    (base_dir / "c.dds").write_bytes(b"changed texture")
+    with patch.object(service, "open_as_image", side_effect=fake_open) as mock_open:
+        service.get_contact_sheet(paths, True, base_dir, columns=2, tile_height=32, workers=2)
+    assert mock_open.call_count == 1
+    sheet_files = list((tmp_path / "cache" / "sheets").glob("*.jpg"))
+    assert len(sheet_files) == 1
+
+    service.drop_cache_entry(paths[0], True, base_dir)
+    assert not sheet_files[0].exists()
+    with pytest.raises(HoHatchError):
+        service.get_contact_sheet([], True, base_dir, columns=2, tile_height=32)
+
+
+def test_deep_zoom_tiles_are_rendered_on_demand_and_validated(tmp_path):
+    from backend.dds import build_dds_header
+    from backend.services import FileService
+
+    base_dir = tmp_path / "dump"
+    base_dir.mkdir()
+    dds = base_dir / "card.dds"
+    dds.write_bytes(build_dds_header(600, 300, "BC7_UNORM", 1))
+    config_service = MagicMock()
+    config_service.get_settings.return_value = AppSettings()
+    image_service = MagicMock()
+    image_service.get_thumbnail_store.return_value = FileThumbnailStore(tmp_path / "cache")
+    service = TexconvService(config_service, FileService(config_service), image_service)
+
+    full = Image.new("RGB", (600, 300), "blue")
+    full.paste((255, 0, 0), (512, 256, 600, 300))
+    with patch.object(service, "open_as_image") as mock_open:
+        mock_open.return_value.__enter__.return_value = full
+        info = service.get_deep_zoom_info(str(dds), True, base_dir)
+        mock_open.assert_not_called()  # the size comes from the header
+        tiles = service.get_deep_zoom_tiles(str(dds), True, base_dir, 0, [[2, 1], [0, 0]])
+        coarsest = service.get_deep_zoom_tiles(str(dds), True, base_dir, 2, [[0, 0]])
+        again = service.get_deep_zoom_tiles(str(dds), True, base_dir, 0, [[2, 1]])
+
+    mock_open.assert_called_once_with(str(dds), full_resolution=True, interactive=True)
+    assert (info["width"], info["height"], info["tile_size"], info["levels"]) == (600, 300, 256, 3)
+    assert sorted(tiles) == ["0_0", "2_1"] and again["2_1"] == tiles["2_1"]
+    with Image.open(io.BytesIO(base64.b64decode(tiles["2_1"].split(",", 1)[1]))) as corner:
+        assert corner.size == (88, 44) and corner.getpixel((40, 20))[0] > 200
+    with Image.open(io.BytesIO(base64.b64decode(coarsest["0_0"].split(",", 1)[1]))) as level:
+        assert level.size == (150, 75)
+    for level, tile in ((3, [0, 0]), ("0", [0, 0]), (0, [3, 0]), (0, [0]), (0, ["0", 0]), (0, None)):
+        with pytest.raises(HoHatchError):
+            service.get_deep_zoom_tiles(str(dds), True, base_dir, level, [tile])
+
+    # Replaced content gets a new validator, so the cached tiles are rendered again.
+    dds.write_bytes(build_dds_header(600, 300, "BC7_UNORM", 1) + b"changed")
+    with patch.object(service, "open_as_image") as mock_open:
+        mock_open.return_value.__enter__.return_value = Image.new("RGB", (600, 300), "lime")
+        replaced = service.get_deep_zoom_tiles(str(dds), True, base_dir, 0, [[2, 1]])
+    mock_open.assert_called_once()
+    with Image.open(io.BytesIO(base64.b64decode(replaced["2_1"].split(",", 1)[1]))) as corner:
+        assert corner.getpixel((40, 20))[1] > 200
+
+    # Deleting the texture drops its tiles, its info and its decoded levels.
+    service.drop_cache_entry(str(dds), True, base_dir)
+    assert not list((tmp_path / "cache" / "zoom").rglob("*.jpg"))
+    assert not service._deep_zoom_images
+
+
+def test_preview_decodes_only_the_smallest_sufficient_mip_level(tmp_path):
+    from backend.dds import build_dds_header
+    from backend.engines import EngineRegistry, FakeEngine, PillowEngine
+    from backend.services import FileService
+
+    dds = tmp_path / "card.dds"
+    levels = [(64, (255, 0, 0, 255)), (32, (0, 255, 0, 255)), (16, (0, 0, 255, 255)), (8, (0, 0, 0, 255))]
+    dds.write_bytes(
+        build_dds_header(64, 64, "R8G8B8A8_UNORM", mip_count=len(levels))
+        + b"".join(bytes(color) * size * size for size, color in levels)
+    )
+    config_service = MagicMock()
+    config_service.get_settings.return_value = AppSettings(output_height=16)
+    service = TexconvService(config_service, FileService(config_service), MagicMock())
+    texconv_stand_in = FakeEngine()
+    texconv_stand_in.estimated_seconds = 1.0
+    service.engines = EngineRegistry([PillowEngine(), texconv_stand_in])
+
+    with patch("backend.engines.metrics") as mock_metrics:
+        with service.open_as_image(str(dds)) as preview:
+            assert preview.size == (13, 16) and preview.mode == "RGB"
+            assert preview.getpixel((6, 8)) == (0, 0, 255)
+
+    assert texconv_stand_in.calls == []
+    mock_metrics.increment.assert_any_call("engine.pillow.bytes_read", 148 + 16 * 16 * 4)
+
+    dds.write_bytes(build_dds_header(64, 64, "B8G8R8A8_UNORM") + bytes(64 * 64 * 4))
+    with service.open_as_image(str(dds)):
+        pass
+    assert texconv_stand_in.calls == [("decode", str(dds))]
@@ -0,0 +1,233 @@
+import os
+import threading
+
+import pytest
+
+from backend import thumbnail_store
+from backend.exceptions import FileSystemError
+from backend.thumbnail_store import FileThumbnailStore, PackedThumbnailStore, ThumbnailStore
+
+
+def test_file_store_keeps_the_jpg_and_hash_layout(tmp_path):
+    store = FileThumbnailStore(tmp_path)
+    store.put("dump/card.v2/card.v2", b"jpeg", "abc")
+
+    assert (tmp_path / "dump" / "card.v2" / "card.v2.jpg").read_bytes() == b"jpeg"
+    assert store.get_hash("dump/card.v2/card.v2") == "abc"
+    assert store.move("dump/card.v2/card.v2", "inject/card") is True
+    assert store.get("inject/card") == b"jpeg" and store.get("dump/card.v2/card.v2") is None
+    assert store.move("dump/missing", "inject/missing") is False
+
+
+@pytest.mark.parametrize("store_class", [FileThumbnailStore, PackedThumbnailStore])
+def test_concurrent_readers_never_see_a_thumbnail_with_another_versions_hash(tmp_path, store_class):
+    store = store_class(tmp_path)
+    store.put("dump/a/a", b"v0", "h0")
+    mismatches = []
+    done = threading.Event()
+
+    def write():
+        for i in range(1, 200):
+            store.put("dump/a/a", f"v{i}".encode(), f"h{i}")
+        done.set()
+
+    def read():
+        while not done.is_set():
+            entry = store.get_entry("dump/a/a")
+            if entry and entry[1] and entry[0].decode()[1:] != entry[1][1:]:
+                mismatches.append(entry)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert mismatches == [] and store.get_entry("dump/a/a") == (b"v199", "h199")
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_file_store_interrupted_put_leaves_a_stale_entry(tmp_path, monkeypatch):
+    store = FileThumbnailStore(tmp_path)
+    store.put("dump/a/a", b"old", "h-old")
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if str(dst).endswith(".hash"):
+            raise OSError("disk full")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", replace)
+    with pytest.raises(FileSystemError):
+        store.put("dump/a/a", b"new", "h-new")
+
+    assert store.get_entry("dump/a/a") == (b"new", "")
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_file_store_failed_staging_leaves_no_temp_files(tmp_path, monkeypatch):
+    store = FileThumbnailStore(tmp_path)
+    real_staged = FileThumbnailStore._staged
+
+    def staged(path, content):
+        if path.suffix == ".hash":
+            raise OSError("disk full")
+        return real_staged(path, content)
+
+    monkeypatch.setattr(FileThumbnailStore, "_staged", staticmethod(staged))
+    with pytest.raises(FileSystemError):
+        store.put("dump/a/a", b"new", "h-new")
+
+    assert not list(tmp_path.rglob("*.tmp"))
+    assert store.get("dump/a/a") is None
+
+
+def test_packed_store_serves_puts_moves_and_deletes(tmp_path):
+    store = PackedThumbnailStore(tmp_path)
+    store.put("dump/a/a", b"first", "h1")
+    store.put("dump/b/b", b"second", "h2")
+    store.put("dump/a/a", b"replaced", "h3")
+
+    assert store.get("dump/a/a") == b"replaced" and store.get_hash("dump/a/a") == "h3"
+    assert store.move("dump/b/b", "inject/b") is True
+    store.delete("dump/a/a")
+
+    assert store.get("dump/a/a") is None and store.get_hash("dump/b/b") is None
+    assert store.get("inject/b") == b"second" and store.get_hash("inject/b") == "h2"
+
+
+def test_packed_store_rebuilds_its_index_on_open(tmp_path):
+    store = PackedThumbnailStore(tmp_path)
+    store.put("dump/a/a", b"kept", "h1")
+    store.put("dump/b/b", b"gone", "h2")
+    store.delete("dump/b/b")
+    store.close()
+    segment = next(tmp_path.glob("segment-*.pack"))
+    with open(segment, "ab") as f:
+        f.write(b"HHT1\x00partial")  # a write cut short by a crash
+
+    reopened = PackedThumbnailStore(tmp_path)
+    reopened.put("dump/c/c", b"after", "h3")
+    reopened.close()
+    reopened = PackedThumbnailStore(tmp_path)
+
+    assert reopened.get("dump/a/a") == b"kept" and reopened.get("dump/c/c") == b"after"
+    assert reopened.get("dump/b/b") is None
+
+
+def test_packed_store_compaction_drops_dead_segments_without_resurrecting_keys(tmp_path):
+    store = PackedThumbnailStore(tmp_path, segment_max_bytes=64)
+    for i in range(6):
+        store.put(f"dump/{i}/{i}", bytes([i]) * 40, f"h{i}")
+    store.put("dump/0/0", b"new", "h0b")
+    for i in (1, 2, 3):
+        store.delete(f"dump/{i}/{i}")
+    segments_before = len(list(tmp_path.glob("segment-*.pack")))
+
+    store.compact()
+    store.close()
+
+    assert len(list(tmp_path.glob("segment-*.pack"))) < segments_before
+    reopened = PackedThumbnailStore(tmp_path)
+    assert reopened.get("dump/0/0") == b"new"
+    assert [reopened.get(f"dump/{i}/{i}") for i in (1, 2, 3)] == [None, None, None]
+    assert reopened.get("dump/5/5") == bytes([5]) * 40
+
+
+def test_packed_store_serves_and_writes_while_a_segment_is_compacted(tmp_path, monkeypatch):
+    store = PackedThumbnailStore(tmp_path, segment_max_bytes=64)
+    for i in range(4):
+        store.put(f"dump/{i}/{i}", bytes([i]) * 40, f"h{i}")
+    store.delete("dump/1/1")
+    copying, resume = threading.Event(), threading.Event()
+    pack_record = thumbnail_store._pack_record
+
+    def slow_pack_record(*args, **kwargs):
+        if threading.current_thread().name == "compactor":
+            copying.set()
+            assert resume.wait(5)
+        return pack_record(*args, **kwargs)
+
+    monkeypatch.setattr(thumbnail_store, "_pack_record", slow_pack_record)
+    compactor = threading.Thread(target=store.compact, name="compactor")
+    compactor.start()
+    assert copying.wait(5)
+
+    # The store lock is free while records are copied.
+    assert store.get("dump/0/0") == bytes([0]) * 40
+    store.put("dump/0/0", b"newer", "h0b")
+    resume.set()
+    compactor.join()
+    store.close()
+
+    reopened = PackedThumbnailStore(tmp_path)
+    assert reopened.get_entry("dump/0/0") == (b"newer", "h0b")
+    assert reopened.get("dump/1/1") is None and reopened.get("dump/3/3") == bytes([3]) * 40
+
+
+@pytest.mark.parametrize("store_class", [FileThumbnailStore, PackedThumbnailStore])
+def test_closed_store_ignores_late_writes(tmp_path, store_class):
+    store = store_class(tmp_path / "cache")
+    store.put("dump/a/a", b"jpeg", "h")
+    store.close()
+    files = sorted(tmp_path.rglob("*"))
+
+    store.put("dump/b/b", b"late render", "h")
+
+    assert store.get("dump/a/a") is None and store.move("dump/a/a", "inject/a") is False
+    assert sorted(tmp_path.rglob("*")) == files
+
+
+@pytest.mark.parametrize("store_class", [FileThumbnailStore, PackedThumbnailStore])
+def test_delete_prefix_drops_only_the_keys_under_it(tmp_path, store_class):
+    store = store_class(tmp_path / "cache")
+    for key in ("zoom/dump/a/a/info", "zoom/dump/a/a/0/0_0", "zoom/dump/a/ab/info", "dump/a/a"):
+        store.put(key, b"jpeg", "h")
+
+    store.delete_prefix("zoom/dump/a/a")
+    store.delete_prefix("zoom/missing")
+
+    assert store.get("zoom/dump/a/a/info") is None and store.get("zoom/dump/a/a/0/0_0") is None
+    assert store.get("zoom/dump/a/ab/info") == b"jpeg" and store.get("dump/a/a") == b"jpeg"
+
+
+def test_store_backends_must_implement_every_operation():
+    class Partial(ThumbnailStore):
+        def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_packed_store_compacts_in_the_background_past_the_threshold(tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbnail_store, "COMPACT_MIN_DEAD_BYTES", 1)
+    store = PackedThumbnailStore(tmp_path, segment_max_bytes=64)
+    compacted = []
+    monkeypatch.setattr(store, "_compact", compacted.append)
+
+    store.put("dump/a/a", b"x" * 60, "h")
+    store.put("dump/b/b", b"y" * 60, "h")
+    store.delete("dump/a/a")
+
+    assert compacted == [[1]]
+
+
+@pytest.mark.parametrize("backend", ["files", "packed"])
+def test_image_service_selects_the_configured_store(tmp_path, monkeypatch, backend):
+    from unittest.mock import MagicMock
+    from backend import services
+    from backend.dto import AppSettings
+
+    monkeypatch.setattr(services, "get_config_dir", lambda: tmp_path)
+    config_service = MagicMock()
+    config_service.get_settings.return_value = AppSettings(thumbnail_cache_backend=backend)
+    image_service = services.ImageService(config_service)
+
+    store = image_service.get_thumbnail_store()
+    store.put("dump/a/a", b"jpeg", "h")
+
+    expected = PackedThumbnailStore if backend == "packed" else FileThumbnailStore
+    assert isinstance(store, expected) and image_service.get_thumbnail_store() is store
+    image_service.close_thumbnail_store()
+    assert image_service.get_thumbnail_store().get("dump/a/a") == b"jpeg"
@@ -0,0 +1,564 @@
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from backend.exceptions import FileSystemError
+from backend.metrics import metrics
+
+# Record layout: header, then the UTF-8 key, the ASCII hash of the source DDS and the thumbnail data.
+RECORD_MAGIC = b"HHT1"
+RECORD_HEADER = struct.Struct("<4sBHHI")  # magic, flags, key length, hash length, data length
+FLAG_TOMBSTONE = 0x1
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+# A sealed segment is compacted once at least this share of it, and at least this many bytes, are dead.
+COMPACT_DEAD_RATIO = 0.5
+COMPACT_MIN_DEAD_BYTES = 4 * 1024 * 1024
+
+SEGMENT_NAME = re.compile(r"segment-(\d{6})\.pack$")
+
+
+def _pack_record(key: str, dds_hash: str, data: bytes, flags: int = 0) -> Tuple[bytes, int]:
+    """Returns a record and the offset of its data within it."""
+    key_bytes, hash_bytes = key.encode("utf-8"), dds_hash.encode("ascii")
+    header = RECORD_HEADER.pack(RECORD_MAGIC, flags, len(key_bytes), len(hash_bytes), len(data))
+    return b"".join((header, key_bytes, hash_bytes, data)), len(header) + len(key_bytes) + len(hash_bytes)
+
+
+class ThumbnailStore(ABC):
+    """Storage for cached display thumbnails and the hash of the DDS each was made from.
+
+    Keys are "/"-separated names relative to the cache, such as "dump/card_01/card_01".
+
+    Renders may still hold a store when it is closed, e.g. by clear_cache. close() waits for the
+    operations in progress to finish, and from then on the store reads as empty and ignores
+    writes, so no file is opened again in a cache folder that is about to be deleted.
+    """
+
+    def __init__(self):
+        self._closed = False
+        self._users = 0
+        self._users_changed = threading.Condition()
+
+    @contextmanager
+    def _in_use(self) -> Iterator[bool]:
+        """Yields whether the store is open, and keeps close() waiting until the block is left."""
+        with self._users_changed:
+            usable = not self._closed
+            if usable:
+                self._users += 1
+        try:
+            yield usable
+        finally:
+            if usable:
+                with self._users_changed:
+                    self._users -= 1
+                    self._users_changed.notify_all()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._in_use() as usable:
+            return self._get(key) if usable else None
+
+    def get_hash(self, key: str) -> Optional[str]:
+        """Returns the stored DDS hash, "" if the thumbnail has none, or None if there is no thumbnail."""
+        with self._in_use() as usable:
+            return self._get_hash(key) if usable else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Returns a thumbnail together with the hash it was stored with, read as one consistent pair."""
+        with self._in_use() as usable:
+            return self._get_entry(key) if usable else None
+
+    def put(self, key: str, data: bytes, dds_hash: str):
+        with self._in_use() as usable:
+            if usable:
+                self._put(key, data, dds_hash)
+            else:
+                logging.debug(f"Not caching thumbnail {key}: the store has been closed")
+
+    def delete(self, key: str):
+        with self._in_use() as usable:
+            if usable:
+                self._delete(key)
+
+    def move(self, src: str, dest: str) -> bool:
+        """Moves a thumbnail to a new key. Returns False if src had no thumbnail."""
+        with self._in_use() as usable:
+            return self._move(src, dest) if usable else False
+
+    def delete_prefix(self, prefix: str):
+        """Deletes every thumbnail whose key lies under prefix, e.g. all of "zoom/dump/card/card/..."."""
+        with self._in_use() as usable:
+            if usable:
+                self._delete_prefix(prefix)
+
+    def _is_closed(self) -> bool:
+        with self._users_changed:
+            return self._closed
+
+    def close(self):
+        with self._users_changed:
+            self._closed = True
+            self._users_changed.wait_for(lambda: self._users == 0)
+        self._close()
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def _get_hash(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def _get_entry(self, key: str) -> Optional[Tuple[bytes, str]]:
+        ...
+
+    @abstractmethod
+    def _put(self, key: str, data: bytes, dds_hash: str):
+        ...
+
+    @abstractmethod
+    def _delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def _move(self, src: str, dest: str) -> bool:
+        ...
+
+    @abstractmethod
+    def _delete_prefix(self, prefix: str):
+        ...
+
+    def _close(self):
+        pass
+
+
+class FileThumbnailStore(ThumbnailStore):
+    """One `<key>.jpg` and `<key>.hash` file per thumbnail under root.
+
+    Both files are written to temporary names first and published with os.replace while the key's
+    lock is held, and readers of a pair take the same lock, so no reader sees a half-written
+    thumbnail or a hash from another version of it. The hash is removed before the thumbnail is
+    replaced and written back last, so an interrupted write leaves a thumbnail that is simply stale.
+    """
+
+    # Keys are spread over this many locks, so locking stays cheap however many thumbnails there are.
+    LOCK_STRIPES = 64
+
+    def __init__(self, root: Path):
+        super().__init__()
+        self.root = root
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.root / f"{key}.jpg", self.root / f"{key}.hash"
+
+    def _lock_index(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % self.LOCK_STRIPES
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        return self._locks[self._lock_index(key)]
+
+    def _read(self, key: str) -> Optional[Tuple[bytes, str]]:
+        data_file, hash_file = self._paths(key)
+        try:
+            data = data_file.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            return data, hash_file.read_text(encoding="utf-8")
+        except OSError:
+            return data, ""
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._key_lock(key):
+            try:
+                return self._paths(key)[0].read_bytes()
+            except FileNotFoundError:
+                return None
+
+    def _get_hash(self, key: str) -> Optional[str]:
+        data_file, hash_file = self._paths(key)
+        with self._key_lock(key):
+            if not data_file.exists():
+                return None
+            try:
+                return hash_file.read_text(encoding="utf-8")
+            except OSError:
+                return ""
+
+    def _get_entry(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._key_lock(key):
+            return self._read(key)
+
+    @staticmethod
+    def _staged(path: Path, content: bytes) -> Path:
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        return temp_path
+
+    def _put(self, key: str, data: bytes, dds_hash: str):
+        data_file, hash_file = self._paths(key)
+        staged: List[Path] = []
+        try:
+            data_file.parent.mkdir(parents=True, exist_ok=True)
+            # Each temp file is tracked as soon as it exists, so a failure staging the next one cleans it up.
+            staged.append(self._staged(data_file, data))
+            staged.append(self._staged(hash_file, dds_hash.encode("utf-8")))
+            with self._key_lock(key):
+                hash_file.unlink(missing_ok=True)
+                os.replace(staged[0], data_file)
+                os.replace(staged[1], hash_file)
+        except OSError as e:
+            raise FileSystemError(f"Failed to write cached thumbnail {data_file}: {e}")
+        finally:
+            for temp_path in staged:
+                try:
+                    temp_path.unlink(missing_ok=True)
+                except OSError:
+                    pass
+
+    def _delete(self, key: str):
+        with self._key_lock(key):
+            for path in reversed(self._paths(key)):
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as e:
+                    logging.warning(f"Failed to remove cache file {path}: {e}")
+
+    def _delete_prefix(self, prefix: str):
+        keys = {
+            path.relative_to(self.root).with_suffix("").as_posix()
+            for path in (self.root / prefix).rglob("*")
+            if path.suffix in (".jpg", ".hash") and not path.name.startswith(".")
+        }
+        for key in keys:
+            self._delete(key)
+
+    def _move(self, src: str, dest: str) -> bool:
+        src_files, dest_files = self._paths(src), self._paths(dest)
+        # Both keys are locked, always in stripe order so two opposite moves cannot deadlock.
+        stripes = sorted({self._lock_index(src), self._lock_index(dest)})
+        for stripe in stripes:
+            self._locks[stripe].acquire()
+        try:
+            if not all(path.exists() for path in src_files):
+                return False
+            dest_files[0].parent.mkdir(parents=True, exist_ok=True)
+            dest_files[1].unlink(missing_ok=True)
+            for src_file, dest_file in zip(src_files, dest_files):
+                os.replace(src_file, dest_file)
+            return True
+        except OSError as e:
+            logging.warning(f"Failed to move cached thumbnail {src} to {dest}: {e}")
+            return False
+        finally:
+            for stripe in reversed(stripes):
+                self._locks[stripe].release()
+
+
+class PackedThumbnailStore(ThumbnailStore):
+    """Thumbnails packed into append-only segment files, read through mmap.
+
+    Records are never rewritten in place: a put appends a record, a delete appends a tombstone,
+    and the in-memory index, rebuilt by scanning the segments on open, maps each key to the offset
+    of its newest record. Serving a thumbnail is a slice of a mapped segment, and clearing the
+    cache means deleting a few segment files. Sealed segments that are mostly dead are compacted
+    in the background by rewriting them with only their live records.
+    """
+
+    def __init__(self, root: Path, segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        super().__init__()
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.RLock()
+        # key -> (segment, data offset, data length, dds hash, record size)
+        self._index: Dict[str, Tuple[int, int, int, str, int]] = {}
+        self._sizes: Dict[int, int] = {}
+        self._live_bytes: Dict[int, int] = {}
+        # Keys with any record (live, superseded or tombstone) in each segment.
+        self._segment_keys: Dict[int, Set[str]] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._active: Optional[int] = None
+        self._active_file = None
+        self._compacting = False
+        # Serialises segment rewrites, which run without the store lock.
+        self._compact_lock = threading.Lock()
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._load()
+        except OSError as e:
+            raise FileSystemError(f"Failed to open thumbnail pack store {self.root}: {e}")
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.root / f"segment-{segment:06d}.pack"
+
+    def _load(self):
+        segments = sorted(int(m.group(1)) for p in self.root.iterdir() if (m := SEGMENT_NAME.match(p.name)))
+        for segment in segments:
+            self._scan(segment)
+        if segments and self._sizes[segments[-1]] < self.segment_max_bytes:
+            self._open_active(segments[-1])
+        logging.info(f"Opened thumbnail pack store with {len(self._index)} entries in {len(segments)} segments.")
+
+    def _scan(self, segment: int):
+        path = self._segment_path(segment)
+        size = path.stat().st_size
+        self._live_bytes[segment] = 0
+        self._segment_keys[segment] = keys = set()
+        offset = 0
+        if size:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                while offset + RECORD_HEADER.size <= size:
+                    magic, flags, key_len, hash_len, data_len = RECORD_HEADER.unpack_from(mm, offset)
+                    key_start = offset + RECORD_HEADER.size
+                    end = key_start + key_len + hash_len + data_len
+                    if magic != RECORD_MAGIC or end > size:
+                        break
+                    key = mm[key_start : key_start + key_len].decode("utf-8")
+                    keys.add(key)
+                    self._unindex(key)
+                    if not flags & FLAG_TOMBSTONE:
+                        dds_hash = mm[key_start + key_len : key_start + key_len + hash_len].decode("ascii")
+                        self._index[key] = (segment, key_start + key_len + hash_len, data_len, dds_hash, end - offset)
+                        self._live_bytes[segment] += end - offset
+                    offset = end
+        if offset < size:
+            # The tail of an interrupted write; cut it off so later appends stay aligned.
+            logging.warning(f"Truncating {size - offset} bytes of incomplete records from {path}")
+            os.truncate(path, offset)
+        self._sizes[segment] = offset
+
+    def _open_active(self, segment: int):
+        if self._active_file:
+            self._active_file.close()
+        self._active_file = open(self._segment_path(segment), "ab")
+        self._active = segment
+        self._sizes.setdefault(segment, 0)
+        self._live_bytes.setdefault(segment, 0)
+        self._segment_keys.setdefault(segment, set())
+
+    def _unindex(self, key: str):
+        entry = self._index.pop(key, None)
+        if entry:
+            self._live_bytes[entry[0]] -= entry[4]
+
+    def _append(self, key: str, dds_hash: str, data: bytes, flags: int = 0) -> Tuple[int, int, int]:
+        """Appends a record to the active segment; returns (segment, data offset, record size)."""
+        if self._active is None or self._sizes[self._active] >= self.segment_max_bytes:
+            self._open_active(max(self._sizes, default=0) + 1)
+        record, data_offset = _pack_record(key, dds_hash, data, flags)
+        offset = self._sizes[self._active]
+        self._active_file.write(record)
+        self._active_file.flush()
+        self._sizes[self._active] += len(record)
+        self._segment_keys[self._active].add(key)
+        return self._active, offset + data_offset, len(record)
+
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        mm = self._maps.get(segment)
+        if mm is None or len(mm) < end:
+            # The active segment grows, so its mapping is renewed when a read reaches past it.
+            if mm is not None:
+                mm.close()
+            with open(self._segment_path(segment), "rb") as f:
+                mm = self._maps[segment] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mm
+
+    def _put_locked(self, key: str, data: bytes, dds_hash: str):
+        self._unindex(key)
+        segment, offset, record_size = self._append(key, dds_hash, data)
+        self._index[key] = (segment, offset, len(data), dds_hash, record_size)
+        self._live_bytes[segment] += record_size
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            segment, offset, length, _, _ = entry
+            try:
+                return self._map(segment, offset + length)[offset : offset + length]
+            except (OSError, ValueError) as e:
+                logging.warning(f"Failed to read thumbnail {key} from the pack store: {e}")
+                return None
+
+    def _get_hash(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._index.get(key)
+            return entry[3] if entry else None
+
+    def _get_entry(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._index.get(key)
+            data = self._get(key) if entry else None
+            return None if data is None else (data, entry[3])
+
+    def _put(self, key: str, data: bytes, dds_hash: str):
+        with self._lock:
+            try:
+                self._put_locked(key, data, dds_hash)
+            except OSError as e:
+                raise FileSystemError(f"Failed to write thumbnail {key} to the pack store: {e}")
+        self._maybe_compact()
+
+    def _delete(self, key: str):
+        with self._lock:
+            if key not in self._index:
+                return
+            self._unindex(key)
+            try:
+                self._append(key, "", b"", FLAG_TOMBSTONE)
+            except OSError as e:
+                logging.warning(f"Failed to write tombstone for {key}: {e}")
+        self._maybe_compact()
+
+    def _delete_prefix(self, prefix: str):
+        with self._lock:
+            keys = [key for key in self._index if key.startswith(f"{prefix}/")]
+            try:
+                for key in keys:
+                    self._unindex(key)
+                    self._append(key, "", b"", FLAG_TOMBSTONE)
+            except OSError as e:
+                logging.warning(f"Failed to write tombstones under {prefix}: {e}")
+        self._maybe_compact()
+
+    def _move(self, src: str, dest: str) -> bool:
+        with self._lock:
+            entry = self._index.get(src)
+            data = self._get(src)
+            if entry is None or data is None:
+                return False
+            try:
+                self._put_locked(dest, data, entry[3])
+                self._unindex(src)
+                self._append(src, "", b"", FLAG_TOMBSTONE)
+            except OSError as e:
+                logging.warning(f"Failed to move thumbnail {src} to {dest} in the pack store: {e}")
+                return False
+        self._maybe_compact()
+        return True
+
+    def _compactable_segments(self, min_dead_bytes: int, min_dead_ratio: float) -> List[int]:
+        segments = []
+        for segment, size in self._sizes.items():
+            dead = size - self._live_bytes[segment]
+            if segment != self._active and size and dead >= min_dead_bytes and dead / size >= min_dead_ratio:
+                segments.append(segment)
+        return sorted(segments)
+
+    def _maybe_compact(self):
+        with self._lock:
+            if self._compacting:
+                return
+            segments = self._compactable_segments(COMPACT_MIN_DEAD_BYTES, COMPACT_DEAD_RATIO)
+            if not segments:
+                return
+            self._compacting = True
+        threading.Thread(target=self._compact, args=(segments,), name="hohatch-pack-compact", daemon=True).start()
+
+    def _compact(self, segments: List[int]):
+        try:
+            with self._in_use() as usable:
+                for segment in segments if usable else []:
+                    self._compact_segment(segment)
+        except OSError as e:
+            logging.warning(f"Thumbnail pack compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def compact(self):
+        """Compacts every sealed segment that holds dead records."""
+        with self._in_use() as usable:
+            if not usable:
+                return
+            with self._lock:
+                segments = self._compactable_segments(1, 0.0)
+            for segment in segments:
+                self._compact_segment(segment)
+
+    def _compact_segment(self, segment: int):
+        """Rewrites a sealed segment with only its live records and the tombstones still needed.
+
+        The records are copied without the store lock, through a mapping of the compactor's own,
+        so thumbnails are served and written meanwhile; the lock is only held to swap the rewritten
+        file in and re-point the index. The segment keeps its number, so records put or deleted
+        during the copy still supersede the copied ones, also when the store is opened again.
+        """
+        with self._compact_lock:
+            with self._lock:
+                if segment == self._active or segment not in self._sizes:
+                    return
+                live = [(key, entry) for key, entry in self._index.items() if entry[0] == segment]
+                older_keys = set().union(*(keys for s, keys in self._segment_keys.items() if s < segment))
+                # A deleted key still needs its tombstone while an older segment holds a record for it.
+                tombstones = [
+                    key for key in self._segment_keys[segment] if key not in self._index and key in older_keys
+                ]
+
+            path = self._segment_path(segment)
+            temp_path = path.with_name(f"{path.name}.compact")
+            copied: Dict[str, Tuple[Tuple[int, int, int, str, int], int, int]] = {}
+            size = 0
+            try:
+                with open(path, "rb") as src, open(temp_path, "wb") as out:
+                    with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        for key, entry in live:
+                            if self._is_closed():
+                                return
+                            _, offset, length, dds_hash, _ = entry
+                            record, data_offset = _pack_record(key, dds_hash, mm[offset : offset + length])
+                            out.write(record)
+                            copied[key] = (entry, size + data_offset, len(record))
+                            size += len(record)
+                    for key in tombstones:
+                        record, _ = _pack_record(key, "", b"", FLAG_TOMBSTONE)
+                        out.write(record)
+                        size += len(record)
+
+                with self._lock:
+                    if self._is_closed() or segment not in self._sizes:
+                        return
+                    mm = self._maps.pop(segment, None)
+                    if mm is not None:
+                        mm.close()
+                    if not size:
+                        path.unlink()
+                        del self._sizes[segment], self._live_bytes[segment], self._segment_keys[segment]
+                    else:
+                        os.replace(temp_path, path)
+                        live_bytes = 0
+                        for key, (entry, data_offset, record_size) in copied.items():
+                            # Keys put, moved or deleted during the copy keep their newer record.
+                            if self._index.get(key) == entry:
+                                self._index[key] = (segment, data_offset, entry[2], entry[3], record_size)
+                                live_bytes += record_size
+                        self._sizes[segment] = size
+                        self._live_bytes[segment] = live_bytes
+                        self._segment_keys[segment] = set(copied) | set(tombstones)
+            finally:
+                temp_path.unlink(missing_ok=True)
+        metrics.increment("thumbnail_store.compactions")
+        logging.info(f"Compacted thumbnail pack segment {segment}: {len(copied)} live entries kept.")
+
+    def _close(self):
+        with self._lock:
+            for mm in self._maps.values():
+                mm.close()
+            self._maps.clear()
+            if self._active_file:
+                self._active_file.close()
+                self._active_file = None
+            self._active = None
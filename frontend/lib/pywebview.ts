@@ -5,8 +5,33 @@ declare global {
     pywebview: {
       api: {
         get_settings: () => Promise<Settings>;
+        get_startup_status: () => Promise<{
+          success: boolean;
+          state: "pending" | "running" | "ready" | "failed";
+          texconv_available: boolean | null;
+          error: string | null;
+        }>;
         get_language_data: (lang: string) => Promise<any>;
-        get_image_list: (folderType: string, use_hash_check?: boolean) => Promise<any>; // Added
+        get_image_list: (
+          folderType: string,
+          use_hash_check?: boolean,
+          compact?: boolean,
+          include_metadata?: boolean,
+        ) => Promise<any>; // Added
+        get_cached_image_list: (folderType: string) => Promise<{
+          success: boolean;
+          snapshot?: boolean;
+          format?: "columnar";
+          base?: string;
+          paths?: string[];
+          sizes?: number[];
+          mtimes?: number[];
+          request_id?: string;
+          error?: string;
+        }>;
+        start_image_scan: (
+          folderType: string,
+        ) => Promise<{success: boolean; scan_id?: string; error?: string}>;
         get_inject_images: (reload?: boolean) => Promise<any>;
         get_dump_images: (reload?: boolean) => Promise<any>;
         validate_sk_folder: (path: string) => Promise<any>;
@@ -30,17 +55,97 @@ declare global {
           dds_path: string,
           is_dump_image: boolean,
         ) => Promise<{success: boolean; src?: string; error?: string}>;
+        convert_dds_for_display_batch: (
+          dds_paths: string[],
+          is_dump_image: boolean,
+        ) => Promise<{
+          success: boolean;
+          images?: Record<string, string>;
+          missing?: string[];
+          errors?: Record<string, string>;
+          request_id?: string;
+          error?: string;
+        }>;
+        cancel_display_batch: (request_id: string) => Promise<{success: boolean}>;
+        get_contact_sheet: (
+          dds_paths: string[],
+          is_dump_image: boolean,
+          columns?: number,
+          tile_height?: number,
+        ) => Promise<{
+          success: boolean;
+          src?: string;
+          columns?: number;
+          tile_width?: number;
+          tile_height?: number;
+          tiles?: Record<string, [number, number, number, number]>;
+          errors?: Record<string, string>;
+          error?: string;
+        }>;
+        get_deep_zoom_info: (
+          dds_path: string,
+          is_dump_image: boolean,
+        ) => Promise<{
+          success: boolean;
+          width?: number;
+          height?: number;
+          tile_size?: number;
+          levels?: number;
+          error?: string;
+        }>;
+        get_deep_zoom_tiles: (
+          dds_path: string,
+          is_dump_image: boolean,
+          level: number,
+          tiles: [number, number][],
+        ) => Promise<{success: boolean; level?: number; tiles?: Record<string, string>; error?: string}>;
         frontend_ready: () => Promise<void>;
         load_url: (url: string) => Promise<any>;
         open_dump_folder: () => Promise<any>;
         open_inject_folder: () => Promise<any>;
+        batch_download_selected_dds_as_zip: (
+          dds_path_list: string[],
+          output_zip_path: string | string[],
+        ) => Promise<any>;
+        get_pending_batch_jobs: () => Promise<any>;
+        resume_batch_job: (job_id: string) => Promise<any>;
+        discard_batch_job: (job_id: string) => Promise<any>;
+        export_mod_pack: (output_path: string | string[]) => Promise<any>;
+        import_mod_pack: (pack_path: string | string[]) => Promise<any>;
         delete_dds_file: (dds_path: string) => Promise<any>;
-        batch_delete_selected_dds_files: (dds_path_list: string[]) => Promise<any>;
+        batch_delete_selected_dds_files: (dds_path_list: string[]) => Promise<{
+          success: boolean;
+          message?: string;
+          undo_id?: string;
+          undo_seconds?: number;
+          errors?: string[];
+          error?: string;
+        }>;
+        undo_delete: (undo_id: string) => Promise<{
+          success: boolean;
+          restored?: number;
+          undo_id?: string;
+          undo_seconds?: number;
+          error?: string;
+        }>;
         get_default_sk_path: () => Promise<string>;
         open_cache_folder: () => Promise<any>;
         open_log_folder: () => Promise<{success: boolean; error?: string}>;
         clear_cache: () => Promise<{success: boolean; error?: string}>;
         notify_settings_changed: () => Promise<any>;
+        get_metrics: () => Promise<{
+          success: boolean;
+          metrics?: any;
+          texconv_slow_runs?: any[];
+          engine_seconds?: Record<string, number>;
+          engine_concurrency?: {
+            limit: number;
+            in_flight: number;
+            interactive_waiting: number;
+            background_waiting: number;
+          };
+          error?: string;
+        }>;
         get_app_version: () => Promise<{success: boolean; version?: string; error?: string}>;
         check_for_updates: () => Promise<{
           success: boolean;
@@ -50,4 +155,61 @@ declare global {
       };
     };
   }
+
+  interface ImageScanBatchDetail {
+    scan_id: string;
+    folder_type: string;
+    images: {src: string; alt: string; path: string}[];
+  }
+
+  interface ImageScanCompleteDetail {
+    scan_id: string;
+    folder_type: string;
+    success: boolean;
+    cancelled?: boolean;
+    total?: number;
+    seconds?: number;
+    error?: string;
+  }
+
+  interface ImageListDiffDetail {
+    request_id: string;
+    folder_type: string;
+    success: boolean;
+    base?: string;
+    added?: string[];
+    removed?: string[];
+    changed?: string[];
+    error?: string;
+  }
+
+  interface DisplayImageBatchDetail {
+    request_id: string;
+    images: Record<string, string>;
+  }
+
+  interface DisplayImageErrorDetail {
+    request_id: string;
+    path: string;
+    error: string;
+  }
+
+  interface DisplayImageCompleteDetail {
+    request_id: string;
+    success: boolean;
+    cancelled?: boolean;
+    total?: number;
+    errors?: Record<string, string>;
+    seconds?: number;
+    error?: string;
+  }
+
+  interface WindowEventMap {
+    displayImageBatch: CustomEvent<DisplayImageBatchDetail>;
+    displayImageError: CustomEvent<DisplayImageErrorDetail>;
+    displayImageComplete: CustomEvent<DisplayImageCompleteDetail>;
+    imageListDiff: CustomEvent<ImageListDiffDetail>;
+    imageScanBatch: CustomEvent<ImageScanBatchDetail>;
+    imageScanComplete: CustomEvent<ImageScanCompleteDetail>;
+  }
 }
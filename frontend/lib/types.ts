@@ -6,4 +6,9 @@ export interface Settings {
   output_height: number;
   last_active_view: "dump" | "inject";
   theme: "dark" | "light";
+  texconv_timeout_seconds?: number;
+  texconv_retries?: number;
+  thumbnail_cache_backend?: "files" | "packed";
+  thumbnail_format?: "jpeg" | "webp" | "avif";
+  thumbnail_quality?: number;
 }